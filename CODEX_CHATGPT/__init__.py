@@ -3,5 +3,8 @@
 __all__ = [
     "mirror_matchup",
     "config",
+    "health_timeline",
+    "hud_calibration",
+    "player_attribution",
     "blitzcrank_knowledge",
 ]
@@ -1,10 +1,11 @@
 """Configuration helpers for Codex matchup analysis."""
 
 from dataclasses import dataclass
-from typing import Literal
+from typing import Literal, Optional
 
 
 MatchupType = Literal["mirror", "cross"]
+DecoderBackend = Literal["opencv", "ffmpeg"]
 
 
 @dataclass
@@ -22,10 +23,29 @@ class AnalyzerParameters:
     flash_threshold: float = 24.0  # brightness delta to flag an event
     major_flash_threshold: float = 55.0  # bigger flashes = supers/whiffs
     motion_threshold: float = 4.5  # optical flow magnitude to treat as scramble
-    max_events: int = 120  # trim report noise
+    max_events: int = 120  # keep only the N most significant events (by intensity, then confidence) from the whole video
     round_length_sec: int = 40  # approximate per-round length for grouping (heuristic)
     min_event_second: float = 2.0  # ignore detections earlier than this to avoid round-start noise
     top_punished_clips_per_player: int = 2
+    prefetch_frames: int = 8  # ring buffer size for background decode (0 = decode inline)
+    decoder: DecoderBackend = "opencv"  # "ffmpeg" pipes 320x180 gray straight from the bundled binary
+    batch_frames: int = 64  # sampled frames scored per vectorized flash/motion call (1 = frame by frame)
+    cache_dir: Optional[str] = None  # per-frame signal cache; re-runs with new thresholds skip decoding
+    proxy: bool = False  # scan 320x180 gray frames from a memory-mapped proxy next to the recording (the first run writes it; frames are OpenCV-decoded)
+    proxy_stride: int = 1  # keep every Nth frame in the proxy (~4 GB per 20 min of 60fps at 1); only serves sample rates that are multiples of N
+    jobs: int = 1  # worker processes scanning keyframe-aligned segments (0 = one per core)
+    coarse_stride: int = 0  # >0 enables coarse-to-fine scanning: sweep every N frames, then rescan active windows (flashes shorter than N can be missed)
+    fine_stride: int = 1  # stride inside the windows picked by the coarse sweep (1 = every frame)
+    coarse_sensitivity: float = 0.5  # fraction of the event thresholds that marks a coarse sample as a candidate
+    packet_prefilter: bool = False  # skip regions whose compressed packet sizes show no activity (menus, idle)
+    prefilter_ratio: float = 0.25  # activity floor as a fraction of the 90th-percentile packet activity
+    skip_non_gameplay: bool = False  # drop character select, loading, pause and results screens before scanning
+    hud_template: Optional[str] = None  # gameplay screenshot whose HUD strip identifies gameplay (default: learned from the video)
+    measure_health: bool = False  # read both health bars during the scan; punish damage and round winners come from measured health
+    hud_dir: str = "CODEX_CHATGPT/output/hud"  # calibrated health bar profiles, one per resolution/capture setup
+    capture_setup: str = ""  # name of the capture setup (separate HUD profile per name)
+    max_health: int = 1000  # damage units in a full health bar (converts measured bar fractions to damage)
+    punish_window_sec: float = 2.0  # damage to the player within this long after their mistake counts as the punish
 
     def describe(self) -> str:
         """Human-readable description for logs."""
@@ -0,0 +1,252 @@
+"""Automatic HUD calibration: finds both health bars and their fill colours from early gameplay frames.
+
+The profile is saved per resolution and capture setup, so later runs load it
+instead of decoding anything.
+"""
+
+from __future__ import annotations
+
+from dataclasses import replace
+import json
+import os
+from typing import List, Optional, Tuple
+import cv2
+import numpy as np
+
+from src.frame_bus import FrameBus, FrameConsumer
+from src.gameplay_filter import GameplayClassifier, ThumbnailSampler
+from .health_timeline import HealthBarConfig
+
+# Bump when the calibration result changes meaning
+HUD_PROFILE_VERSION = 2
+
+
+class HudStripSampler(FrameConsumer):
+    """Frame bus consumer that keeps the full-resolution top strip of the listed frames."""
+
+    def __init__(self, frames: List[int], step: int, height: float = 0.2):
+        super().__init__(frames[0] if frames else 0, step=step)
+        self.wanted = set(frames)
+        self.height = height
+        self.strips: List[np.ndarray] = []
+        self.done = not frames
+
+    def consume(self, frame_number: int, frame) -> None:
+        if frame_number not in self.wanted:
+            return
+        self.strips.append(frame[: max(1, int(frame.shape[0] * self.height))].copy())
+        self.wanted.discard(frame_number)
+        self.done = not self.wanted
+
+
+def video_resolution(video_path: str) -> Optional[Tuple[int, int]]:
+    """(width, height) from the container, without decoding a frame."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        if not cap.isOpened():
+            return None
+        return int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+
+
+def hud_profile_path(cache_dir: str, resolution: Tuple[int, int], setup: str = "") -> str:
+    """Profile file for one resolution and capture setup."""
+    width, height = resolution
+    name = f"hud_profile_{width}x{height}" + (f"_{setup}" if setup else "") + ".json"
+    return os.path.join(cache_dir, name)
+
+
+def save_hud_profile(path: str, bars: Tuple[HealthBarConfig, HealthBarConfig], resolution: Tuple[int, int]) -> None:
+    """Write a (p1, p2) bar profile."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    profile = {
+        "version": HUD_PROFILE_VERSION,
+        "resolution": list(resolution),
+        "bars": [
+            {"bbox": list(bar.bbox), "hsv_low": list(bar.hsv_low), "hsv_high": list(bar.hsv_high), "anchor": bar.anchor}
+            for bar in bars
+        ],
+    }
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def load_hud_profile(path: str) -> Optional[Tuple[HealthBarConfig, HealthBarConfig]]:
+    """(p1, p2) bar configs from a saved profile, or None if missing or outdated."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            profile = json.load(f)
+        if profile.get("version") != HUD_PROFILE_VERSION:
+            return None
+        left, right = (
+            HealthBarConfig(tuple(bar["bbox"]), tuple(bar["hsv_low"]), tuple(bar["hsv_high"]), bar["anchor"])
+            for bar in profile["bars"]
+        )
+        return left, right
+    except Exception as e:
+        print(f"⚠ Ignoring unreadable HUD profile {os.path.basename(path)}: {e}")
+        return None
+
+
+class HudCalibrator:
+    """Locates the two health bars in the HUD strip of early gameplay frames.
+
+    Gameplay samples come from the GameplayClassifier over thumbnails of the
+    first search_frames frames; the top strip of up to `samples` of them is
+    read at full resolution. Per screen half, the dominant saturated hue is
+    the fill colour. The union of its masks over the samples is the whole
+    bar fill seen, so the widest long, thin component of the union is the bar
+    box, grown over the empty track when no sample showed a full bar. The
+    HSV range is fitted to the fill pixels (hue measured around the circle,
+    so a red fill gets a range wrapping through 0), and the anchor is the
+    end that stays filled most often.
+    """
+
+    def __init__(self, samples: int = 48, step: int = 6, search_frames: int = 3600, strip_height: float = 0.2,
+                 min_saturation: int = 90, min_value: int = 110, hue_margin: int = 8):
+        self.samples = samples
+        self.step = step
+        self.search_frames = search_frames
+        self.strip_height = strip_height  # fraction of the frame height searched for bars
+        self.min_saturation = min_saturation
+        self.min_value = min_value
+        self.hue_margin = hue_margin
+
+    def gameplay_frames(self, video_path: str) -> List[int]:
+        """First `samples` sampled frames labelled gameplay."""
+        sampler = ThumbnailSampler(self.step)
+        sampler.end_frame = self.search_frames  # early gameplay only; the bus stops once the window is read
+        bus = FrameBus(video_path)
+        bus.add(sampler)
+        if not bus.run() or not sampler.samples:
+            return []
+        gameplay = GameplayClassifier().classify(sampler.samples, bus.fps)
+        return [frame for (frame, _), keep in zip(sampler.samples, gameplay) if keep][: self.samples]
+
+    def calibrate(self, video_path: str) -> Optional[Tuple[HealthBarConfig, HealthBarConfig]]:
+        """(p1, p2) bar configs, or None when no bar pair is found."""
+        frames = self.gameplay_frames(video_path)
+        if not frames:
+            return None
+        sampler = HudStripSampler(frames, self.step, self.strip_height)
+        bus = FrameBus(video_path)
+        bus.add(sampler)
+        if not bus.run() or not sampler.strips:
+            return None
+        return self.find_bars(np.stack(sampler.strips))
+
+    def find_bars(self, strips: np.ndarray) -> Optional[Tuple[HealthBarConfig, HealthBarConfig]]:
+        """Bar configs from an (N, H, W, 3) stack of BGR HUD strips."""
+        count, height, width = strips.shape[:3]
+        hsv = cv2.cvtColor(strips.reshape(-1, width, 3), cv2.COLOR_BGR2HSV).reshape(strips.shape)
+        vivid = (hsv[..., 1] >= self.min_saturation) & (hsv[..., 2] >= self.min_value)
+        # The HUD is static, so the median strip shows the bar tracks without the fighters
+        median = np.median(strips, axis=0).astype(np.float32)
+        half = width // 2
+        left = self._find_bar(hsv[:, :, :half], vivid[:, :, :half], median[:, :half], 0, "left")
+        right = self._find_bar(hsv[:, :, half:], vivid[:, :, half:], median[:, half:], half, "right")
+        if left is None or right is None:
+            return None
+        return _mirror_spans(left, right, width)
+
+    def _find_bar(self, hsv: np.ndarray, vivid: np.ndarray, median: np.ndarray, x_offset: int, outer: str) -> Optional[HealthBarConfig]:
+        """Bar config for one screen half."""
+        hues = hsv[..., 0][vivid]
+        if not len(hues):
+            return None
+        peak = int(np.argmax(np.bincount(hues, minlength=180)))
+        # Hue is circular (red sits at both ends of 0..179): rotate the peak to 90 before measuring distances
+        rotated = (hsv[..., 0].astype(np.int16) - peak + 90) % 180
+        fill = vivid & (np.abs(rotated - 90) <= self.hue_margin)
+        union = fill.any(axis=0).astype(np.uint8)
+        labels, _, stats, _ = cv2.connectedComponentsWithStats(union, connectivity=8)
+        best = None
+        for label in range(1, labels):
+            x, y, w, h, area = stats[label]
+            # A health bar is a long, thin band spanning a good part of its half
+            if w < 6 * h or w < 0.2 * union.shape[1]:
+                continue
+            if best is None or area > stats[best][4]:
+                best = label
+        if best is None:
+            return None
+        x, y, w, h, _ = stats[best]
+        in_box = fill[:, y:y + h, x:x + w]
+        pixels = hsv[:, y:y + h, x:x + w][in_box]
+        hue_low, hue_high = np.percentile(rotated[:, y:y + h, x:x + w][in_box], [1, 99])
+        sat_low = np.percentile(pixels[:, 1], 1)
+        val_low = np.percentile(pixels[:, 2], 1)
+        # Rotated back, a range crossing 0 comes out with hue_low > hue_high (HealthBarConfig reads it as wrapping)
+        hsv_low = ((int(hue_low) - 4 + peak - 90) % 180, max(0, int(sat_low) - 30), max(0, int(val_low) - 40))
+        hsv_high = ((int(hue_high) + 4 + peak - 90) % 180, 255, 255)
+
+        # The anchored end is filled in every sample; the draining end only while health lasts
+        columns = in_box.mean(axis=(0, 1))
+        edge = max(1, w // 10)
+        first, last = float(columns[:edge].mean()), float(columns[-edge:].mean())
+        anchor = outer if abs(first - last) < 0.05 else ("left" if first > last else "right")
+        x0, x1 = _extend_track(median, int(x), int(x + w), int(y), int(h), anchor)
+        return HealthBarConfig((x0 + x_offset, int(y), x1 - x0, int(h)), hsv_low, hsv_high, anchor)
+
+
+def _extend_track(median: np.ndarray, x0: int, x1: int, y: int, h: int, anchor: str,
+                  tolerance: float = 12.0, max_gap: int = 2) -> Tuple[int, int]:
+    """Grow a fill span [x0, x1) over the empty bar track on its draining side.
+
+    If the samples never saw a full bar, the fill union stops short. Columns
+    past it still belong to the bar while their rows inside the band are
+    uniform and differ from the rows just above or below it.
+    """
+    height, width = median.shape[:2]
+    band = median[y:y + h]
+    outside = [median[row] for row in (y - 2, y + h + 1) if 0 <= row < height]
+    if not outside:
+        return x0, x1
+    uniform = band.std(axis=0).max(axis=1) < tolerance
+    contrast = np.max([np.abs(band.mean(axis=0) - row).max(axis=1) for row in outside], axis=0) > tolerance
+    track = uniform & contrast
+    step, column = (1, x1) if anchor == "left" else (-1, x0 - 1)
+    edge, misses = column - step, 0
+    while 0 <= column < width and misses <= max_gap:
+        if track[column]:
+            edge, misses = column, 0
+        else:
+            misses += 1
+        column += step
+    return (x0, max(x1, edge + 1)) if anchor == "left" else (min(x0, edge), x1)
+
+
+def _mirror_spans(left: HealthBarConfig, right: HealthBarConfig, width: int) -> Tuple[HealthBarConfig, HealthBarConfig]:
+    """Widen both bars to the union of each span and its mirror image (fighting game HUDs are symmetric)."""
+    lx, ly, lw, lh = left.bbox
+    rx, ry, rw, rh = right.bbox
+    if abs(ly - ry) > max(lh, rh) // 2:
+        return left, right
+    x0 = min(lx, width - (rx + rw))
+    x1 = max(lx + lw, width - rx)
+    return replace(left, bbox=(x0, ly, x1 - x0, lh)), replace(right, bbox=(width - x1, ry, x1 - x0, rh))
+
+
+def calibrate_health_bars(video_path: str, cache_dir: str, setup: str = "", refresh: bool = False,
+                          calibrator: Optional[HudCalibrator] = None) -> Optional[Tuple[HealthBarConfig, HealthBarConfig]]:
+    """Saved (p1, p2) bar configs for this recording's resolution and setup, calibrating on a miss."""
+    resolution = video_resolution(video_path)
+    if resolution is None:
+        return None
+    path = hud_profile_path(cache_dir, resolution, setup)
+    bars = None if refresh else load_hud_profile(path)
+    if bars is not None:
+        return bars
+    print(f"Calibrating HUD for {resolution[0]}x{resolution[1]}" + (f" ({setup})" if setup else "") + "...")
+    bars = (calibrator or HudCalibrator()).calibrate(video_path)
+    if bars is None:
+        print("⚠ HUD calibration found no health bar pair")
+        return None
+    save_hud_profile(path, bars, resolution)
+    for name, bar in zip(("P1", "P2"), bars):
+        print(f"  {name} bar bbox={bar.bbox} hsv={bar.hsv_low}-{bar.hsv_high} anchor={bar.anchor}")
+    return bars
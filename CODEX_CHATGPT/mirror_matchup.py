@@ -2,51 +2,155 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import replace
+import os
 from typing import Dict, List, Optional, Tuple
 import cv2
 import numpy as np
 
-from src.video_analyzer import VideoFrameAnalyzer
+from src.batch_signals import batch_flash_motion, batch_region_diffs, frame_diffs
+from src.event_selector import TopKSelector
+from src.event_table import EventTable, RowView
+from src.feature_cache import FeatureCache
+from src.ffmpeg_reader import FFmpegGrayReader
+from src.frame_archive import FrameArchive, ProxyWriter, proxy_path
+from src.frame_bus import FrameBus, FrameConsumer, merge_frame_windows, subtract_frame_windows
+from src.frame_features import FrameFeatures
+from src.gameplay_filter import GameplayClassifier, collect_thumbnails
+from src.packet_index import PacketIndex, read_packet_index
+from src.parallel_scan import default_jobs, overlap_start, plan_segments, run_segments
 from src.analysis_engine import MistakeType, RecommendationEngine
 from .config import AnalyzerParameters
+from .health_timeline import (
+    HealthBarConfig,
+    HealthTimeline,
+    HealthTimelineConsumer,
+    damage_events,
+    load_health_timeline,
+    round_results,
+    save_health_timeline,
+)
+from .hud_calibration import calibrate_health_bars
+from .player_attribution import SIDE_REGIONS, PlayerAttributor, SideActivity, source_counts
 from . import blitzcrank_knowledge as bk
 
+# Bump when the raw per-frame signals computed by the scan change meaning
+SCAN_FEATURE_VERSION = 3
+PACKET_INDEX_VERSION = 1
+GAMEPLAY_FILTER_VERSION = 1
+
+
+EVENT_DTYPE = np.dtype([
+    ("frame", np.int64),
+    ("seconds", np.float64),
+    ("timestamp", "U12"),
+    ("intensity", np.float64),
+    ("motion", np.float64),
+    ("tag", "U16"),
+    ("confidence", np.float64),
+])
+
+# Free-text columns are object dtype: rows share the same few template strings
+MISTAKE_DTYPE = np.dtype([
+    ("player", np.int64),
+    ("character", object),
+    ("player_name", object),
+    ("round", np.int64),
+    ("timestamp", "U12"),
+    ("seconds", np.float64),
+    ("title", object),
+    ("detail", object),
+    ("range_note", object),
+    ("damage_estimate", np.int64),
+    ("opponent_response", object),
+    ("punished", np.bool_),
+    ("punish_damage", np.int64),
+    ("opponent_string", object),
+    ("recommendations", object),
+    ("severity", "U8"),
+    ("impact", "U8"),
+])
+
+
+class DetectedEvent(RowView):
+    """Single flash/scramble detected in the video (a row of an EVENT_DTYPE table)."""
+
+    __slots__ = ()
+
+
+class MistakeCallout(RowView):
+    """Heuristic mistake detection for reporting (a row of a MISTAKE_DTYPE table)."""
+
+    __slots__ = ()
+
+
+class MirrorScanConsumer(FrameConsumer):
+    """Frame bus consumer that runs the mirror-match flash/motion scan.
+
+    Sampled frames are downscaled into a preallocated stack and scored
+    batch_frames at a time with one vectorized call.
+    """
+
+    def __init__(self, owner: "MirrorMatchAnalyzer", start_frame: int = 0, end_frame: Optional[int] = None,
+                 classify: bool = True, step: Optional[int] = None):
+        super().__init__(start_frame, end_frame, step or owner.params.sample_rate)
+        self.owner = owner
+        # Segment workers and coarse sweeps only collect signals; events are classified afterwards
+        self.classify = classify
+        self.batch_frames = max(1, owner.params.batch_frames)
+        # Last scored 320x180 gray frame, carried into the next batch as "prev"
+        self.prev: Optional[np.ndarray] = None
+        self.frames_seen = 0
+        self._stack: Optional[np.ndarray] = None
+        self._frame_numbers: List[int] = []
+
+    def begin(self, bus: FrameBus) -> None:
+        self.owner.fps = bus.fps or 30.0
+        self.owner.total_frames = bus.total_frames
+        self.owner.total_seconds = bus.get_video_duration()
+
+    def consume(self, frame_number: int, frame: np.ndarray) -> None:
+        self.consume_features(FrameFeatures(frame, frame_number))
+
+    def consume_features(self, features: FrameFeatures) -> None:
+        """Queue one sampled frame; a full batch is scored straight away."""
+        self.frames_seen += 1
+        gray = self.owner._downscale_gray(features)
+        if self._stack is None:
+            self._stack = np.empty((self.batch_frames,) + gray.shape, dtype=np.uint8)
+        # Copying into the stack also detaches the frame from reused decoder buffers
+        self._stack[len(self._frame_numbers)] = gray
+        self._frame_numbers.append(features.frame_number)
+        if len(self._frame_numbers) == self.batch_frames:
+            self.flush()
+
+    def flush(self) -> None:
+        """Score the queued frames."""
+        if not self._frame_numbers:
+            return
+        stack = self._stack[:len(self._frame_numbers)]
+        self.owner._scan_batch(self._frame_numbers, stack, self.prev, self.classify)
+        self.prev = stack[-1].copy()
+        self._frame_numbers = []
+
+    def finish(self) -> None:
+        self.flush()
+
+
+def _event_significance(record: tuple) -> Tuple[float, float]:
+    """Ranking used to keep the max_events most significant events (EVENT_DTYPE record tuples)."""
+    return (record[3], record[6])
 
-@dataclass
-class DetectedEvent:
-    """Single flash/scramble detected in the video."""
-
-    frame: int
-    seconds: float
-    timestamp: str
-    intensity: float
-    motion: float
-    tag: str
-    confidence: float
-
-
-@dataclass
-class MistakeCallout:
-    """Heuristic mistake detection for reporting."""
-
-    player: int
-    character: str
-    player_name: str
-    round: int
-    timestamp: str
-    seconds: float
-    title: str
-    detail: str
-    range_note: str
-    damage_estimate: int
-    opponent_response: str
-    punished: bool
-    punish_damage: int
-    opponent_string: str
-    recommendations: List[str] = field(default_factory=list)
-    severity: str = "info"
-    impact: str = "low"
+
+def _scan_segment(params: AnalyzerParameters, start_frame: int, end_frame: int, window_start: int = 0) -> List[Tuple[int, float, float, float, np.ndarray]]:
+    """Process-pool worker: raw signals for the sampled frames in [start_frame, end_frame)."""
+    analyzer = MirrorMatchAnalyzer(replace(params, cache_dir=None, jobs=1))
+    if params.proxy:
+        analyzer.proxy = analyzer._open_proxy()
+    step = max(1, params.sample_rate)
+    analyzer._scan_windows([(overlap_start(start_frame, step, window_start), end_frame)], step, classify=False)
+    # The overlap sample only served as "prev"; it produced no signal of its own
+    return [signal for signal in analyzer.signals if signal[0] >= start_frame]
 
 
 class MirrorMatchAnalyzer:
@@ -54,88 +158,498 @@ class MirrorMatchAnalyzer:
 
     def __init__(self, params: AnalyzerParameters):
         self.params = params
-        self.events: List[DetectedEvent] = []
-        self.mistakes: List[MistakeCallout] = []
+        self.events = EventTable(EVENT_DTYPE, row_type=DetectedEvent)
+        # The max_events strongest event records seen so far; self.events is filled from it after the scan
+        self.selector = TopKSelector(params.max_events, _event_significance)
+        self.mistakes = EventTable(MISTAKE_DTYPE, row_type=MistakeCallout)
         self.fps: float = 30.0
         self.total_seconds: float = 0.0
+        self.total_frames: int = 0
+        # Frames analysed per pass of the last scan (filled by the prefilter and adaptive scan)
+        self.scan_report: Optional[Dict] = None
+        # Set when extra consumers made the scan one serial OpenCV pass at sample_rate (whatever mode was configured)
+        self._serial_scan = False
+        self._packets: Optional[PacketIndex] = None
+        # Character select / loading / pause / results windows excluded from the scan
+        self.non_gameplay: List[Tuple[int, int]] = []
+        self.cache: Optional[FeatureCache] = FeatureCache(params.cache_dir) if params.cache_dir else None
+        # Memory-mapped 320x180 gray frames read instead of decoding (params.proxy)
+        self.proxy: Optional[FrameArchive] = None
+        # Raw per-sample signals: (frame, intensity, motion, brightness, SIDE_REGIONS diffs)
+        self.signals: List[Tuple[int, float, float, float, np.ndarray]] = []
+        # Per-side activity behind player attribution, and (players, sources) per event once attributed
+        self.activity: Optional[SideActivity] = None
+        self._attribution: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        # Measured health (params.measure_health): bar configs (calibrated unless set), timeline, damage and rounds
+        self.bars: Optional[Tuple[HealthBarConfig, HealthBarConfig]] = None
+        self.health: Optional[HealthTimeline] = None
+        self.damage: Optional[EventTable] = None
+        self.rounds: Optional[EventTable] = None
         self.player_names = {
             1: params.player1_name,
             2: params.player2_name,
         }
 
-    def _downscale_gray(self, frame: np.ndarray) -> np.ndarray:
-        """Downscale to speed up math-heavy operations."""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.resize(gray, (320, 180), interpolation=cv2.INTER_AREA)
-
-    def scan_video(self) -> bool:
-        """Walk the video and collect flashes + motion spikes."""
-        analyzer = VideoFrameAnalyzer(self.params.video_path)
-        if not analyzer.open_video():
+    def _downscale_gray(self, frame) -> np.ndarray:
+        """Downscale to speed up math-heavy operations (frame, luma plane or FrameFeatures)."""
+        return FrameFeatures.wrap(frame).downscaled((320, 180))
+
+    def scan_consumer(self) -> "MirrorScanConsumer":
+        """Frame bus consumer that feeds sampled frames into this analyzer."""
+        return MirrorScanConsumer(self)
+
+    def scan_video(self, consumers: Optional[List[FrameConsumer]] = None) -> bool:
+        """Walk the video and collect flashes + motion spikes.
+
+        Extra consumers (health readers, clip writers) ride on the same decode.
+        With a cache_dir set, a previous scan's raw signals are re-thresholded
+        instead of decoding again. With packet_prefilter, only the regions the
+        container's packet sizes mark as active are decoded; with
+        skip_non_gameplay, menus, loading, pause and results screens are never
+        scanned (extra consumers still see them). With proxy, frames come from
+        the recording's memory-mapped proxy; the first run writes it while scanning.
+        With measure_health, both health bars are read on the same decode
+        (or loaded from the cache) and turned into damage events and rounds.
+        Extra consumers need every frame in full BGR, so the scan then runs as
+        one serial OpenCV pass and says which configured modes it skipped.
+        """
+        health_reader = self._prepare_health()
+        if health_reader is not None:
+            consumers = list(consumers or []) + [health_reader]
+        if not consumers and self._load_cached_signals():
+            self._finish_events()
+            self._finish_health(None)
+            return True
+        windows = self._decode_windows()
+        if self.params.proxy and not consumers:
+            self.proxy = self._open_proxy()
+            if self.proxy is None:
+                # The proxy rides on a serial scan's decode; later runs read it with any scan mode
+                consumers = [ProxyWriter(self.params.video_path, stride=max(1, self.params.proxy_stride))]
+            elif not all(self.proxy.covers(windows, step) for step in self._scan_steps()):
+                print(f"Proxy stride {self.proxy.stride} does not line up with the scan strides; decoding instead.")
+                self.proxy = None
+            else:
+                print(f"Reading frames from proxy {os.path.basename(self.proxy.path)}")
+        if self.params.coarse_stride > 0 and not consumers:
+            ok = self._scan_video_adaptive(windows)
+        elif self.params.jobs != 1 and not consumers:
+            ok = self._scan_video_parallel(windows)
+        elif not consumers:
+            ok = self._scan_windows(windows, self.params.sample_rate) >= 0
+        else:
+            bypassed = self._bypassed_modes(consumers)
+            if bypassed:
+                print("Extra consumers share one serial OpenCV decode; not using " + ", ".join(bypassed) + ".")
+            self._serial_scan = True
+            bus = FrameBus(self.params.video_path, prefetch=self.params.prefetch_frames)
+            for start, end in windows:
+                bus.add(MirrorScanConsumer(self, start, end))
+            for consumer in consumers:
+                bus.add(consumer)
+            ok = bus.run()
+        if ok:
+            self._finish_events()
+            self._save_cached_signals()
+            self._finish_health(health_reader)
+        return ok
+
+    def _bypassed_modes(self, consumers: List[FrameConsumer]) -> List[str]:
+        """Configured scan modes the serial bus feeding extra consumers cannot use."""
+        params = self.params
+        modes = []
+        if params.jobs != 1:
+            modes.append(f"jobs={params.jobs}")
+        if params.coarse_stride > 0:
+            modes.append(f"coarse_stride={params.coarse_stride} (scanning at sample_rate={max(1, params.sample_rate)} instead)")
+        if params.packet_prefilter or params.skip_non_gameplay:
+            modes.append("packet_prefilter/skip_non_gameplay decode savings (the frames between windows are still decoded)")
+        if params.proxy and not any(isinstance(consumer, ProxyWriter) for consumer in consumers):
+            modes.append("proxy")
+        if params.decoder == "ffmpeg" and not params.proxy:
+            modes.append("decoder=ffmpeg")
+        return modes
+
+    def _prepare_health(self) -> Optional[HealthTimelineConsumer]:
+        """Load the cached health timeline, or a consumer that reads it during the scan (None if not needed)."""
+        if not self.params.measure_health:
+            return None
+        if self.bars is None:
+            self.bars = calibrate_health_bars(self.params.video_path, self.params.hud_dir, self.params.capture_setup)
+            if self.bars is None:
+                print("⚠ No health bars found; punish damage and round winners stay heuristic.")
+                return None
+        step = max(1, self.params.sample_rate)
+        self.health = load_health_timeline(self.cache, self.params.video_path, *self.bars, step)
+        if self.health is not None:
+            return None
+        return HealthTimelineConsumer(*self.bars, step=step, batch_frames=self.params.batch_frames)
+
+    def _finish_health(self, reader: Optional[HealthTimelineConsumer]) -> None:
+        """Turn the health timeline into damage events and rounds."""
+        if reader is not None:
+            self.health = reader.timeline
+            save_health_timeline(self.cache, self.params.video_path, self.health, *self.bars)
+        if self.health is None:
+            return
+        self.damage = damage_events(self.health)
+        self.rounds = round_results(self.health)
+        self._attribution = None
+        print(f"Measured {len(self.damage)} damage events over {len(self.rounds)} rounds from the health bars.")
+
+    def _finish_events(self) -> None:
+        """Publish the kept events in chronological order."""
+        records = self.selector.items(sort_key=lambda record: record[0])
+        self.events = EventTable.from_records(EVENT_DTYPE, records, row_type=DetectedEvent)
+        self.activity = SideActivity.from_signals(self.signals)
+        self._attribution = None
+        if self.selector.seen > len(self.events):
+            print(f"Kept the {len(self.events)} most significant of {self.selector.seen} events (max_events).")
+
+    def _cache_params(self) -> Dict:
+        """Parameters that change the raw signals (thresholds do not)."""
+        # Proxy frames are OpenCV-decoded, so proxy runs share the OpenCV signals; so do serial bus scans
+        decoder = "opencv" if self.params.proxy or self._serial_scan else self.params.decoder
+        params = {"sample_rate": max(1, self.params.sample_rate), "decoder": decoder}
+        if self.params.coarse_stride > 0 and not self._serial_scan:
+            # Adaptive scans only hold fine signals inside the windows the coarse sweep picked,
+            # and which windows those are depends on the thresholds
+            params.update(
+                coarse_stride=self.params.coarse_stride,
+                fine_stride=max(1, self.params.fine_stride),
+                coarse_sensitivity=self.params.coarse_sensitivity,
+                flash_threshold=self.params.flash_threshold,
+                motion_threshold=self.params.motion_threshold,
+            )
+        if self.params.packet_prefilter:
+            params.update(packet_prefilter=True, prefilter_ratio=self.params.prefilter_ratio)
+        if self.params.skip_non_gameplay:
+            params.update(skip_non_gameplay=True, hud_template=self.params.hud_template)
+        return params
+
+    def _scan_steps(self) -> List[int]:
+        """Frame strides the configured scan mode samples at."""
+        if self.params.coarse_stride > 0:
+            return [max(1, self.params.coarse_stride), max(1, self.params.fine_stride)]
+        return [max(1, self.params.sample_rate)]
+
+    def _open_proxy(self) -> Optional[FrameArchive]:
+        """The recording's 320x180 gray proxy for proxy_stride, if one has been written."""
+        path = proxy_path(self.params.video_path, stride=max(1, self.params.proxy_stride))
+        return FrameArchive.open(path, self.params.video_path)
+
+    def _probe_video(self) -> bool:
+        """Read fps and frame count from the container without decoding."""
+        cap = cv2.VideoCapture(self.params.video_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video: {self.params.video_path}")
             return False
-        self.fps = analyzer.fps or 30.0
-        self.total_seconds = analyzer.get_video_duration()
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        self.total_seconds = self.total_frames / self.fps if self.total_frames else 0.0
+        return True
 
-        prev_gray: Optional[np.ndarray] = None
-        cap = analyzer.cap
+    def _packet_index(self) -> Optional[PacketIndex]:
+        """Per-frame packet sizes and keyframe flags, read once and kept in the feature cache."""
+        if self._packets is None:
+            cached = self.cache.load(self.params.video_path, "packets", PACKET_INDEX_VERSION) if self.cache else None
+            if cached is not None:
+                self._packets = PacketIndex.from_columns(cached[0])
+            else:
+                self._packets = read_packet_index(self.params.video_path)
+                if self._packets is not None and self.cache is not None:
+                    self.cache.save(self.params.video_path, "packets", PACKET_INDEX_VERSION, self._packets.to_columns())
+        return self._packets
+
+    def _decode_windows(self) -> List[Tuple[int, Optional[int]]]:
+        """Frame windows worth scanning: the whole video minus pruned idle and non-gameplay regions."""
+        windows = self._prefilter_windows() if self.params.packet_prefilter else [(0, None)]
+        if not self.params.skip_non_gameplay:
+            return windows
+        self.non_gameplay = self._non_gameplay_windows()
         step = max(1, self.params.sample_rate)
-        major = self.params.major_flash_threshold
-        minor = self.params.flash_threshold
-        motion_thresh = self.params.motion_threshold
-
-        frame_idx = 0
-        while True:
-            ret, frame = cap.read()
-            if not ret:
-                break
-
-            if frame_idx % step != 0:
-                frame_idx += 1
-                continue
-
-            gray = self._downscale_gray(frame)
-            motion_score = 0.0
-            intensity = 0.0
-
-            if prev_gray is not None:
-                diff = cv2.absdiff(prev_gray, gray)
-                intensity = float(np.mean(diff))
-                # lighter-weight motion proxy: average absolute gradient
-                motion_score = float(np.mean(np.gradient(gray.astype(np.float32))))
-
-                if intensity > minor or motion_score > motion_thresh:
-                    tag = "heavy_commit" if intensity >= major else "scramble"
-                    # Heuristic grab detection: low motion but medium flash near threshold
-                    if motion_score < 0.8 and intensity > (minor + 3):
-                        tag = "grab_punish"
-                    ts_sec = frame_idx / self.fps
-                    if ts_sec < self.params.min_event_second:
-                        frame_idx += 1
-                        prev_gray = gray
-                        continue
-                    ts = self._format_timestamp(ts_sec)
-                    confidence = min(1.0, max(intensity / 100.0, 0.35))
-                    self.events.append(
-                        DetectedEvent(
-                            frame=frame_idx,
-                            seconds=ts_sec,
-                            timestamp=ts,
-                            intensity=round(intensity, 2),
-                            motion=round(motion_score, 2),
-                            tag=tag,
-                            confidence=confidence,
-                        )
-                    )
-
-            prev_gray = gray
-            frame_idx += 1
-
-            if len(self.events) > self.params.max_events:
-                break
-
-        analyzer.close()
+        kept = [
+            (start // step * step, end)
+            for start, end in subtract_frame_windows(windows, self.non_gameplay)
+            if end is not None or not self.total_frames or start < self.total_frames
+        ]
+        return merge_frame_windows(kept)
+
+    def _non_gameplay_windows(self) -> List[Tuple[int, int]]:
+        """Character select, loading, pause and results screens, classified once per recording."""
+        if not self._probe_video():
+            return []
+        params = {"hud_template": self.params.hud_template}
+        cached = self.cache.load(self.params.video_path, "gameplay", GAMEPLAY_FILTER_VERSION, **params) if self.cache else None
+        if cached is not None:
+            windows = [tuple(window) for window in cached[0]["windows"].tolist()]
+        else:
+            if self.params.hud_template:
+                classifier = GameplayClassifier.from_screenshot(self.params.hud_template)
+            else:
+                classifier = GameplayClassifier()
+            index = self._packet_index()
+            samples = collect_thumbnails(self.params.video_path, index.keyframes() if index else None)
+            windows = classifier.non_gameplay_windows(samples, self.fps, self.total_frames)
+            if self.cache is not None:
+                columns = {"windows": np.asarray(windows, dtype=np.int64).reshape(-1, 2)}
+                self.cache.save(self.params.video_path, "gameplay", GAMEPLAY_FILTER_VERSION, columns, **params)
+        skipped = sum(end - start for start, end in windows)
+        self.scan_report = {
+            **(self.scan_report or {}),
+            "non_gameplay": {"segments": len(windows), "frames": skipped, "fraction": skipped / max(1, self.total_frames)},
+        }
+        print(f"Skipping {len(windows)} non-gameplay segments ({skipped}/{self.total_frames} frames)")
+        return windows
+
+    def _prefilter_windows(self) -> List[Tuple[int, Optional[int]]]:
+        """Regions the packet-size activity curve marks as active."""
+        index = self._packet_index()
+        if index is None:
+            print("Packet prefilter unavailable; decoding the whole video.")
+            return [(0, None)]
+        step = max(1, self.params.sample_rate)
+        windows = []
+        kept = 0
+        for start, end in index.active_windows(self.params.prefilter_ratio):
+            # Snap onto the sample grid so every kept sample is one a full scan would take
+            start = start // step * step
+            kept += end - start
+            windows.append((start, None if end >= len(index) else end))
+        self.scan_report = {
+            **(self.scan_report or {}),
+            "prefilter": {"windows": len(windows), "frames": kept, "fraction": kept / max(1, len(index))},
+        }
+        print(f"Packet prefilter: {len(windows)} active windows cover {kept}/{len(index)} frames ({kept / max(1, len(index)):.1%})")
+        return windows
+
+    def _load_cached_signals(self) -> bool:
+        """Rebuild events from cached signals; returns False on a cache miss."""
+        if self.cache is None:
+            return False
+        cached = self.cache.load(self.params.video_path, "scan", SCAN_FEATURE_VERSION, **self._cache_params())
+        if cached is None:
+            return False
+        columns, meta = cached
+        self.fps = meta.get("fps", 30.0)
+        self.total_seconds = meta.get("total_seconds", 0.0)
+        self.signals = list(zip(
+            columns["frame"].tolist(),
+            columns["intensity"].tolist(),
+            columns["motion"].tolist(),
+            columns["brightness"].tolist(),
+            columns["sides"],
+        ))
+        for frame_idx, intensity, motion, *_ in self.signals:
+            self._classify_signal(frame_idx, intensity, motion)
+        print(f"Loaded {len(self.signals)} cached frame signals (no decode needed).")
+        return True
+
+    def _save_cached_signals(self) -> None:
+        if self.cache is None or not self.signals:
+            return
+        frames, intensity, motion, brightness, sides = zip(*self.signals)
+        columns = {
+            "frame": np.asarray(frames, dtype=np.int64),
+            "intensity": np.asarray(intensity, dtype=np.float64),
+            "motion": np.asarray(motion, dtype=np.float64),
+            "brightness": np.asarray(brightness, dtype=np.float32),
+            "sides": np.stack(sides).astype(np.float32),
+        }
+        meta = {"fps": self.fps, "total_seconds": self.total_seconds}
+        self.cache.save(self.params.video_path, "scan", SCAN_FEATURE_VERSION, columns, meta, **self._cache_params())
+
+    def _scan_video_parallel(self, windows: List[Tuple[int, Optional[int]]]) -> bool:
+        """Scan keyframe-aligned segments on a process pool and merge them in frame order.
+
+        Each worker re-reads the sample before its segment, so every sample
+        is diffed against the same "prev" as in a serial scan; classification
+        runs here over the merged signals, giving identical events.
+        """
+        jobs = self.params.jobs if self.params.jobs > 0 else default_jobs()
+        if not self._probe_video():
+            return False
+        total_frames = self.total_frames
+
+        index = self._packet_index()
+        keyframes = index.keyframes() if index else None
+        windows = [(start, total_frames if end is None else min(end, total_frames)) for start, end in windows]
+        active = sum(end - start for start, end in windows)
+        segment_args = []
+        for window_start, window_end in windows:
+            # Workers are shared out in proportion to each window's length
+            share = max(1, round(jobs * (window_end - window_start) / max(1, active)))
+            for start, end in plan_segments(window_start, window_end, share, self.params.sample_rate, keyframes):
+                segment_args.append((self.params, start, end, window_start))
+        print(f"Scanning {len(segment_args)} segments on {min(jobs, len(segment_args))} worker processes...")
+        results = run_segments(_scan_segment, segment_args, jobs)
+
+        self.signals = [signal for segment in results for signal in segment]
+        for frame_idx, intensity, motion, *_ in self.signals:
+            self._classify_signal(frame_idx, intensity, motion)
+        return True
+
+    def _scan_video_adaptive(self, windows: List[Tuple[int, Optional[int]]]) -> bool:
+        """Coarse-to-fine scan: sweep every coarse_stride-th frame, then rescan only the active windows.
+
+        A coarse sample is a candidate when its signals cross
+        coarse_sensitivity x the event thresholds. The span since the previous
+        coarse sample, padded by one coarse step on each side, is decoded
+        again at fine_stride and classified like a regular scan.
+        """
+        coarse_stride = max(1, self.params.coarse_stride)
+        fine_stride = max(1, self.params.fine_stride)
+        coarse = MirrorMatchAnalyzer(replace(self.params, cache_dir=None, jobs=1, coarse_stride=0))
+        coarse.proxy = self.proxy
+        coarse_frames = coarse._scan_windows(windows, coarse_stride, classify=False)
+        if coarse_frames < 0:
+            return False
+        self.fps = coarse.fps
+        self.total_frames = coarse.total_frames
+        self.total_seconds = coarse.total_seconds
+
+        flash_gate = self.params.flash_threshold * self.params.coarse_sensitivity
+        motion_gate = self.params.motion_threshold * self.params.coarse_sensitivity
+        windows = []
+        for frame_idx, intensity, motion, *_ in coarse.signals:
+            if intensity > flash_gate or motion > motion_gate:
+                start = max(0, frame_idx - 2 * coarse_stride) // fine_stride * fine_stride
+                windows.append((start, frame_idx + coarse_stride + 1))
+        # Each fine window re-reads one sample before it, so its first real sample has a "prev" as in a serial scan
+        windows = merge_frame_windows(
+            [(overlap_start(start, fine_stride), end) for start, end in merge_frame_windows(windows, gap=coarse_stride)]
+        )
+        fine_frames = self._scan_windows(windows, fine_stride) if windows else 0
+        if fine_frames < 0:
+            return False
+
+        total = max(1, self.total_frames)
+        self.scan_report = {
+            **(self.scan_report or {}),
+            "total_frames": self.total_frames,
+            "coarse": {"stride": coarse_stride, "frames": coarse_frames, "fraction": coarse_frames / total},
+            "fine": {"stride": fine_stride, "frames": fine_frames, "fraction": fine_frames / total, "windows": len(windows)},
+        }
+        print(
+            f"Adaptive scan: coarse pass decoded {coarse_frames}/{self.total_frames} frames "
+            f"({coarse_frames / total:.1%}, every {coarse_stride}); fine pass decoded {fine_frames} "
+            f"({fine_frames / total:.1%}) in {len(windows)} windows"
+        )
+        return True
+
+    def _scan_windows(self, windows: List[Tuple[int, Optional[int]]], step: int, classify: bool = True) -> int:
+        """Scan each sorted, disjoint [start, end) window at the given stride.
+
+        Returns the number of frames analysed, or -1 if the video cannot be opened.
+        """
+        if self.proxy is not None and self.proxy.covers(windows, step):
+            return self._scan_proxy(windows, step, classify)
+        consumers = [MirrorScanConsumer(self, start, end, classify, step) for start, end in windows]
+        if self.params.decoder == "ffmpeg" and not self.params.proxy:
+            for consumer in consumers:
+                if not self._scan_video_ffmpeg(consumer):
+                    return -1
+        else:
+            bus = FrameBus(self.params.video_path, prefetch=self.params.prefetch_frames)
+            for consumer in consumers:
+                bus.add(consumer)
+            if not bus.run():
+                return -1
+        return sum(consumer.frames_seen for consumer in consumers)
+
+    def _scan_proxy(self, windows: List[Tuple[int, Optional[int]]], step: int, classify: bool = True) -> int:
+        """Scan the windows straight from the memory-mapped proxy, batch_frames at a time.
+
+        Proxy frames are the same 320x180 gray images a decode would produce,
+        so the signals match an OpenCV scan exactly.
+        """
+        proxy = self.proxy
+        self.fps = proxy.fps
+        self.total_frames = proxy.total_frames
+        self.total_seconds = proxy.total_frames / proxy.fps if proxy.fps else 0.0
+        batch = max(1, self.params.batch_frames)
+        scanned = 0
+        for start, end in windows:
+            end = proxy.end_frame if end is None else min(end, proxy.end_frame)
+            frame_numbers = list(range(start, end, step))
+            prev = None
+            for i in range(0, len(frame_numbers), batch):
+                chunk = frame_numbers[i:i + batch]
+                stack = proxy.stack(chunk[0], chunk[-1] + 1, step)
+                self._scan_batch(chunk, stack, prev, classify)
+                prev = stack[-1]
+            scanned += len(frame_numbers)
+        return scanned
+
+    def _scan_video_ffmpeg(self, consumer: Optional[MirrorScanConsumer] = None) -> bool:
+        """Scan using ffmpeg-side downscaling; full-resolution frames never reach Python."""
+        reader = FFmpegGrayReader(self.params.video_path, size=(320, 180))
+        if not reader.open():
+            return False
+        consumer = consumer or self.scan_consumer()
+        consumer.begin(reader)
+        frames = reader.frames(consumer.start_frame, consumer.end_frame, consumer.step)
+        try:
+            for frame_idx, gray in frames:
+                consumer.consume_features(FrameFeatures(gray, frame_idx))
+                if consumer.done:
+                    break
+        finally:
+            frames.close()
+        consumer.finish()
         return True
 
+    def _scan_frame(self, frame_idx: int, curr, prev, classify: bool = True) -> None:
+        """Score one sampled frame against the previous sample and record spikes.
+
+        curr/prev may be frames, 320x180 gray images or FrameFeatures.
+        """
+        if prev is None:
+            return
+        gray = self._downscale_gray(curr)
+        self._scan_batch([frame_idx], gray[None], self._downscale_gray(prev), classify)
+
+    def _scan_batch(self, frame_numbers: List[int], stack: np.ndarray, prev: Optional[np.ndarray], classify: bool = True) -> None:
+        """Score a stack of sampled 320x180 gray frames in one vectorized pass and record spikes.
+
+        Each frame is diffed against the one before it (prev for the first);
+        without prev the first frame only serves as the baseline.
+        """
+        # One absdiff of the stack feeds the flash intensity and the per-side regions
+        diffs = frame_diffs(stack, prev)
+        intensity, motion, brightness = batch_flash_motion(stack, prev, diffs)
+        sides = batch_region_diffs(stack, prev, SIDE_REGIONS, diffs).astype(np.float32)
+        first = 0 if prev is not None else 1
+        signals = list(zip(
+            frame_numbers[first:],
+            intensity[first:].tolist(),
+            motion[first:].tolist(),
+            brightness[first:].tolist(),
+            sides[first:],
+        ))
+        self.signals.extend(signals)
+        if classify:
+            for frame_idx, frame_intensity, motion_score, *_ in signals:
+                self._classify_signal(frame_idx, frame_intensity, motion_score)
+
+    def _classify_signal(self, frame_idx: int, intensity: float, motion_score: float) -> None:
+        """Apply the flash/motion thresholds to one sample's raw signals."""
+        minor = self.params.flash_threshold
+        major = self.params.major_flash_threshold
+        if intensity > minor or motion_score > self.params.motion_threshold:
+            tag = "heavy_commit" if intensity >= major else "scramble"
+            # Heuristic grab detection: low motion but medium flash near threshold
+            if motion_score < 0.8 and intensity > (minor + 3):
+                tag = "grab_punish"
+            ts_sec = frame_idx / self.fps
+            if ts_sec < self.params.min_event_second:
+                return
+            ts = self._format_timestamp(ts_sec)
+            confidence = min(1.0, max(intensity / 100.0, 0.35))
+            # Plain record tuples in EVENT_DTYPE order; rows are only materialised for the kept events
+            self.selector.push((frame_idx, ts_sec, ts, round(intensity, 2), round(motion_score, 2), tag, confidence))
+
     def _timestamp_to_seconds(self, timestamp: str) -> float:
         """Convert MM:SS(.ms or :ff) timestamp to seconds."""
         try:
@@ -171,9 +685,22 @@ class MirrorMatchAnalyzer:
         ms = int((seconds - int(seconds)) * 1000)
         return f"{hours:02d}:{minutes:02d}:{secs:02d}.{ms:03d}"
 
-    def _guess_player(self, idx: int) -> int:
-        """Alternate players when we cannot fully disambiguate POV."""
-        return 1 if idx % 2 == 0 else 2
+    def _event_players(self) -> np.ndarray:
+        """Player charged with each event, from damage, health, meter and motion cues (alternating where none decides)."""
+        return self._attribute_events()[0]
+
+    def _attribute_events(self) -> Tuple[np.ndarray, np.ndarray]:
+        """(players, sources) per event, worked out once per scan."""
+        if self._attribution is None or len(self._attribution[0]) != len(self.events):
+            attributor = PlayerAttributor(
+                self.activity,
+                self.damage,
+                fps=self.fps,
+                lead=max(1, self.params.sample_rate),
+                punish_window_sec=self.params.punish_window_sec,
+            )
+            self._attribution = attributor.attribute(self.events["frame"])
+        return self._attribution
 
     def _describe_event(self, event: DetectedEvent) -> str:
         """Attach matchup-aware description to a detected spike."""
@@ -207,13 +734,31 @@ class MirrorMatchAnalyzer:
             tips.extend(bk.neutral_game_tips()[:2])
         return tips
 
-    def _damage_estimate(self, severity: str, intensity: float, motion: float, punished: bool) -> int:
-        """Coarse damage estimate scaled by visual intensity/motion and punish flag."""
-        if not punished:
-            return 0
-        base = 70 if severity == "minor" else 120
-        scaled = base + int(intensity * 2.5) + int(motion * 18)
-        return max(60, min(320, scaled))
+    def _damage_estimates(self, intensity: np.ndarray, motion: np.ndarray, base: int = 70) -> np.ndarray:
+        """Coarse punish damage per event scaled by visual intensity/motion (base 70 minor, 120 major)."""
+        scaled = base + np.trunc(intensity * 2.5).astype(np.int64) + np.trunc(motion * 18).astype(np.int64)
+        return np.clip(scaled, 60, 320)
+
+    def _measured_punish(self, frames: np.ndarray, players: np.ndarray) -> np.ndarray:
+        """Damage (max_health units) each player took from damage events starting within punish_window_sec of their event."""
+        punish = np.zeros(len(frames), dtype=np.int64)
+        window = int(self.params.punish_window_sec * self.fps)
+        # Smoothing and the sample grid can place a drop's start a sample before the event
+        lead = max(1, self.params.sample_rate)
+        for victim in (1, 2):
+            hits = self.damage[self.damage["victim"] == victim]
+            total = np.concatenate(([0.0], np.cumsum(hits["amount"])))
+            mine = players == victim
+            lo = np.searchsorted(hits["start_frame"], frames[mine] - lead, side="left")
+            hi = np.searchsorted(hits["start_frame"], frames[mine] + window, side="right")
+            punish[mine] = np.rint((total[hi] - total[lo]) * self.params.max_health).astype(np.int64)
+        return punish
+
+    def _event_rounds(self, events: EventTable) -> np.ndarray:
+        """Round number per event: measured round starts when available, else fixed-length rounds."""
+        if self.rounds is not None and len(self.rounds):
+            return np.maximum(1, np.searchsorted(self.rounds["start_frame"], events["frame"], side="right"))
+        return (events["seconds"] // self.params.round_length_sec).astype(np.int64) + 1
 
     def _range_note(self, event: DetectedEvent) -> str:
         """Guidance on spacing if we suspect a whiff."""
@@ -228,95 +773,97 @@ class MirrorMatchAnalyzer:
         if not self.events:
             return
 
-        for idx, event in enumerate(self.events):
-            if event.seconds < self.params.min_event_second:
-                continue
-            player = self._guess_player(idx)
-            title = (
-                "Over-commit without cover"
-                if event.intensity >= self.params.major_flash_threshold
-                else "Scramble / possible dropped confirm"
-            )
-            detail = self._describe_event(event)
-            severity = "minor"
-            timestamp_sec = event.seconds
-            round_num = int(timestamp_sec // self.params.round_length_sec) + 1
-            # Punish if clear commitment (major) or notable motion/flash
-            punished = True if severity == "major" or event.motion > 1.2 or event.intensity > (self.params.major_flash_threshold * 0.8) or event.tag == "grab_punish" else False
-            if punished:
-                if event.tag == "grab_punish":
-                    opponent_response = "Opponent landed a grab/command grab and took guaranteed damage."
-                    opponent_string = "Throw / Command Grab > knockdown (you were stuck until recovery)."
-                else:
-                    opponent_response = "Opponent punished the opening (jab/2L into confirm)."
-                    opponent_string = "5L (jab) > 5M (mid) > 2H (launcher) into knockdown/okizeme."
-                punish_damage = self._damage_estimate(severity, event.intensity, event.motion, True)
-            else:
-                opponent_response = "Likely scramble; limited punish observed."
-                opponent_string = "No clear string; scramble/neutral reset."
-                punish_damage = 0
-            impact = "low"
-            self.mistakes.append(
-                MistakeCallout(
-                    player=player,
-                    character="Blitzcrank",
-                    player_name=self.player_names.get(player, f"P{player}"),
-                    timestamp=event.timestamp,
-                    seconds=timestamp_sec,
-                    title=title,
-                    detail=detail,
-                    range_note=self._range_note(event),
-                    damage_estimate=self._damage_estimate(severity, event.intensity, event.motion, punished),
-                    opponent_response=opponent_response,
-                    punished=punished,
-                    punish_damage=punish_damage,
-                    opponent_string=opponent_string,
-                    recommendations=self._build_recommendations(event),
-                    severity=severity,
-                    impact=impact,
-                    round=round_num,  # type: ignore
-                )
-            )
-
-        # Re-rank severities based on top damage only
-        if self.mistakes:
-            ranked = sorted(self.mistakes, key=lambda m: m.punish_damage, reverse=True)
-            top_count = max(1, int(len(ranked) * 0.2))
-            for i, mk in enumerate(ranked):
-                if mk.punish_damage <= 0:
-                    mk.severity = "minor"
-                    mk.impact = "low"
-                elif i == 0 and mk.punish_damage >= 180:
-                    mk.severity = "critical"
-                    mk.impact = "high"
-                elif i < top_count or mk.punish_damage >= 130:
-                    mk.severity = "major"
-                    mk.impact = "medium" if mk.punish_damage < 180 else "high"
-                else:
-                    mk.severity = "minor"
-                    mk.impact = "low"
-            # Sort by severity then punish damage then time
-            severity_order = {"critical": 3, "major": 2, "minor": 1}
-            self.mistakes.sort(
-                key=lambda m: (
-                    severity_order.get(m.severity, 1) * -1,
-                    -m.punish_damage,
-                    -self._timestamp_to_seconds(m.timestamp),
-                )
-            )
+        keep = self.events["seconds"] >= self.params.min_event_second
+        events = self.events[keep]
+        players = self._event_players()[keep]
+        intensity = events["intensity"]
+        motion = events["motion"]
+        grab = events["tag"] == "grab_punish"
+        major_threshold = self.params.major_flash_threshold
+        title = np.where(
+            intensity >= major_threshold,
+            "Over-commit without cover",
+            "Scramble / possible dropped confirm",
+        )
+        round_num = self._event_rounds(events)
+        if self.damage is not None:
+            # Measured: the health the mistake-maker lost right after the event
+            punish_damage = self._measured_punish(events["frame"], players)
+            punished = punish_damage > 0
+        else:
+            # Punish if clear commitment or notable motion/flash
+            punished = (motion > 1.2) | (intensity > major_threshold * 0.8) | grab
+            punish_damage = np.where(punished, self._damage_estimates(intensity, motion), 0)
+        opponent_response = np.select(
+            [punished & grab, punished],
+            [
+                "Opponent landed a grab/command grab and took guaranteed damage.",
+                "Opponent punished the opening (jab/2L into confirm).",
+            ],
+            "Likely scramble; limited punish observed.",
+        )
+        opponent_string = np.select(
+            [punished & grab, punished],
+            [
+                "Throw / Command Grab > knockdown (you were stuck until recovery).",
+                "5L (jab) > 5M (mid) > 2H (launcher) into knockdown/okizeme.",
+            ],
+            "No clear string; scramble/neutral reset.",
+        )
+
+        # Re-rank severities based on top damage only (stable, so ties keep event order)
+        count = len(events)
+        rank = np.empty(count, dtype=np.int64)
+        rank[np.argsort(-punish_damage, kind="stable")] = np.arange(count)
+        top_count = max(1, int(count * 0.2))
+        unpunished = punish_damage <= 0
+        critical = ~unpunished & (rank == 0) & (punish_damage >= 180)
+        major = ~unpunished & ~critical & ((rank < top_count) | (punish_damage >= 130))
+        severity = np.select([critical, major], ["critical", "major"], "minor")
+        impact = np.select([critical, major & (punish_damage < 180), major], ["high", "medium", "high"], "low")
+
+        mistakes = EventTable.from_columns(
+            MISTAKE_DTYPE,
+            {
+                "player": players,
+                "character": ["Blitzcrank"] * count,
+                "player_name": [self.player_names.get(p, f"P{p}") for p in players.tolist()],
+                "round": round_num,
+                "timestamp": events["timestamp"],
+                "seconds": events["seconds"],
+                "title": title,
+                "detail": [self._describe_event(event) for event in events],
+                "range_note": [self._range_note(event) for event in events],
+                "damage_estimate": punish_damage,
+                "opponent_response": opponent_response,
+                "punished": punished,
+                "punish_damage": punish_damage,
+                "opponent_string": opponent_string,
+                "recommendations": [self._build_recommendations(event) for event in events],
+                "severity": severity,
+                "impact": impact,
+            },
+            row_type=MistakeCallout,
+        )
+        # Sort by severity then punish damage then time (all descending)
+        severity_order = np.select([critical, major], [3, 2], 1)
+        seconds = np.array([self._timestamp_to_seconds(ts) for ts in events["timestamp"].tolist()])
+        self.mistakes = mistakes.take(np.lexsort((-seconds, -punish_damage, -severity_order)))
 
     def summarize_players(self) -> Dict[int, Dict]:
         """Crude playstyle summary per player."""
         if not self.events:
             return {}
 
-        players = {1: {"events": 0}, 2: {"events": 0}}
-        for idx, event in enumerate(self.events):
-            p = self._guess_player(idx)
-            players[p]["events"] += 1
-            players[p]["big_commits"] = players[p].get("big_commits", 0) + (
-                1 if event.intensity >= self.params.major_flash_threshold else 0
-            )
+        event_players = self._event_players()
+        big_commits = self.events["intensity"] >= self.params.major_flash_threshold
+        players = {}
+        for pid in (1, 2):
+            mine = event_players == pid
+            data = {"events": int(mine.sum())}
+            if data["events"]:
+                data["big_commits"] = int(big_commits[mine].sum())
+            players[pid] = data
 
         for pid, data in players.items():
             big = data.get("big_commits", 0)
@@ -330,35 +877,41 @@ class MirrorMatchAnalyzer:
         return players
 
     def _estimate_round_winners(self, player_summary: Dict[int, Dict]) -> Dict:
-        """Heuristic round winner estimate using event density (video-only placeholder)."""
+        """Round winners from measured health, else a heuristic estimate using event density."""
+        if self.rounds is not None and len(self.rounds):
+            winners = dict(zip(self.rounds["round"].tolist(), self.rounds["winner"].tolist()))
+            return self._tally_rounds(winners, "measured")
         # With no HUD data, approximate by counting events per round per player and force at least 4 rounds.
-        round_events = {}
-        for idx, event in enumerate(self.events):
-            if event.seconds < self.params.min_event_second:
-                continue
-            rnd = int(event.seconds // self.params.round_length_sec) + 1
-            p = self._guess_player(idx)
-            round_events.setdefault(rnd, {1: 0, 2: 0})
-            round_events[rnd][p] += 1
-
-        # Ensure at least 4 rounds in the heuristic output
+        keep = self.events["seconds"] >= self.params.min_event_second
+        rounds = (self.events["seconds"][keep] // self.params.round_length_sec).astype(np.int64) + 1
+        players = self._event_players()[keep]
+
+        # Rounds with events in order of first appearance, then at least 4 rounds in the heuristic output
+        seen, first = np.unique(rounds, return_index=True)
+        order = seen[np.argsort(first)].tolist()
         total_rounds = max(4, int((self.total_seconds or 0) // self.params.round_length_sec) + 1)
-        for r in range(1, total_rounds + 1):
-            round_events.setdefault(r, {1: 0, 2: 0})
-
-        winners = {}
-        for rnd, data in round_events.items():
-            if data[1] > data[2]:
-                winners[rnd] = 1
-            elif data[2] > data[1]:
-                winners[rnd] = 2
-            else:
-                winners[rnd] = 0  # tie/unknown
-        # Overall winner guess
+        order += [r for r in range(1, total_rounds + 1) if r not in set(order)]
+
+        size = max(order) + 1
+        p1_events = np.bincount(rounds[players == 1], minlength=size)
+        p2_events = np.bincount(rounds[players == 2], minlength=size)
+        # 0 = tie/unknown
+        outcome = np.select([p1_events > p2_events, p2_events > p1_events], [1, 2], 0)
+        winners = {rnd: int(outcome[rnd]) for rnd in order}
+        return self._tally_rounds(winners, "heuristic")
+
+    def _tally_rounds(self, winners: Dict[int, int], source: str) -> Dict:
+        """Round tally and overall winner for {round: winner} (0 = tie/unknown)."""
         p1_rounds = sum(1 for w in winners.values() if w == 1)
         p2_rounds = sum(1 for w in winners.values() if w == 2)
         overall = 1 if p1_rounds > p2_rounds else 2 if p2_rounds > p1_rounds else 0
-        return {"round_winners": winners, "overall_winner": overall, "p1_rounds": p1_rounds, "p2_rounds": p2_rounds}
+        return {
+            "round_winners": winners,
+            "overall_winner": overall,
+            "p1_rounds": p1_rounds,
+            "p2_rounds": p2_rounds,
+            "source": source,
+        }
 
     def _mock_move_variety(self, player_summary: Dict[int, Dict]) -> Dict[int, List[Dict]]:
         """Placeholder move variety stats (video-only; needs telemetry to be precise)."""
@@ -382,51 +935,30 @@ class MirrorMatchAnalyzer:
             variety[pid] = counts
         return variety
 
-    def run(self) -> Dict:
+    def run(self, consumers: Optional[List[FrameConsumer]] = None) -> Dict:
         """Entry point: scan video then build high-level notes."""
-        ok = self.scan_video()
+        ok = self.scan_video(consumers)
         if not ok:
             return {"error": "Failed to open video"}
 
+        attribution = source_counts(self._attribute_events()[1])
+        print("Attributed events by " + ", ".join(f"{source}: {count}" for source, count in attribution.items()))
         self.produce_mistakes()
         player_summary = self.summarize_players()
         winners = self._estimate_round_winners(player_summary)
 
-        event_rows = [
-            {
-                "frame": e.frame,
-                "seconds": e.seconds,
-                "timestamp": e.timestamp,
-                "full_timestamp": self._format_full_timestamp(e.seconds),
-                "intensity": e.intensity,
-                "motion": e.motion,
-                "tag": e.tag,
-                "confidence": e.confidence,
-            }
-            for e in self.events
-        ]
-        mistake_rows = [
-            {
-                "player": m.player,
-                "character": m.character,
-                "player_name": m.player_name,
-                "round": m.round,
-                "timestamp": m.timestamp,
-                "seconds": m.seconds,
-                "full_timestamp": self._format_full_timestamp(m.seconds),
-                "title": m.title,
-                "detail": m.detail,
-                "range_note": m.range_note,
-                "damage_estimate": m.damage_estimate,
-                "opponent_response": m.opponent_response,
-                "punished": m.punished,
-                "punish_damage": m.punish_damage,
-                "opponent_string": m.opponent_string,
-                "recommendations": m.recommendations,
-                "severity": m.severity,
-            }
-            for m in self.mistakes
-        ]
+        event_rows = self.events.to_rows(
+            ["frame", "seconds", "timestamp", "full_timestamp", "intensity", "motion", "tag", "confidence"],
+            full_timestamp=[self._format_full_timestamp(s) for s in self.events["seconds"].tolist()],
+        )
+        mistake_rows = self.mistakes.to_rows(
+            [
+                "player", "character", "player_name", "round", "timestamp", "seconds", "full_timestamp",
+                "title", "detail", "range_note", "damage_estimate", "opponent_response", "punished",
+                "punish_damage", "opponent_string", "recommendations", "severity",
+            ],
+            full_timestamp=[self._format_full_timestamp(s) for s in self.mistakes["seconds"].tolist()],
+        )
 
         return {
             "parameters": self.params,
@@ -434,7 +966,10 @@ class MirrorMatchAnalyzer:
             "mistakes": mistake_rows,
             "player_summary": player_summary,
             "fps": self.fps,
+            "scan_report": self.scan_report,
             "winners": winners,
+            "damage_events": self.damage.to_rows() if self.damage is not None else [],
+            "attribution": attribution,
             "move_variety": self._mock_move_variety(player_summary),
             "knowledge": {
                 "unsafe_moves": bk.unsafe_on_block_moves(),
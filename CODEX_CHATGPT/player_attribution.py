@@ -0,0 +1,178 @@
+"""Player attribution: which side an event belongs to, from HUD and play-area activity around it.
+
+The scan records, for every sample, the mean frame difference inside a few
+per-side regions (health bar, meter gauge, half of the play area). Prefix
+sums over those columns make the activity in any window around an event a
+binary search and a subtraction, so attributing an event costs the same
+however long the recording is. Activity is a per-frame rate (each sample's
+diff spread over the frames since the sample before it), so serial, strided
+and adaptive scans measure the same bar draining alike.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+from src.event_table import EventTable
+
+# Fractional (x, y, w, h) regions, P1 (left) then P2 (right) for each cue:
+# health bar (the centre timer excluded), meter/Steam gauge, half of the play area
+SIDE_REGIONS = (
+    (0.0, 0.0, 0.42, 0.15),
+    (0.58, 0.0, 0.42, 0.15),
+    (0.0, 0.88, 0.3, 0.12),
+    (0.7, 0.88, 0.3, 0.12),
+    (0.0, 0.18, 0.5, 0.64),
+    (0.5, 0.18, 0.5, 0.64),
+)
+HEALTH_COLUMNS = (0, 1)
+METER_COLUMNS = (2, 3)
+MOTION_COLUMNS = (4, 5)
+
+# Why an event went to its player, strongest cue first
+ATTRIBUTION_SOURCES = ("damage", "health", "meter", "motion", "alternate")
+
+
+class SideActivity:
+    """Per-side region diffs of the sampled frames, with prefix sums for per-frame window means."""
+
+    def __init__(self, frames: np.ndarray, diffs: np.ndarray):
+        order = np.argsort(frames, kind="stable")
+        self.frames = np.asarray(frames, dtype=np.int64)[order]
+        diffs = np.asarray(diffs, dtype=np.float64).reshape(len(self.frames), -1)[order]
+        # A sample's diff spans one scan step. The first sample of a scan window was diffed against a sample
+        # re-read one step back, not the previous listed one, so the step is the spacing to the nearer neighbour.
+        spacing = np.diff(self.frames)
+        if len(spacing):
+            steps = np.minimum(np.concatenate(([spacing[0]], spacing)), np.concatenate((spacing, [spacing[-1]])))
+        else:
+            steps = np.ones(len(self.frames), dtype=np.int64)
+        # Samples without a predecessor (NaN) add nothing to a window
+        valid = ~np.isnan(diffs).any(axis=1)
+        self.sums = np.zeros((len(self.frames) + 1, diffs.shape[1]))
+        np.cumsum(np.nan_to_num(diffs), axis=0, out=self.sums[1:])
+        self.step_sums = np.concatenate(([0], np.cumsum(np.where(valid, np.maximum(1, steps), 0))))
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @classmethod
+    def from_signals(cls, signals: Sequence[tuple]) -> Optional["SideActivity"]:
+        """Activity from scan signals whose last item is the SIDE_REGIONS diff row (None without signals)."""
+        if not signals:
+            return None
+        return cls(np.array([signal[0] for signal in signals]), np.stack([signal[-1] for signal in signals]))
+
+    def window_means(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        """(len(start), columns) per-frame mean diffs over the samples with start < frame <= end.
+
+        Each sample's diff counts for the frames of its step, so a window
+        sampled every frame and one sampled every tenth frame give the same
+        rate for a steady change. Windows without samples read 0.
+        """
+        lo = np.searchsorted(self.frames, start, side="right")
+        hi = np.searchsorted(self.frames, end, side="right")
+        return (self.sums[hi] - self.sums[lo]) / np.maximum(1, self.step_sums[hi] - self.step_sums[lo])[:, None]
+
+
+class PlayerAttributor:
+    """Charges each event to the player the HUD and play area point at.
+
+    Cues in order of strength; the first that decides wins:
+    - damage: the victim of the first measured damage event starting within
+      punish_window_sec of the event (it got punished);
+    - health: without measured damage, the side whose health bar changes in
+      that window;
+    - meter: the side whose meter/Steam gauge changes within cue_window_sec
+      (it spent resources to commit);
+    - motion: the side of the play area that moves within cue_window_sec,
+      only where side assignment is known (see _motion_players).
+    A side decides when its per-frame activity exceeds `floor` and
+    `dominance` times the other side's. Events no cue decides alternate
+    between players.
+    """
+
+    def __init__(self, activity: Optional[SideActivity], damage: Optional[EventTable] = None, fps: float = 30.0,
+                 lead: int = 1, punish_window_sec: float = 2.0, cue_window_sec: float = 0.5,
+                 side_window_sec: float = 5.0, dominance: float = 1.5, floor: float = 0.15):
+        self.activity = activity if activity is not None and len(activity) else None
+        self.damage = damage
+        self.lead = lead  # frames a cue may start before the event
+        self.punish_window = int(punish_window_sec * fps)
+        self.cue_window = max(1, int(cue_window_sec * fps))
+        self.side_window = int(side_window_sec * fps)
+        self.dominance = dominance
+        self.floor = floor
+
+    def attribute(self, frames: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(players, sources) for the event frames; sources index ATTRIBUTION_SOURCES."""
+        frames = np.asarray(frames, dtype=np.int64)
+        players = np.zeros(len(frames), dtype=np.int64)
+        sources = np.full(len(frames), len(ATTRIBUTION_SOURCES) - 1, dtype=np.int64)
+
+        def apply(source: int, cue: np.ndarray) -> None:
+            undecided = (players == 0) & (cue > 0)
+            players[undecided] = cue[undecided]
+            sources[undecided] = source
+
+        if self.damage is not None:
+            apply(0, self._damage_victims(frames))
+        if self.activity is not None:
+            around = self.activity.window_means(frames - self.cue_window, frames + self.cue_window)
+            if self.damage is None:
+                # Measured damage already says who lost health; the raw bar diffs only stand in for it.
+                # Like the damage cue, the window reaches `lead` frames back, so the event's own sample counts.
+                after = self.activity.window_means(frames - self.lead, frames + self.punish_window)
+                apply(1, self._dominant(after, HEALTH_COLUMNS))
+            apply(2, self._dominant(around, METER_COLUMNS))
+            apply(3, self._motion_players(frames, self._dominant(around, MOTION_COLUMNS), players))
+        fallback = players == 0
+        players[fallback] = np.where(np.flatnonzero(fallback) % 2 == 0, 1, 2)
+        return players, sources
+
+    def _motion_players(self, frames: np.ndarray, sides: np.ndarray, players: np.ndarray) -> np.ndarray:
+        """Moving play-area sides (1 left, 2 right) as players where nearby decided events show who stands where.
+
+        Characters switch sides, so a half of the play area names no player
+        by itself. Every event a HUD cue decided whose motion also points at
+        one side is a vote: P1 on the left if the side matches the player,
+        on the right otherwise. An event takes the motion cue only when all
+        votes within side_window_sec agree (0 = unknown).
+        """
+        voters = (players > 0) & (sides > 0)
+        order = np.argsort(frames[voters], kind="stable")
+        vote_frames = frames[voters][order]
+        swapped = np.concatenate(([0], np.cumsum((sides[voters] != players[voters])[order])))
+        lo = np.searchsorted(vote_frames, frames - self.side_window, side="left")
+        hi = np.searchsorted(vote_frames, frames + self.side_window, side="right")
+        votes, swaps = hi - lo, swapped[hi] - swapped[lo]
+        known = (sides > 0) & (votes > 0) & ((swaps == 0) | (swaps == votes))
+        return np.where(known, np.where(swaps == 0, sides, 3 - sides), 0)
+
+    def _damage_victims(self, frames: np.ndarray) -> np.ndarray:
+        """Victim of the first damage event starting in [frame - lead, frame + punish_window] (0 = none)."""
+        starts = self.damage["start_frame"]
+        first = np.searchsorted(starts, frames - self.lead, side="left")
+        found = first < len(starts)
+        found[found] = starts[first[found]] <= frames[found] + self.punish_window
+        victims = np.zeros(len(frames), dtype=np.int64)
+        victims[found] = self.damage["victim"][first[found]]
+        return victims
+
+    def _dominant(self, means: np.ndarray, columns: Tuple[int, int]) -> np.ndarray:
+        """1 or 2 where one side's activity clearly exceeds the other's, else 0."""
+        # A flash, cut or camera move shows in every region alike; only activity above it is the side's own
+        shared = means.min(axis=1)
+        p1, p2 = means[:, columns[0]] - shared, means[:, columns[1]] - shared
+        return np.select(
+            [(p1 > self.floor) & (p1 > self.dominance * p2), (p2 > self.floor) & (p2 > self.dominance * p1)],
+            [1, 2],
+            0,
+        )
+
+
+def source_counts(sources: np.ndarray) -> Dict[str, int]:
+    """Events decided by each cue."""
+    counts = np.bincount(sources, minlength=len(ATTRIBUTION_SOURCES))
+    return {name: int(count) for name, count in zip(ATTRIBUTION_SOURCES, counts)}
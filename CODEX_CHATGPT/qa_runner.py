@@ -5,63 +5,51 @@ Usage:
 
 What it does:
   - Runs the analyzer with supplied params.
-  - Samples health bars shortly before and after each mistake timestamp.
-  - Estimates health delta and compares to our punish damage estimate.
+  - The analyzer reads the health timeline during its own decode pass and
+    measures punish damage from it; QA looks up the samples shortly before
+    and after each mistake timestamp in that same timeline.
+  - Compares the health delta with the punish damage.
   - Writes a QA summary JSON and CSV under CODEX_CHATGPT/output/qa/.
 
-NOTE: You must configure health bar regions/colors below to match your capture.
+Health bar regions and colours are calibrated from the first gameplay frames
+and saved per resolution/capture setup; --p1-bbox/--p2-bbox override the
+boxes and --p1-hsv/--p2-hsv the colour ranges. Only when all four are given
+is the HUD not calibrated at all.
 """
 
 import argparse
 import json
 import os
 import sys
-from dataclasses import dataclass
-from typing import Dict, Tuple, List
-import cv2
+from typing import Dict, List, Optional
 
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from CODEX_CHATGPT.config import AnalyzerParameters
+from CODEX_CHATGPT.health_timeline import HealthBarConfig
+from CODEX_CHATGPT.hud_calibration import calibrate_health_bars
 from CODEX_CHATGPT.mirror_matchup import MirrorMatchAnalyzer
 from CODEX_CHATGPT.report_builder import ensure_dir
 
 
-@dataclass
-class HealthBarConfig:
-    bbox: Tuple[int, int, int, int]  # x, y, w, h
-    hsv_low: Tuple[int, int, int]
-    hsv_high: Tuple[int, int, int]
-
-
-def estimate_health(frame, cfg: HealthBarConfig) -> float:
-    x, y, w, h = cfg.bbox
-    crop = frame[y : y + h, x : x + w]
-    hsv = cv2.cvtColor(crop, cv2.COLOR_BGR2HSV)
-    mask = cv2.inRange(hsv, cfg.hsv_low, cfg.hsv_high)
-    filled = cv2.countNonZero(mask)
-    total = mask.size
-    if total == 0:
-        return 0.0
-    return filled / total
-
-
-def sample_health(video_path: str, seconds: float, fps: float, cfg_left: HealthBarConfig, cfg_right: HealthBarConfig) -> Dict[str, float]:
-    cap = cv2.VideoCapture(video_path)
-    if not cap.isOpened():
-        return {"p1": 0.0, "p2": 0.0}
-    frame_idx = max(0, int(seconds * fps))
-    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-    ret, frame = cap.read()
-    if not ret:
-        cap.release()
-        return {"p1": 0.0, "p2": 0.0}
-    h1 = estimate_health(frame, cfg_left)
-    h2 = estimate_health(frame, cfg_right)
-    cap.release()
-    return {"p1": h1, "p2": h2}
+def _bar_override(bar: Optional[HealthBarConfig], bbox: str, hsv: str, anchor: str) -> Optional[HealthBarConfig]:
+    """A bar config with the command-line box and/or HSV range swapped in (None if neither source gives both)."""
+    if bbox:
+        box = tuple(map(int, bbox.split(",")))
+    elif bar is not None:
+        box = bar.bbox
+    else:
+        return None
+    if hsv:
+        values = tuple(map(int, hsv.split(",")))
+        low, high = values[:3], values[3:]
+    elif bar is not None:
+        low, high = bar.hsv_low, bar.hsv_high
+    else:
+        return None
+    return HealthBarConfig(box, low, high, bar.anchor if bar is not None else anchor)
 
 
 def run_qa(video: str, args) -> Dict:
@@ -74,23 +62,37 @@ def run_qa(video: str, args) -> Dict:
         major_flash_threshold=args.major_flash_threshold,
         motion_threshold=args.motion_threshold,
         max_events=args.max_events,
+        cache_dir=args.cache_dir or None,
+        measure_health=True,
+        hud_dir=args.hud_dir,
+        capture_setup=args.capture_setup,
     )
+    # Health bar configs: the calibrated profile for this capture, with explicit boxes/colours taking precedence
+    explicit = all((args.p1_bbox, args.p2_bbox, args.p1_hsv, args.p2_hsv))
+    bars = None if explicit else calibrate_health_bars(video, args.hud_dir, args.capture_setup, refresh=args.recalibrate)
+    calibrated_left, calibrated_right = bars or (None, None)
+    left_bar = _bar_override(calibrated_left, args.p1_bbox, args.p1_hsv, "left")
+    right_bar = _bar_override(calibrated_right, args.p2_bbox, args.p2_hsv, "right")
+    if left_bar is None or right_bar is None:
+        raise SystemExit("HUD calibration failed; pass --p1-bbox/--p2-bbox and --p1-hsv/--p2-hsv for this capture.")
+
+    # The analyzer reads the health timeline on its own decode pass (or from the cache) and measures punishes from it
     analyzer = MirrorMatchAnalyzer(params)
+    analyzer.bars = (left_bar, right_bar)
     result = analyzer.run()
+    health = analyzer.health
+    if health is None:
+        raise SystemExit("No health timeline was read; check the video and HUD profile.")
     mistakes = result.get("mistakes", [])
     fps = result.get("fps", 30.0)
 
-    # Health bar configs (edit to your capture)
-    left_bar = HealthBarConfig(bbox=tuple(map(int, args.p1_bbox.split(","))), hsv_low=(20, 50, 180), hsv_high=(40, 255, 255))
-    right_bar = HealthBarConfig(bbox=tuple(map(int, args.p2_bbox.split(","))), hsv_low=(20, 50, 180), hsv_high=(40, 255, 255))
-
     qa_rows: List[Dict] = []
     for mk in mistakes:
         sec = mk.get("seconds", 0.0)
         pre = max(0.0, sec - args.health_pre)
         post = sec + args.health_post
-        pre_h = sample_health(video, pre, fps, left_bar, right_bar)
-        post_h = sample_health(video, post, fps, left_bar, right_bar)
+        pre_h = health.lookup(pre, fps)
+        post_h = health.lookup(post, fps)
         delta_p1 = pre_h["p1"] - post_h["p1"]
         delta_p2 = pre_h["p2"] - post_h["p2"]
         qa_rows.append({
@@ -133,10 +135,16 @@ if __name__ == "__main__":
     parser.add_argument("--major-flash-threshold", type=float, default=60.0)
     parser.add_argument("--motion-threshold", type=float, default=4.5)
     parser.add_argument("--max-events", type=int, default=80)
-    parser.add_argument("--p1-bbox", default="50,20,300,20", help="x,y,w,h for P1 health bar")
-    parser.add_argument("--p2-bbox", default="530,20,300,20", help="x,y,w,h for P2 health bar")
+    parser.add_argument("--p1-bbox", default="", help="x,y,w,h for P1 health bar (default: calibrated from the video)")
+    parser.add_argument("--p2-bbox", default="", help="x,y,w,h for P2 health bar (default: calibrated from the video)")
+    parser.add_argument("--p1-hsv", default="", help="h,s,v,h,s,v low and high HSV for the P1 fill (default: from the HUD profile)")
+    parser.add_argument("--p2-hsv", default="", help="h,s,v,h,s,v low and high HSV for the P2 fill (default: from the HUD profile)")
+    parser.add_argument("--hud-dir", default=os.path.join("CODEX_CHATGPT", "output", "hud"), help="where calibrated HUD profiles are kept")
+    parser.add_argument("--capture-setup", default="", help="name for this capture setup (separate HUD profile per name)")
+    parser.add_argument("--recalibrate", action="store_true", help="recalibrate the HUD even if a profile exists")
     parser.add_argument("--health-pre", type=float, default=0.5, help="seconds before mistake to sample health")
     parser.add_argument("--health-post", type=float, default=1.5, help="seconds after mistake to sample health")
+    parser.add_argument("--cache-dir", default=os.path.join("CODEX_CHATGPT", "output", "cache"), help="per-frame signal cache ('' to disable)")
     args = parser.parse_args()
 
     outputs = run_qa(args.video, args)
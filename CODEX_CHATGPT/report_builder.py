@@ -60,6 +60,19 @@ def build_html_report(
     mistakes: List[Dict] = result.get("mistakes", [])
     knowledge: Dict = result.get("knowledge", {})
     player_summary: Dict = result.get("player_summary", {})
+    winner_source = result.get("winners", {}).get("source", "heuristic")
+    winner_note = (
+        "Round winners are measured from the health bars (HUD)."
+        if winner_source == "measured"
+        else "Round winners are estimated from activity density (no HUD data)."
+    )
+    attribution = result.get("attribution", {})
+    attribution_note = (
+        "Events per attribution cue (alternate = no cue decided): "
+        + ", ".join(f"{source} {count}" for source, count in attribution.items() if count)
+        if attribution
+        else ""
+    )
     def rel_link(path_str: str) -> str:
         """Return path relative to output_dir for stable local links."""
         try:
@@ -210,6 +223,7 @@ def build_html_report(
       <li>P1 ({player1}): {player_summary.get(1,{}).get('style','Unknown')} | spikes={player_summary.get(1,{}).get('events',0)} | big_commits={player_summary.get(1,{}).get('big_commits',0)}</li>
       <li>P2 ({player2}): {player_summary.get(2,{}).get('style','Unknown')} | spikes={player_summary.get(2,{}).get('events',0)} | big_commits={player_summary.get(2,{}).get('big_commits',0)}</li>
     </ul>
+    <p style="font-size:12px;color:#9ea3aa;">{attribution_note}</p>
   </div>
 
   <div class="panel">
@@ -231,13 +245,13 @@ def build_html_report(
   </div>
 
   <div class="panel">
-    <h3>Round Results (heuristic)</h3>
+    <h3>Round Results ({winner_source})</h3>
     <ul>
       {''.join(f"<li>Round {rnd}: Winner = {'P1 '+player1 if win==1 else 'P2 '+player2 if win==2 else 'Tie/Unknown'}</li>" for rnd, win in result.get('winners',{}).get('round_winners', {}).items())}
     </ul>
-    <p><strong>Round Tally (heuristic):</strong> P1 {result.get('winners',{}).get('p1_rounds',0)} - P2 {result.get('winners',{}).get('p2_rounds',0)}</p>
-    <p><strong>Overall (heuristic):</strong> { 'P1 '+player1 if result.get('winners',{}).get('overall_winner',0)==1 else 'P2 '+player2 if result.get('winners',{}).get('overall_winner',0)==2 else 'Tie/Unknown' }</p>
-    <p style="font-size:12px;color:#9ea3aa;">Round winners are estimated from activity density (no HUD data).</p>
+    <p><strong>Round Tally ({winner_source}):</strong> P1 {result.get('winners',{}).get('p1_rounds',0)} - P2 {result.get('winners',{}).get('p2_rounds',0)}</p>
+    <p><strong>Overall ({winner_source}):</strong> { 'P1 '+player1 if result.get('winners',{}).get('overall_winner',0)==1 else 'P2 '+player2 if result.get('winners',{}).get('overall_winner',0)==2 else 'Tie/Unknown' }</p>
+    <p style="font-size:12px;color:#9ea3aa;">{winner_note}</p>
   </div>
 
   <div class="panel">
@@ -334,8 +348,9 @@ def build_pdf_report(result: Dict, output_dir: str, player1: str, player2: str)
     winners = result.get("winners", {})
     rw = winners.get("round_winners", {})
     ow = winners.get("overall_winner", 0)
+    source = winners.get("source", "heuristic")
     if rw:
-        lines.append("Round Results (heuristic):")
+        lines.append(f"Round Results ({source}):")
         for rnd, win in rw.items():
             if win == 1:
                 lines.append(f"  Round {rnd}: P1 {player1}")
@@ -343,9 +358,9 @@ def build_pdf_report(result: Dict, output_dir: str, player1: str, player2: str)
                 lines.append(f"  Round {rnd}: P2 {player2}")
             else:
                 lines.append(f"  Round {rnd}: Tie/Unknown")
-    lines.append(f"Round tally (heuristic): P1 {winners.get('p1_rounds',0)} - P2 {winners.get('p2_rounds',0)}")
+    lines.append(f"Round tally ({source}): P1 {winners.get('p1_rounds',0)} - P2 {winners.get('p2_rounds',0)}")
     if ow:
-        lines.append(f"Overall (heuristic): {'P1 '+player1 if ow==1 else 'P2 '+player2}")
+        lines.append(f"Overall ({source}): {'P1 '+player1 if ow==1 else 'P2 '+player2}")
     lines.append(f"Unsafe: {knowledge.get('unsafe_moves','')[:6]}")
     lines.append(f"Safe pressure: {knowledge.get('safe_pressure','')}")
     lines.append(f"Punishes: {knowledge.get('preferred_punishes','')}")
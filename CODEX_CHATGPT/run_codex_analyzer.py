@@ -11,7 +11,7 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from CODEX_CHATGPT.config import AnalyzerParameters
-from CODEX_CHATGPT.mirror_matchup import MirrorMatchAnalyzer, MistakeCallout
+from CODEX_CHATGPT.mirror_matchup import MirrorMatchAnalyzer
 from CODEX_CHATGPT import blitzcrank_knowledge as bk
 from CODEX_CHATGPT.report_builder import (
     build_html_report,
@@ -129,6 +129,23 @@ def main() -> None:
     parser.add_argument("--major-flash-threshold", type=float, default=55.0)
     parser.add_argument("--motion-threshold", type=float, default=4.5)
     parser.add_argument("--max-events", type=int, default=120)
+    parser.add_argument("--decoder", choices=["opencv", "ffmpeg"], default="opencv", help="ffmpeg decodes straight to 320x180 gray (faster on 1080p+)")
+    parser.add_argument("--cache-dir", default=os.path.join("CODEX_CHATGPT", "output", "cache"), help="per-frame signal cache ('' to disable)")
+    parser.add_argument("--prefetch", type=int, default=8, help="frames decoded ahead on a background thread (0 = off)")
+    parser.add_argument("--batch-frames", type=int, default=64, help="sampled frames scored per vectorized flash/motion batch")
+    parser.add_argument("--proxy", action="store_true", help="read frames from a memory-mapped 320x180 gray proxy next to the video (written on first use)")
+    parser.add_argument("--proxy-stride", type=int, default=1, help="keep every Nth frame in the proxy to bound its size")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes for segment-parallel scanning (0 = one per core)")
+    parser.add_argument("--coarse-stride", type=int, default=0, help="coarse-to-fine scan: sweep every N frames, then decode only active windows (0 = off)")
+    parser.add_argument("--fine-stride", type=int, default=1, help="stride inside active windows when --coarse-stride is set")
+    parser.add_argument("--packet-prefilter", action="store_true", help="decode only regions whose packet sizes show activity (prunes menus/idle time)")
+    parser.add_argument("--prefilter-ratio", type=float, default=0.25, help="activity floor for --packet-prefilter, relative to the 90th percentile")
+    parser.add_argument("--skip-non-gameplay", action="store_true", help="exclude menus, loading, pause and results screens from the scan")
+    parser.add_argument("--hud-template", default=None, help="gameplay screenshot used as the HUD template for --skip-non-gameplay")
+    parser.add_argument("--measure-health", action="store_true", help="read the health bars (auto-calibrated) for measured punish damage and round winners")
+    parser.add_argument("--hud-dir", default=os.path.join("CODEX_CHATGPT", "output", "hud"), help="where calibrated HUD profiles are kept")
+    parser.add_argument("--capture-setup", default="", help="name for this capture setup (separate HUD profile per name)")
+    parser.add_argument("--max-health", type=int, default=1000, help="damage units in a full health bar")
     parser.add_argument("--top-mistakes", type=int, default=12)
     parser.add_argument("--outdir", default=os.path.join("CODEX_CHATGPT", "output"))
     parser.add_argument("--player1-name", default="Player 1")
@@ -159,6 +176,23 @@ def main() -> None:
         motion_threshold=args.motion_threshold,
         max_events=args.max_events,
         round_length_sec=args.round_length,
+        prefetch_frames=args.prefetch,
+        decoder=args.decoder,
+        batch_frames=args.batch_frames,
+        cache_dir=args.cache_dir or None,
+        proxy=args.proxy,
+        proxy_stride=args.proxy_stride,
+        jobs=args.jobs,
+        coarse_stride=args.coarse_stride,
+        fine_stride=args.fine_stride,
+        packet_prefilter=args.packet_prefilter,
+        prefilter_ratio=args.prefilter_ratio,
+        skip_non_gameplay=args.skip_non_gameplay,
+        hud_template=args.hud_template,
+        measure_health=args.measure_health,
+        hud_dir=args.hud_dir,
+        capture_setup=args.capture_setup,
+        max_health=args.max_health,
     )
 
     print(f"Running analyzer with: {params.describe()}")
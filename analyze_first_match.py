@@ -227,21 +227,21 @@ def run_first_analysis():
     
     print("\nExtracting instant replay clips for mistakes...")
     
+    clip_requests = []
     for idx, mistake in enumerate(mistakes_data, 1):
         # Convert timestamp to frame range (capture 3.5 seconds before and after mistake for full context)
         mistake_frame = timestamp_to_frames(mistake["timestamp"], fps)
         start_frame = max(0, mistake_frame - int(3.5 * fps))  # 3.5 seconds before (captures setup)
         end_frame = min(total_frames, mistake_frame + int(3.5 * fps))  # 3.5 seconds after (captures full punishment)
         
-        # Extract video clip (function now returns path string or empty string)
         clip_filename = f"mistake_{idx}_{mistake['timestamp'].replace(':', '')}.mp4"
-        clip_path = os.path.join(clips_dir, clip_filename)
-        
-        extracted_path = session.analyzer.extract_video_clip(start_frame, end_frame, clip_path)
-        if extracted_path:  # Will be non-empty string if successful
-            mistake["video_clip_path"] = extracted_path
-        else:
-            mistake["video_clip_path"] = ""
+        clip_requests.append((start_frame, end_frame, os.path.join(clips_dir, clip_filename)))
+    
+    # All replays come out of one forward pass over the video
+    extracted_paths = session.analyzer.extract_video_clips(clip_requests)
+    for idx, (mistake, extracted_path) in enumerate(zip(mistakes_data, extracted_paths), 1):
+        mistake["video_clip_path"] = extracted_path
+        if not extracted_path:
             print(f"  ⚠ Warning: Could not extract clip for mistake {idx}")
     
     for mistake in mistakes_data:
@@ -8,11 +8,41 @@ __author__ = "2XKO Analyzer Team"
 __description__ = "Fighting game video analysis tool for 2XKO"
 
 from . import frame_data
+from . import frame_reader
+from . import frame_bus
+from . import ffmpeg_reader
+from . import frame_features
+from . import batch_signals
+from . import motion_engine
+from . import hitstop
+from . import fingerprint
+from . import feature_cache
+from . import frame_archive
+from . import packet_index
+from . import parallel_scan
+from . import gameplay_filter
+from . import event_selector
+from . import event_table
 from . import video_analyzer
 from . import analysis_engine
 
 __all__ = [
     "frame_data",
+    "frame_reader",
+    "frame_bus",
+    "ffmpeg_reader",
+    "frame_features",
+    "batch_signals",
+    "motion_engine",
+    "hitstop",
+    "fingerprint",
+    "feature_cache",
+    "frame_archive",
+    "packet_index",
+    "parallel_scan",
+    "gameplay_filter",
+    "event_selector",
+    "event_table",
     "video_analyzer", 
     "analysis_engine"
 ]
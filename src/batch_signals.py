@@ -0,0 +1,103 @@
+"""
+Batch Frame Signals
+Flash intensity, motion and brightness for a whole stack of downscaled gray frames in one vectorized call
+"""
+
+import cv2
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+# (first row, (n, H, W) uint8 absolute differences) pieces covering rows first..first+n of a stack
+FrameDiffs = List[Tuple[int, np.ndarray]]
+
+
+def _frame_sums(stack: np.ndarray) -> np.ndarray:
+    """Exact per-frame pixel sums of an (N, H, W) uint8 stack"""
+    flat = stack.reshape(len(stack), -1)
+    # uint32 is exact (and twice as fast as uint64) while 255 * pixels fits
+    dtype = np.uint32 if 255 * flat.shape[1] < 2 ** 32 else np.uint64
+    return flat.sum(axis=1, dtype=dtype).astype(np.float64)
+
+
+def _region_sums(region: np.ndarray) -> np.ndarray:
+    """Exact per-frame pixel sums of an (N, h, w) uint8 view, without copying a strided crop"""
+    dtype = np.uint32 if 255 * region.shape[1] * region.shape[2] < 2 ** 32 else np.uint64
+    return region.sum(axis=(1, 2), dtype=dtype).astype(np.float64)
+
+
+def gradient_means(stack: np.ndarray) -> np.ndarray:
+    """np.mean(np.gradient(frame)) for every frame of an (N, H, W) stack
+
+    The mean of central differences telescopes, so only the two outermost
+    rows and columns on each side contribute: per line the sum is
+    (3*f[-1] - f[-2] - 3*f[0] + f[1]) / 2. That is O(H + W) per frame
+    instead of two full float gradient images.
+    """
+    count, height, width = stack.shape
+    if height < 3 or width < 3:
+        return np.array([np.mean(np.gradient(frame.astype(np.float64))) for frame in stack])
+
+    def edge_sum(first, second, second_last, last):
+        total = 3.0 * last.astype(np.float64) - second_last - 3.0 * first.astype(np.float64) + second
+        return total.reshape(count, -1).sum(axis=1) / 2.0
+
+    rows = edge_sum(stack[:, 0], stack[:, 1], stack[:, -2], stack[:, -1])
+    cols = edge_sum(stack[:, :, 0], stack[:, :, 1], stack[:, :, -2], stack[:, :, -1])
+    return (rows + cols) / (2.0 * height * width)
+
+
+def frame_diffs(stack: np.ndarray, prev: Optional[np.ndarray] = None) -> FrameDiffs:
+    """Absolute difference of every frame of an (N, H, W) uint8 stack with the one before it
+
+    Row i compares frame i with frame i - 1 (prev for the first; without
+    prev row 0 is left out). Rows 1.. and row 0 come from separate diff
+    buffers, so the stack-sized one is never copied. Compute this once per
+    batch and hand it to batch_flash_motion and batch_region_diffs.
+    """
+    stack = np.ascontiguousarray(stack)
+    count, height, width = stack.shape
+    parts = []
+    if count > 1:
+        # cv2.absdiff over the stack viewed as one tall image avoids a widening numpy subtraction
+        parts.append((1, cv2.absdiff(stack[:-1].reshape(-1, width), stack[1:].reshape(-1, width)).reshape(count - 1, height, width)))
+    if count and prev is not None:
+        parts.append((0, cv2.absdiff(prev, stack[0])[None]))
+    return parts
+
+
+def batch_flash_motion(stack: np.ndarray, prev: Optional[np.ndarray] = None,
+                       diffs: Optional[FrameDiffs] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-frame (intensity, motion, brightness) arrays for an (N, H, W) uint8 stack
+
+    intensity[i] is the mean absolute difference between frame i and frame
+    i - 1; prev is the frame before stack[0] (NaN intensity when omitted).
+    motion is the mean gradient and brightness the mean luma. The stack can
+    be any uint8 array: a preallocated batch buffer, a ring buffer slice or
+    a memory-mapped proxy. diffs is frame_diffs(stack, prev) if already computed.
+    """
+    stack = np.ascontiguousarray(stack)
+    count, height, width = stack.shape
+    pixels = height * width
+    intensity = np.full(count, np.nan)
+    for first, diff in frame_diffs(stack, prev) if diffs is None else diffs:
+        intensity[first:first + len(diff)] = _frame_sums(diff) / pixels
+    return intensity, gradient_means(stack), _frame_sums(stack) / pixels
+
+
+def batch_region_diffs(stack: np.ndarray, prev: Optional[np.ndarray],
+                       regions: Sequence[Tuple[float, float, float, float]],
+                       diffs: Optional[FrameDiffs] = None) -> np.ndarray:
+    """(N, len(regions)) mean absolute frame differences inside fractional (x, y, w, h) regions
+
+    One absdiff over the whole stack (frame_diffs, or the diffs passed in)
+    serves every region; row i compares frame i with frame i - 1 (prev for
+    the first, NaN without it).
+    """
+    count, height, width = stack.shape
+    means = np.full((count, len(regions)), np.nan)
+    for column, (x, y, w, h) in enumerate(regions):
+        y0, y1 = int(y * height), int((y + h) * height)
+        x0, x1 = int(x * width), int((x + w) * width)
+        for first, diff in frame_diffs(stack, prev) if diffs is None else diffs:
+            means[first:first + len(diff), column] = _region_sums(diff[:, y0:y1, x0:x1]) / max(1, (y1 - y0) * (x1 - x0))
+    return means
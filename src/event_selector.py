@@ -0,0 +1,53 @@
+"""
+Top-K Event Selector
+Keeps the K most significant events of a stream in a bounded min-heap
+"""
+
+import heapq
+import itertools
+from typing import Any, Callable, List, Optional
+
+
+class TopKSelector:
+    """Streaming top-K selection: O(log K) per offered item and O(K) memory
+
+    key(item) returns the item's significance (any comparable, e.g. a tuple).
+    The heap root is always the weakest kept item, so a new item only has to
+    beat that one. On equal significance the earlier item is kept.
+    """
+
+    def __init__(self, k: int, key: Callable[[Any], Any]):
+        self.k = max(0, k)
+        self.key = key
+        self.seen = 0
+        self._heap: List[tuple] = []
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, item: Any) -> bool:
+        """Offer an item; returns True if it is kept (for now)"""
+        self.seen += 1
+        if self.k == 0:
+            return False
+        # Later items sort lower on ties, so they are evicted first
+        entry = (self.key(item), -next(self._order), item)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+            return True
+        if entry[:2] <= self._heap[0][:2]:
+            return False
+        heapq.heapreplace(self._heap, entry)
+        return True
+
+    def items(self, sort_key: Optional[Callable[[Any], Any]] = None) -> List[Any]:
+        """Kept items, most significant first unless sort_key is given"""
+        if sort_key is not None:
+            return sorted((entry[2] for entry in self._heap), key=sort_key)
+        return [entry[2] for entry in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
+
+    def clear(self):
+        """Drop every kept item"""
+        self._heap.clear()
+        self.seen = 0
@@ -0,0 +1,175 @@
+"""
+Columnar Event Table
+Numpy structured-array storage for detected events and mistakes, with lightweight row views
+"""
+
+import numpy as np
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Type, Union
+
+
+class RowView:
+    """Attribute access to one table row; reads and writes go straight to the columns
+
+    Row views hold no data of their own, so handing them around never copies
+    an event. Subclass (with __slots__ = ()) to give a table's rows a name.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table: "EventTable", index: int):
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_index", index)
+
+    def __getattr__(self, name: str) -> Any:
+        if name not in self._table.fields:
+            raise AttributeError(name)
+        value = self._table.data[name][self._index]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def __setattr__(self, name: str, value: Any):
+        if name not in self._table.fields:
+            raise AttributeError(name)
+        self._table.data[name][self._index] = value
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Plain dict copy of the row"""
+        return {name: getattr(self, name) for name in self._table.fields}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.as_dict()})"
+
+
+class EventTable:
+    """Growable table of fixed-dtype rows backed by one numpy structured array
+
+    Columns come back as array views (table["intensity"]), so sorting,
+    filtering and aggregation are vectorized; iterating yields RowView
+    objects. Free-text fields can use object dtype to share template strings.
+    """
+
+    def __init__(self, dtype: Union[np.dtype, list], capacity: int = 0, row_type: Type[RowView] = RowView):
+        self.dtype = np.dtype(dtype)
+        self.fields = self.dtype.names
+        self.row_type = row_type
+        self._buf = np.zeros(max(0, capacity), dtype=self.dtype)
+        self._size = 0
+
+    @classmethod
+    def from_records(cls, dtype, records: Sequence[tuple], row_type: Type[RowView] = RowView) -> "EventTable":
+        """Build from tuples in dtype field order"""
+        table = cls(dtype, row_type=row_type)
+        table._buf = np.array(list(records), dtype=table.dtype) if len(records) else np.zeros(0, dtype=table.dtype)
+        table._size = len(table._buf)
+        return table
+
+    @classmethod
+    def from_columns(cls, dtype, columns: Dict[str, Any], row_type: Type[RowView] = RowView) -> "EventTable":
+        """Build from equal-length column arrays (missing fields are zero-filled)"""
+        lengths = {len(values) for values in columns.values()}
+        size = lengths.pop() if lengths else 0
+        table = cls(dtype, capacity=size, row_type=row_type)
+        for name, values in columns.items():
+            column = table._buf[name]
+            if column.dtype == object:
+                # Element-wise, so list values (e.g. recommendations) stay lists and
+                # numpy strings become plain str
+                if isinstance(values, np.ndarray):
+                    values = values.tolist()
+                for index, value in enumerate(values):
+                    column[index] = value
+            else:
+                column[:] = values
+        table._size = size
+        return table
+
+    def _with_data(self, data: np.ndarray) -> "EventTable":
+        table = EventTable(self.dtype, row_type=self.row_type)
+        table._buf = data
+        table._size = len(data)
+        return table
+
+    @property
+    def data(self) -> np.ndarray:
+        """The live structured array (a view, not a copy)"""
+        return self._buf[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[RowView]:
+        for index in range(self._size):
+            yield self.row_type(self, index)
+
+    def __getitem__(self, key):
+        """table["col"] -> column view, table[i] -> row view, table[mask/indices] -> new table"""
+        if isinstance(key, str):
+            return self.data[key]
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += self._size
+            if not 0 <= key < self._size:
+                raise IndexError(key)
+            return self.row_type(self, int(key))
+        return self._with_data(self.data[key].copy())
+
+    def append(self, **values) -> RowView:
+        """Add one row from keyword fields (missing fields are zero-filled)"""
+        if self._size == len(self._buf):
+            grown = np.zeros(max(16, 2 * len(self._buf)), dtype=self.dtype)
+            grown[:self._size] = self._buf[:self._size]
+            self._buf = grown
+        row = self._buf[self._size]
+        for name, value in values.items():
+            row[name] = value
+        self._size += 1
+        return self.row_type(self, self._size - 1)
+
+    def sort(self, *fields: str, descending: bool = False) -> "EventTable":
+        """New table stably sorted by fields (first field is the primary key)"""
+        if not self._size or not fields:
+            return self._with_data(self.data.copy())
+        keys = [self.data[name] for name in reversed(fields)]
+        if descending:
+            # Negated ranks reverse the order but keep equal rows in their original order
+            keys = [-_rank(values) for values in keys]
+        return self.take(np.lexsort(keys))
+
+    def take(self, indices) -> "EventTable":
+        """New table with the rows at indices, in that order"""
+        return self._with_data(self.data[np.asarray(indices, dtype=np.intp)])
+
+    def where(self, **equals) -> "EventTable":
+        """New table with the rows whose fields equal the given values"""
+        mask = np.ones(self._size, dtype=bool)
+        for name, value in equals.items():
+            mask &= self.data[name] == value
+        return self[mask]
+
+    def count_by(self, field: str) -> Dict[Any, int]:
+        """Rows per distinct value of field"""
+        values, counts = np.unique(self.data[field], return_counts=True)
+        return dict(zip(values.tolist(), counts.tolist()))
+
+    def sum_by(self, field: str, by: str) -> Dict[Any, float]:
+        """Sum of field per distinct value of by"""
+        keys, inverse = np.unique(self.data[by], return_inverse=True)
+        sums = np.bincount(inverse, weights=self.data[field].astype(np.float64), minlength=len(keys))
+        return dict(zip(keys.tolist(), sums.tolist()))
+
+    def to_rows(self, fields: Optional[List[str]] = None, **extra_columns) -> List[Dict[str, Any]]:
+        """Plain dict rows (Python scalars) for JSON and report builders
+
+        extra_columns adds computed per-row values; list them in fields to
+        control where they appear.
+        """
+        fields = list(fields) if fields is not None else list(self.fields) + list(extra_columns)
+        columns = [
+            list(extra_columns[name]) if name in extra_columns else self.data[name].tolist()
+            for name in fields
+        ]
+        return [dict(zip(fields, values)) for values in zip(*columns)] if fields else []
+
+
+def _rank(values: np.ndarray) -> np.ndarray:
+    """Dense integer ranks, so any sortable column (including strings) can be negated"""
+    return np.unique(values, return_inverse=True)[1]
@@ -0,0 +1,64 @@
+"""
+Feature Cache
+Persists raw per-frame signals on disk so threshold changes never require a rescan
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+
+try:
+    from .fingerprint import video_fingerprint
+except ImportError:
+    from fingerprint import video_fingerprint
+
+
+class FeatureCache:
+    """Compact .npz store of named per-frame signal columns
+
+    Entries are keyed by the video fingerprint, a signal-set name, the
+    producer's feature version and any parameters that change the raw
+    signals (e.g. sample rate). Detection thresholds are deliberately not
+    part of the key: they are re-applied to the cached signals.
+    """
+
+    def __init__(self, cache_dir: str, full_hash: bool = False):
+        self.cache_dir = cache_dir
+        # Opt-in whole-file hash for the video fingerprint
+        self.full_hash = full_hash
+
+    def path_for(self, video_path: str, name: str, version: int, **params) -> str:
+        """Cache file path for one signal set"""
+        param_key = json.dumps(params, sort_keys=True, default=str)
+        param_hash = hashlib.sha1(param_key.encode("utf-8")).hexdigest()[:10]
+        filename = f"{video_fingerprint(video_path, self.full_hash)}_{name}_v{version}_{param_hash}.npz"
+        return os.path.join(self.cache_dir, filename)
+
+    def load(self, video_path: str, name: str, version: int, **params) -> Optional[Tuple[Dict[str, np.ndarray], Dict]]:
+        """Return (columns, meta) for a cached signal set, or None on a miss"""
+        try:
+            path = self.path_for(video_path, name, version, **params)
+        except OSError:
+            return None
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                columns = {key: data[key] for key in data.files if key != "__meta__"}
+                meta = json.loads(str(data["__meta__"])) if "__meta__" in data.files else {}
+        except Exception as e:
+            print(f"⚠ Ignoring unreadable feature cache {os.path.basename(path)}: {e}")
+            return None
+        return columns, meta
+
+    def save(self, video_path: str, name: str, version: int, columns: Dict[str, np.ndarray], meta: Optional[Dict] = None, **params) -> str:
+        """Write a signal set; returns the cache file path"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path_for(video_path, name, version, **params)
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, __meta__=np.array(json.dumps(meta or {})), **columns)
+        os.replace(tmp_path, path)
+        return path
@@ -0,0 +1,139 @@
+"""
+FFmpeg Pipe Decoder
+Decode backend that lets the bundled ffmpeg binary hand over downscaled grayscale or the native luma plane, so BGR frames never reach Python
+"""
+
+import subprocess
+import cv2
+import numpy as np
+from typing import Iterator, Optional, Tuple
+import os
+
+
+def ffmpeg_available() -> bool:
+    """Return True if the imageio_ffmpeg binary can be located"""
+    try:
+        import imageio_ffmpeg
+        imageio_ffmpeg.get_ffmpeg_exe()
+        return True
+    except Exception:
+        return False
+
+
+class FFmpegGrayReader:
+    """Streams scale=WxH,format=gray frames from an ffmpeg pipe into reused numpy buffers
+
+    With size=None frames come out at native resolution, i.e. the decoder's
+    luma (Y) plane with no colour conversion at all.
+    """
+
+    def __init__(self, video_path: str, size: Optional[Tuple[int, int]] = (320, 180), buffers: int = 2):
+        self.video_path = video_path
+        self.size = size
+        self.width, self.height = size if size else (0, 0)
+        # Yielded frames stay valid for (buffers - 1) further iterations
+        self.buffers = max(1, buffers)
+        self.fps = 0.0
+        self.total_frames = 0
+        self.frames_decoded = 0
+        self._proc: Optional[subprocess.Popen] = None
+
+    def open(self) -> bool:
+        """Read container metadata; frames are decoded lazily by frames()"""
+        if not os.path.exists(self.video_path):
+            print(f"Error: Video file not found: {self.video_path}")
+            return False
+        if not ffmpeg_available():
+            print("Error: imageio_ffmpeg is not installed - cannot use the ffmpeg decoder")
+            return False
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video: {self.video_path}")
+            return False
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if self.size is None:
+            self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        return True
+
+    def get_video_duration(self) -> float:
+        """Get video duration in seconds"""
+        if self.total_frames == 0 or self.fps == 0:
+            return 0
+        return self.total_frames / self.fps
+
+    def _command(self, start_frame: int, end_frame: Optional[int], step: int):
+        import imageio_ffmpeg
+
+        seek = []
+        if start_frame > 0 and self.fps > 0:
+            # Input seek lands half a frame early so decoding resumes exactly at start_frame;
+            # select's n then counts from there
+            seek = ["-ss", f"{(start_frame - 0.5) / self.fps:.6f}"]
+            offset = 0
+        else:
+            offset = start_frame
+        # select runs before scale, so unsampled frames are dropped before any pixel work
+        select = f"gte(n\\,{offset})*not(mod(n-{offset}\\,{step}))"
+        if end_frame is not None:
+            select += f"*lt(n\\,{end_frame - start_frame + offset})"
+        vf = f"select={select}"
+        if self.size is not None:
+            vf += f",scale={self.width}:{self.height}:flags=area"
+        vf += ",format=gray"
+        return [
+            imageio_ffmpeg.get_ffmpeg_exe(),
+            "-loglevel", "error",
+            "-nostdin",
+            *seek,
+            "-i", self.video_path,
+            "-an", "-sn",
+            "-vf", vf,
+            "-vsync", "0",
+            "-f", "rawvideo",
+            "-pix_fmt", "gray",
+            "-",
+        ]
+
+    def frames(self, start_frame: int = 0, end_frame: Optional[int] = None, step: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame_number, gray) for every step-th frame in [start_frame, end_frame)"""
+        step = max(1, step)
+        frame_size = self.width * self.height
+        bufs = np.empty((self.buffers, self.height, self.width), dtype=np.uint8)
+        self._proc = subprocess.Popen(
+            self._command(start_frame, end_frame, step),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=frame_size * 4,
+        )
+        frame_num = start_frame
+        slot = 0
+        try:
+            while end_frame is None or frame_num < end_frame:
+                buf = bufs[slot]
+                view = memoryview(buf.reshape(-1))
+                filled = 0
+                while filled < frame_size:
+                    n = self._proc.stdout.readinto(view[filled:])
+                    if not n:
+                        return
+                    filled += n
+                self.frames_decoded += 1
+                yield frame_num, buf
+                frame_num += step
+                slot = (slot + 1) % self.buffers
+        finally:
+            self.close()
+
+    def close(self):
+        """Terminate the ffmpeg process"""
+        if self._proc is None:
+            return
+        if self._proc.poll() is None:
+            self._proc.kill()
+        self._proc.stdout.close()
+        self._proc.wait()
+        self._proc = None
+
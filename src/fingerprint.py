@@ -0,0 +1,69 @@
+"""
+Recording Fingerprint
+Stable content key for multi-GB recordings without hashing the whole file
+"""
+
+import hashlib
+import os
+import cv2
+from typing import Dict, Tuple
+
+# Bytes hashed per sampled range
+CHUNK_SIZE = 64 * 1024
+# Evenly spaced ranges between the head and tail chunks
+MIDDLE_CHUNKS = 3
+
+_memo: Dict[Tuple[str, int, int, bool], str] = {}
+
+
+def _container_info(video_path: str) -> str:
+    """Frame count and fps from the container header (no frame is decoded)"""
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        return "unreadable"
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.release()
+    return f"{frames}@{fps:.3f}"
+
+
+def chunk_offsets(size: int, chunk_size: int = CHUNK_SIZE, middle_chunks: int = MIDDLE_CHUNKS):
+    """Start offsets of the byte ranges hashed for a file of the given size"""
+    if size <= chunk_size * (middle_chunks + 2):
+        return [0]
+    offsets = [0]
+    for i in range(1, middle_chunks + 1):
+        offsets.append(size * i // (middle_chunks + 1))
+    offsets.append(size - chunk_size)
+    return offsets
+
+
+def video_fingerprint(video_path: str, full_hash: bool = False) -> str:
+    """Content fingerprint for a recording
+
+    Combines file size, container frame count/fps and hashes of the head,
+    tail and a few evenly spaced byte ranges, so it costs a handful of small
+    reads regardless of file size. Renaming or copying the file keeps the
+    same fingerprint. full_hash=True hashes every byte instead (slow, but
+    immune to edits that leave every sampled range untouched).
+    """
+    stat = os.stat(video_path)
+    memo_key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns, full_hash)
+    if memo_key in _memo:
+        return _memo[memo_key]
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{stat.st_size}|{_container_info(video_path)}".encode("utf-8"))
+    with open(video_path, "rb") as f:
+        if full_hash:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                digest.update(block)
+        else:
+            small = stat.st_size <= CHUNK_SIZE * (MIDDLE_CHUNKS + 2)
+            for offset in chunk_offsets(stat.st_size):
+                f.seek(offset)
+                digest.update(f.read(stat.st_size if small else CHUNK_SIZE))
+
+    fingerprint = ("f" if full_hash else "s") + digest.hexdigest()
+    _memo[memo_key] = fingerprint
+    return fingerprint
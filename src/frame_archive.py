@@ -0,0 +1,224 @@
+"""
+Frame Archive
+Memory-mapped proxy of a recording's downscaled frames, so re-analyses read pixels instead of decoding H.264
+"""
+
+import json
+import os
+import cv2
+import numpy as np
+from typing import Iterator, Optional, Sequence, Tuple
+
+try:
+    from .fingerprint import video_fingerprint
+    from .frame_bus import FrameBus, FrameConsumer
+    from .frame_features import FrameFeatures
+except ImportError:
+    from fingerprint import video_fingerprint
+    from frame_bus import FrameBus, FrameConsumer
+    from frame_features import FrameFeatures
+
+# Bump when the proxy layout or pixel pipeline changes
+ARCHIVE_VERSION = 1
+
+
+def proxy_path(video_path: str, size: Tuple[int, int] = (320, 180), color: bool = False, stride: int = 1,
+               crop: Optional[Tuple[float, float, float, float]] = None) -> str:
+    """Proxy file next to the recording; the name encodes everything that changes its pixels"""
+    width, height = size
+    tag = f"{width}x{height}_{'bgr' if color else 'gray'}_s{max(1, stride)}"
+    if crop:
+        tag += "_crop" + "-".join(f"{value:g}" for value in crop)
+    return f"{os.path.splitext(video_path)[0]}.proxy_{tag}.npy"
+
+
+def proxy_bytes(frame_count: int, size: Tuple[int, int] = (320, 180), color: bool = False, stride: int = 1,
+                crop: Optional[Tuple[float, float, float, float]] = None) -> int:
+    """Disk size of a proxy (about 4 GB for 20 minutes of 60fps 320x180 gray at stride 1)"""
+    height, width = _crop_shape(size, crop)
+    frames = -(-frame_count // max(1, stride))
+    return frames * height * width * (3 if color else 1)
+
+
+def _crop_bounds(size: Tuple[int, int], crop: Optional[Tuple[float, float, float, float]]) -> Tuple[int, int, int, int]:
+    """Pixel rows/cols (y0, y1, x0, x1) of a fractional (x, y, w, h) crop of the downscaled frame"""
+    width, height = size
+    if not crop:
+        return 0, height, 0, width
+    x, y, w, h = crop
+    return int(y * height), int((y + h) * height), int(x * width), int((x + w) * width)
+
+
+def _crop_shape(size: Tuple[int, int], crop: Optional[Tuple[float, float, float, float]]) -> Tuple[int, int]:
+    y0, y1, x0, x1 = _crop_bounds(size, crop)
+    return y1 - y0, x1 - x0
+
+
+class ProxyWriter(FrameConsumer):
+    """Frame bus consumer that writes every stride-th frame, downscaled (and cropped), to a .npy memmap
+
+    The frame is first downscaled to size exactly like the scan does
+    (FrameFeatures.downscaled for gray, area resize for BGR), then the
+    fractional (x, y, w, h) crop is cut out of it, so proxy pixels are
+    bit-identical to what the detectors would have computed from the decode.
+    Stride and crop are the size controls. The file is written under a
+    temporary name and only appears, with its .json sidecar, once complete.
+    """
+
+    def __init__(self, video_path: str, size: Tuple[int, int] = (320, 180), color: bool = False, stride: int = 1,
+                 crop: Optional[Tuple[float, float, float, float]] = None, path: Optional[str] = None,
+                 start_frame: int = 0, end_frame: Optional[int] = None):
+        super().__init__(start_frame, end_frame, stride)
+        self.video_path = video_path
+        self.size = tuple(size)
+        self.color = color
+        self.crop = tuple(crop) if crop else None
+        self.path = path or proxy_path(video_path, self.size, color, stride, self.crop)
+        self.fps = 0.0
+        self.total_frames = 0
+        self.frames_written = 0
+        self._data: Optional[np.memmap] = None
+        self._bounds = _crop_bounds(self.size, self.crop)
+
+    def begin(self, bus: FrameBus):
+        self.fps = bus.fps or 30.0
+        self.total_frames = bus.total_frames
+        end = self.total_frames if self.end_frame is None else min(self.end_frame, self.total_frames)
+        count = len(range(self.start_frame, max(self.start_frame, end), self.step))
+        height, width = _crop_shape(self.size, self.crop)
+        shape = (count, height, width, 3) if self.color else (count, height, width)
+        self._data = np.lib.format.open_memmap(self.path + ".tmp", mode="w+", dtype=np.uint8, shape=shape)
+        print(f"Writing frame proxy {os.path.basename(self.path)} ({count} frames, {self._data.nbytes / 1e9:.2f} GB)")
+
+    def consume(self, frame_number: int, frame):
+        index = (frame_number - self.start_frame) // self.step
+        if self._data is None or index >= len(self._data):
+            return
+        self._data[index] = self.prepare(frame)
+        self.frames_written = max(self.frames_written, index + 1)
+
+    def prepare(self, frame) -> np.ndarray:
+        """Downscale and crop one frame (BGR, luma plane or FrameFeatures) the way the proxy stores it"""
+        features = FrameFeatures.wrap(frame)
+        if self.color:
+            if features.frame is None or features.frame.ndim != 3:
+                raise ValueError("Colour proxies need BGR frames")
+            small = cv2.resize(features.frame, self.size, interpolation=cv2.INTER_AREA)
+        else:
+            small = features.downscaled(self.size)
+        y0, y1, x0, x1 = self._bounds
+        return small[y0:y1, x0:x1]
+
+    def finish(self):
+        if self._data is None:
+            return
+        self._data.flush()
+        del self._data
+        self._data = None
+        meta_path = self.path + ".json"
+        # Drop the old sidecar first so a stale one never describes the new frames
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        os.replace(self.path + ".tmp", self.path)
+        meta = {
+            "version": ARCHIVE_VERSION,
+            "fingerprint": video_fingerprint(self.video_path),
+            "fps": self.fps,
+            "total_frames": self.total_frames,
+            "start_frame": self.start_frame,
+            "stride": self.step,
+            "size": list(self.size),
+            "color": self.color,
+            "crop": list(self.crop) if self.crop else None,
+            # The container's frame count can overstate the decodable frames
+            "frames": self.frames_written,
+            # finish() runs after the last decodable frame, so an open-ended proxy is whole
+            "complete": self.end_frame is None,
+        }
+        with open(meta_path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+
+class FrameArchive:
+    """Read side of a proxy: frames come straight from the memory map, without decoding or copying
+
+    Archive row i holds source frame start_frame + i * stride.
+    """
+
+    def __init__(self, path: str, meta: dict):
+        self.path = path
+        self.meta = meta
+        self.fps: float = meta["fps"]
+        self.total_frames: int = meta["total_frames"]
+        self.start_frame: int = meta["start_frame"]
+        self.stride: int = meta["stride"]
+        self.data = np.load(path, mmap_mode="r")[:meta["frames"]]
+
+    @classmethod
+    def open(cls, path: str, video_path: Optional[str] = None) -> Optional["FrameArchive"]:
+        """Open a proxy, or None if it is missing, unreadable, outdated or made from another recording"""
+        meta_path = path + ".json"
+        if not (os.path.exists(path) and os.path.exists(meta_path)):
+            return None
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != ARCHIVE_VERSION:
+                return None
+            if video_path is not None and meta.get("fingerprint") != video_fingerprint(video_path):
+                print(f"⚠ Ignoring stale frame proxy {os.path.basename(path)} (recording changed)")
+                return None
+            return cls(path, meta)
+        except Exception as e:
+            print(f"⚠ Ignoring unreadable frame proxy {os.path.basename(path)}: {e}")
+            return None
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def end_frame(self) -> int:
+        """One past the last source frame the archive can serve"""
+        return self.start_frame + len(self.data) * self.stride
+
+    @property
+    def complete(self) -> bool:
+        """True when the archive runs through the last decodable frame of the recording"""
+        return bool(self.meta.get("complete"))
+
+    def covers(self, windows: Sequence[Tuple[int, Optional[int]]], step: int) -> bool:
+        """True if every sampled frame of the [start, end) windows at step is in the archive"""
+        if step % self.stride:
+            return False
+        for start, end in windows:
+            if start < self.start_frame or (start - self.start_frame) % self.stride:
+                return False
+            if end is None and not self.complete:
+                return False
+            if end is not None and min(end, self.total_frames) > self.end_frame:
+                return False
+        return True
+
+    def stack(self, start_frame: int, end_frame: Optional[int] = None, step: Optional[int] = None) -> np.ndarray:
+        """Memmap view of the frames start_frame, start_frame + step, ... before end_frame"""
+        step = step or self.stride
+        first = (start_frame - self.start_frame) // self.stride
+        last = len(self.data) if end_frame is None else max(first, -(-(end_frame - self.start_frame) // self.stride))
+        return self.data[first:last:step // self.stride]
+
+    def frames(self, start_frame: int = 0, end_frame: Optional[int] = None, step: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame_number, frame) like a reader; frames are read-only memmap views"""
+        step = step or self.stride
+        for i, frame in enumerate(self.stack(start_frame, end_frame, step)):
+            yield start_frame + i * step, frame
+
+
+def write_proxy(video_path: str, **kwargs) -> Optional[FrameArchive]:
+    """Decode the recording once and export a proxy (see ProxyWriter for the options)"""
+    writer = ProxyWriter(video_path, **kwargs)
+    bus = FrameBus(video_path)
+    bus.add(writer)
+    if not bus.run():
+        return None
+    return FrameArchive.open(writer.path, video_path)
@@ -0,0 +1,255 @@
+"""
+Frame Bus
+Decodes a recording once and hands every frame to registered consumers
+"""
+
+import cv2
+import numpy as np
+from typing import Iterator, List, Optional, Tuple
+import os
+import queue
+
+try:
+    from .frame_reader import PrefetchFrameReader, StridedFrameReader
+except ImportError:
+    from frame_reader import PrefetchFrameReader, StridedFrameReader
+
+
+def merge_frame_windows(windows: List[Tuple[int, Optional[int]]], gap: int = 0) -> List[Tuple[int, Optional[int]]]:
+    """Sort [start, end) frame windows and merge any that overlap or sit within gap frames
+
+    An end of None means "to the end of the video".
+    """
+    merged: List[Tuple[int, Optional[int]]] = []
+    for start, end in sorted(windows, key=lambda w: w[0]):
+        if merged:
+            last_start, last_end = merged[-1]
+            if last_end is None:
+                continue
+            if start <= last_end + gap:
+                merged[-1] = (last_start, None if end is None else max(last_end, end))
+                continue
+        merged.append((start, end))
+    return merged
+
+
+def subtract_frame_windows(windows: List[Tuple[int, Optional[int]]], remove: List[Tuple[int, Optional[int]]]) -> List[Tuple[int, Optional[int]]]:
+    """Parts of the [start, end) windows that no window in remove covers
+
+    An end of None means "to the end of the video".
+    """
+    remove = merge_frame_windows(remove)
+    result: List[Tuple[int, Optional[int]]] = []
+    for start, end in merge_frame_windows(windows):
+        cursor: Optional[int] = start
+        for cut_start, cut_end in remove:
+            if end is not None and cut_start >= end:
+                break
+            if cut_end is not None and cut_end <= cursor:
+                continue
+            if cut_start > cursor:
+                result.append((cursor, cut_start))
+            if cut_end is None:
+                cursor = None
+                break
+            cursor = cut_end
+        if cursor is not None and (end is None or cursor < end):
+            result.append((cursor, end))
+    return result
+
+
+class FrameConsumer:
+    """Base class for any stage that receives decoded frames from a FrameBus
+
+    Subclasses override consume() and optionally begin()/finish(). The
+    start_frame/end_frame/step window tells the bus which frames the
+    consumer needs; subclasses that narrow wants() must keep next_wanted()
+    in agreement. Set self.done = True to stop receiving frames early.
+    """
+
+    def __init__(self, start_frame: int = 0, end_frame: Optional[int] = None, step: int = 1):
+        self.start_frame = max(0, int(start_frame))
+        self.end_frame = end_frame
+        self.step = max(1, int(step))
+        self.done = False
+
+    def wants(self, frame_number: int) -> bool:
+        """Return True if this consumer needs the given frame"""
+        if self.done or frame_number < self.start_frame:
+            return False
+        if self.end_frame is not None and frame_number >= self.end_frame:
+            return False
+        return (frame_number - self.start_frame) % self.step == 0
+
+    def next_wanted(self, frame_number: int) -> Optional[int]:
+        """First frame at or after frame_number this consumer needs, or None"""
+        if self.done:
+            return None
+        frame_num = max(frame_number, self.start_frame)
+        offset = (frame_num - self.start_frame) % self.step
+        if offset:
+            frame_num += self.step - offset
+        if self.end_frame is not None and frame_num >= self.end_frame:
+            return None
+        return frame_num
+
+    def finished_at(self, frame_number: int) -> bool:
+        """Return True once no frame at or after frame_number is needed"""
+        return self.done or (self.end_frame is not None and frame_number >= self.end_frame)
+
+    def begin(self, bus: "FrameBus"):
+        """Called once before the first frame is dispatched"""
+        pass
+
+    def consume(self, frame_number: int, frame: np.ndarray):
+        """Handle one decoded BGR frame
+
+        The frame may live in a reused prefetch buffer; copy it to keep it
+        past this call.
+        """
+        raise NotImplementedError
+
+    def finish(self):
+        """Called once after the last frame has been dispatched"""
+        pass
+
+
+class FrameBus:
+    """Single-decode engine shared by detectors, health readers and clip writers"""
+
+    def __init__(self, video_path: str, seek_gap: int = 300, prefetch: int = 0):
+        self.video_path = video_path
+        # Gaps longer than this are crossed with a forward seek instead of grab()
+        self.seek_gap = seek_gap
+        # Ring buffer size for background decode; 0 decodes on the calling thread
+        self.prefetch = prefetch
+        self.consumers: List[FrameConsumer] = []
+        self.fps = 0.0
+        self.total_frames = 0
+        self.width = 0
+        self.height = 0
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+
+    def add(self, consumer: FrameConsumer) -> FrameConsumer:
+        """Register a consumer and return it for chaining"""
+        self.consumers.append(consumer)
+        return consumer
+
+    def get_video_duration(self) -> float:
+        """Get video duration in seconds"""
+        if self.total_frames == 0 or self.fps == 0:
+            return 0
+        return self.total_frames / self.fps
+
+    def _windows(self) -> List[Tuple[int, Optional[int]]]:
+        """Merged frame windows that cover every registered consumer"""
+        windows = []
+        for c in self.consumers:
+            end = c.end_frame
+            if self.total_frames:
+                end = self.total_frames if end is None else min(end, self.total_frames)
+            if end is None or c.start_frame < end:
+                windows.append((c.start_frame, end))
+        return merge_frame_windows(windows, gap=self.seek_gap)
+
+    def run(self) -> bool:
+        """Decode the recording once and dispatch each frame to its consumers
+
+        Consumer windows are sorted and merged; the bus seeks forward to each
+        merged window and reads through it, so every frame is decoded at most
+        once and the file is never re-opened.
+        """
+        if not self.consumers:
+            return True
+        if not os.path.exists(self.video_path):
+            print(f"Error: Video file not found: {self.video_path}")
+            return False
+
+        cap = cv2.VideoCapture(self.video_path)
+        if not cap.isOpened():
+            print(f"Error: Could not open video: {self.video_path}")
+            return False
+
+        self.fps = cap.get(cv2.CAP_PROP_FPS)
+        self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        for consumer in self.consumers:
+            consumer.begin(self)
+
+        reader = StridedFrameReader(cap, seek_gap=self.seek_gap)
+        # The schedule is planned here; the decode side only walks snapshots of the consumer windows,
+        # and learns about consumers that stopped early through the retired queue
+        plan = self._plan()
+        retired: "queue.Queue[int]" = queue.Queue()
+        targets = self._targets(self._windows(), [copy for _, copy in plan], retired)
+        # A producer thread only pays off when decode and analysis can overlap on separate cores
+        if self.prefetch > 0 and (os.cpu_count() or 1) > 1:
+            frames = PrefetchFrameReader(reader, capacity=self.prefetch).frames(targets)
+        else:
+            frames = self._decode(reader, targets)
+
+        try:
+            for frame_num, frame in frames:
+                for consumer in self.consumers:
+                    if consumer.wants(frame_num):
+                        consumer.consume(frame_num, frame)
+                # Consumers that set done are only seen here, on the dispatching thread
+                for index, (consumer, copy) in enumerate(plan):
+                    if consumer.done and copy is not None:
+                        retired.put(index)
+                        plan[index] = (consumer, None)
+                if all(consumer.finished_at(frame_num + 1) for consumer in self.consumers):
+                    break
+        finally:
+            frames.close()
+            cap.release()
+
+        self.frames_decoded = reader.frames_decoded
+        self.frames_skipped = reader.frames_skipped
+        for consumer in self.consumers:
+            consumer.finish()
+        return True
+
+    def _plan(self) -> List[Tuple[FrameConsumer, Optional[FrameConsumer]]]:
+        """(consumer, plain copy of its frame window) for each live consumer; the copies belong to the decode side"""
+        return [(c, FrameConsumer(c.start_frame, c.end_frame, c.step)) for c in self.consumers if not c.done]
+
+    @staticmethod
+    def _targets(windows: List[Tuple[int, Optional[int]]], plan: List[FrameConsumer],
+                 retired: "queue.Queue[int]") -> Iterator[int]:
+        """Frame numbers some planned consumer needs, in decode order
+
+        Walks each merged window and jumps straight to the nearest
+        next_wanted() frame, so unsampled frames are never retrieved. Only
+        the plan's copies are read, so this may run on the producer thread;
+        indices arriving on `retired` mark copies whose consumer stopped early.
+        """
+        active = list(plan)
+        for start, end in windows:
+            frame_num = start
+            while active:
+                while not retired.empty():
+                    plan[retired.get()].done = True
+                targets = [c.next_wanted(frame_num) for c in active]
+                targets = [t for t in targets if t is not None]
+                if not targets:
+                    break
+                frame_num = min(targets)
+                if end is not None and frame_num >= end:
+                    break
+                yield frame_num
+                frame_num += 1
+                active = [c for c in active if not c.finished_at(frame_num)]
+            if not active:
+                return
+
+    def _decode(self, reader: StridedFrameReader, targets: Iterator[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Decode targets on the calling thread"""
+        for frame_num in targets:
+            frame = reader.read_at(frame_num)
+            if frame is None:
+                return
+            yield frame_num, frame
@@ -0,0 +1,104 @@
+"""
+Frame Features
+Per-frame wrapper that computes gray, HSV, downscaled and pyramid views lazily, once per frame
+"""
+
+import cv2
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Union
+
+
+def to_luma(frame: np.ndarray) -> np.ndarray:
+    """Return a single-channel luma image; 2-D frames (gray or a decoder Y plane) pass through untouched"""
+    if frame.ndim == 2:
+        return frame
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+
+class FrameFeatures:
+    """Memoized views of one decoded frame, shared by every detector that looks at it
+
+    Detectors take either a raw frame or a FrameFeatures; wrap() turns the
+    former into the latter. A scan loop builds one FrameFeatures per sampled
+    frame and carries it into the next iteration as "prev", so its gray
+    image and downscales are never recomputed.
+    """
+
+    def __init__(self, frame: np.ndarray, frame_number: int = -1):
+        self.frame: Optional[np.ndarray] = frame
+        self.frame_number = frame_number
+        self._gray: Optional[np.ndarray] = None
+        self._hsv: Optional[np.ndarray] = None
+        self._brightness: Optional[float] = None
+        self._small: Dict[Tuple[int, int], np.ndarray] = {}
+        self._pyramid: List[np.ndarray] = []
+
+    @classmethod
+    def wrap(cls, frame: Union["FrameFeatures", np.ndarray, None]) -> Optional["FrameFeatures"]:
+        """Return frame unchanged if it already is a FrameFeatures, else wrap it"""
+        if frame is None or isinstance(frame, FrameFeatures):
+            return frame
+        return cls(frame)
+
+    def _raw(self) -> np.ndarray:
+        if self.frame is None:
+            raise ValueError("Raw frame was released by detach(); only cached features are available")
+        return self.frame
+
+    @property
+    def gray(self) -> np.ndarray:
+        """Full-resolution luma"""
+        if self._gray is None:
+            self._gray = to_luma(self._raw())
+        return self._gray
+
+    @property
+    def hsv(self) -> np.ndarray:
+        """Full-resolution HSV (BGR frames only)"""
+        if self._hsv is None:
+            self._hsv = cv2.cvtColor(self._raw(), cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    @property
+    def brightness(self) -> float:
+        """Mean luma"""
+        if self._brightness is None:
+            self._brightness = float(np.mean(self.gray))
+        return self._brightness
+
+    def downscaled(self, size: Tuple[int, int] = (320, 180)) -> np.ndarray:
+        """Gray image resized to (width, height) with area interpolation"""
+        small = self._small.get(size)
+        if small is None:
+            gray = self.gray
+            if (gray.shape[1], gray.shape[0]) == size:
+                small = gray
+            else:
+                small = cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+            self._small[size] = small
+        return small
+
+    def pyramid(self, levels: int = 3) -> List[np.ndarray]:
+        """Gaussian pyramid of the gray image; index 0 is full resolution"""
+        if not self._pyramid:
+            self._pyramid.append(self.gray)
+        while len(self._pyramid) < levels:
+            self._pyramid.append(cv2.pyrDown(self._pyramid[-1]))
+        return self._pyramid[:levels]
+
+    def detach(self) -> "FrameFeatures":
+        """Keep the cached features but drop the raw frame reference
+
+        Call before carrying a frame forward as "prev" when the raw buffer
+        may be reused (prefetch ring, ffmpeg pipe). Gray is materialized first.
+        """
+        if self.frame is not None:
+            _ = self.gray
+            if self._gray is self.frame:
+                self._gray = self.frame.copy()
+                if self._small:
+                    self._small = {size: (self._gray if small is self.frame else small) for size, small in self._small.items()}
+                if self._pyramid:
+                    self._pyramid[0] = self._gray
+            self.frame = None
+        return self
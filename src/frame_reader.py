@@ -0,0 +1,143 @@
+"""
+Strided Frame Reader
+Forward-only reader that skips unsampled frames with grab() and only retrieve()s sampled ones
+"""
+
+import cv2
+import numpy as np
+import queue
+import threading
+from typing import Iterable, Iterator, Optional, Tuple
+
+
+class StridedFrameReader:
+    """Reads frames from an open cv2.VideoCapture by index without paying BGR conversion for skipped frames"""
+
+    def __init__(self, cap: cv2.VideoCapture, seek_gap: int = 300):
+        self.cap = cap
+        # Jumps longer than this use a keyframe seek instead of grab()
+        self.seek_gap = seek_gap
+        self.position = 0
+        self.frames_decoded = 0
+        self.frames_skipped = 0
+        self.seeks = 0
+
+    def seek(self, frame_number: int):
+        """Reposition the capture so the next read returns frame_number"""
+        self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+        self.position = frame_number
+        self.seeks += 1
+
+    def skip_to(self, frame_number: int) -> bool:
+        """Advance to frame_number without retrieving the frames in between"""
+        if frame_number < self.position or frame_number - self.position > self.seek_gap:
+            self.seek(frame_number)
+            return True
+        while self.position < frame_number:
+            if not self.cap.grab():
+                return False
+            self.position += 1
+            self.frames_skipped += 1
+        return True
+
+    def read_at(self, frame_number: int, out: Optional[np.ndarray] = None) -> Optional[np.ndarray]:
+        """Return the decoded BGR frame at frame_number, or None at end of stream
+
+        When out is given (and matches the frame shape) the frame is decoded into it.
+        """
+        if not self.skip_to(frame_number):
+            return None
+        if not self.cap.grab():
+            return None
+        self.position += 1
+        ret, frame = self.cap.retrieve(out) if out is not None else self.cap.retrieve()
+        if not ret:
+            return None
+        self.frames_decoded += 1
+        return frame
+
+    def frames(self, start_frame: int = 0, end_frame: Optional[int] = None, step: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame_number, frame) for every step-th frame in [start_frame, end_frame)"""
+        step = max(1, step)
+        frame_num = start_frame
+        while end_frame is None or frame_num < end_frame:
+            frame = self.read_at(frame_num)
+            if frame is None:
+                return
+            yield frame_num, frame
+            frame_num += step
+
+
+class PrefetchFrameReader:
+    """Decodes requested frames on a producer thread into a bounded, preallocated ring buffer
+
+    OpenCV releases the GIL while decoding, so the producer keeps the decoder
+    busy while the caller runs numpy/cv2 analysis on earlier frames. Frames
+    yielded by frames() live in a ring slot and are only valid until the next
+    iteration; copy anything that must outlive it.
+    """
+
+    def __init__(self, reader: StridedFrameReader, capacity: int = 8):
+        self.reader = reader
+        self.capacity = max(2, capacity)
+        self.slots: Optional[np.ndarray] = None
+        self._free: "queue.Queue[int]" = queue.Queue()
+        self._ready: "queue.Queue" = queue.Queue()
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _produce(self, targets: Iterable[int]):
+        try:
+            for frame_num in targets:
+                if self.slots is None:
+                    first = self.reader.read_at(frame_num)
+                    if first is None:
+                        break
+                    self.slots = np.empty((self.capacity,) + first.shape, dtype=first.dtype)
+                    for slot in range(1, self.capacity):
+                        self._free.put(slot)
+                    self.slots[0] = first
+                    self._ready.put((frame_num, 0))
+                    continue
+
+                slot = self._free.get()
+                if self._stop.is_set():
+                    break
+                buf = self.slots[slot]
+                frame = self.reader.read_at(frame_num, out=buf)
+                if frame is None:
+                    break
+                if not np.shares_memory(frame, buf):
+                    buf[...] = frame
+                self._ready.put((frame_num, slot))
+        except BaseException as e:  # surfaced on the consumer side
+            self._error = e
+        finally:
+            self._ready.put(None)
+
+    def frames(self, targets: Iterable[int]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame_number, frame) for each target, decoded ahead on the producer thread"""
+        self._thread = threading.Thread(target=self._produce, args=(targets,), daemon=True)
+        self._thread.start()
+        try:
+            while True:
+                item = self._ready.get()
+                if item is None:
+                    break
+                frame_num, slot = item
+                yield frame_num, self.slots[slot]
+                self._free.put(slot)
+            if self._error is not None:
+                raise self._error
+        finally:
+            self.close()
+
+    def close(self):
+        """Stop the producer thread and wait for it to exit"""
+        self._stop.set()
+        # Unblock a producer waiting for a free slot
+        self._free.put(0)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,192 @@
+"""
+Gameplay Segment Filter
+Labels stretches of a recording as gameplay or non-gameplay (character select, loading, pause, results) from tiny thumbnails
+"""
+
+import cv2
+import numpy as np
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+try:
+    from .ffmpeg_reader import FFmpegGrayReader, ffmpeg_available
+    from .frame_bus import FrameBus, FrameConsumer, merge_frame_windows
+    from .frame_features import FrameFeatures
+except ImportError:
+    from ffmpeg_reader import FFmpegGrayReader, ffmpeg_available
+    from frame_bus import FrameBus, FrameConsumer, merge_frame_windows
+    from frame_features import FrameFeatures
+
+# Thumbnail (width, height) every classifier stage works on
+THUMB_SIZE = (64, 36)
+
+
+def dhash(gray: np.ndarray) -> int:
+    """64-bit difference hash: one bit per horizontal gradient sign on a 9x8 downscale"""
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two hashes"""
+    return bin(a ^ b).count("1")
+
+
+class FFmpegKeyframeReader(FFmpegGrayReader):
+    """Decodes keyframes only (-skip_frame nokey), one thumbnail per GOP without touching inter frames"""
+
+    def __init__(self, video_path: str, keyframes: Sequence[int], size: Tuple[int, int] = THUMB_SIZE):
+        super().__init__(video_path, size=size)
+        self.keyframe_numbers = list(keyframes)
+
+    def _command(self, start_frame: int, end_frame: Optional[int], step: int):
+        cmd = super()._command(0, None, 1)
+        cmd.insert(cmd.index("-i"), "-skip_frame")
+        cmd.insert(cmd.index("-i"), "nokey")
+        return cmd
+
+    def frames(self, start_frame: int = 0, end_frame: Optional[int] = None, step: int = 1) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame_number, thumbnail) for every keyframe"""
+        # The pipe only carries keyframes, so the base reader's running count is the keyframe index
+        decoded = super().frames(0, len(self.keyframe_numbers), 1)
+        try:
+            for i, thumb in decoded:
+                yield self.keyframe_numbers[i], thumb
+        finally:
+            decoded.close()
+
+
+class ThumbnailSampler(FrameConsumer):
+    """Frame bus consumer that keeps a gray thumbnail of every step-th frame"""
+
+    def __init__(self, step: int):
+        super().__init__(step=step)
+        self.samples: List[Tuple[int, np.ndarray]] = []
+
+    def consume(self, frame_number: int, frame: np.ndarray):
+        self.samples.append((frame_number, FrameFeatures(frame).downscaled(THUMB_SIZE).copy()))
+
+
+def collect_thumbnails(video_path: str, keyframes: Optional[Sequence[int]] = None, interval: int = 30) -> List[Tuple[int, np.ndarray]]:
+    """Gray thumbnails across the whole recording
+
+    Keyframes are decoded alone when known (the cheapest possible sample);
+    otherwise every interval-th frame is read through the frame bus.
+    """
+    if keyframes and ffmpeg_available():
+        reader = FFmpegKeyframeReader(video_path, keyframes)
+        if reader.open():
+            samples = [(frame_num, thumb.copy()) for frame_num, thumb in reader.frames()]
+            if len(samples) == len(keyframes):
+                return samples
+            print("⚠ Keyframe decode did not match the packet index - sampling frames instead")
+    sampler = ThumbnailSampler(interval)
+    bus = FrameBus(video_path)
+    bus.add(sampler)
+    bus.run()
+    return sampler.samples
+
+
+class GameplayClassifier:
+    """Labels thumbnail samples as gameplay (True) or non-gameplay (False)
+
+    Two cues, both computed on THUMB_SIZE gray thumbnails:
+    - HUD presence: the HUD strip (top of the screen by default) is matched
+      against a template with normalized cross-correlation. Without an
+      explicit template the per-pixel median strip of the moving samples is
+      used, since the HUD is the one region that stays put during play.
+    - Freezes: consecutive samples whose perceptual hashes (dHash) are
+      near-identical for at least freeze_seconds are paused or static screens.
+    Non-gameplay runs shorter than min_segment_seconds are relabelled as
+    gameplay, so super cinematics that briefly hide the HUD are kept.
+    """
+
+    def __init__(self, hud_region: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 0.15),
+                 hud_threshold: float = 0.5, freeze_seconds: float = 2.0, freeze_distance: int = 2,
+                 min_segment_seconds: float = 3.0, template: Optional[np.ndarray] = None):
+        self.hud_region = hud_region  # x, y, w, h as fractions of the frame
+        self.hud_threshold = hud_threshold
+        self.freeze_seconds = freeze_seconds
+        self.freeze_distance = freeze_distance
+        self.min_segment_seconds = min_segment_seconds
+        self.template = self.hud_strip(template) if template is not None else None
+
+    @classmethod
+    def from_screenshot(cls, image_path: str, **kwargs) -> "GameplayClassifier":
+        """Classifier whose HUD template comes from a gameplay screenshot"""
+        image = cv2.imread(image_path)
+        if image is None:
+            raise ValueError(f"Could not read HUD template image: {image_path}")
+        thumb = cv2.resize(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        return cls(template=thumb, **kwargs)
+
+    def hud_strip(self, thumb: np.ndarray) -> np.ndarray:
+        """Crop the HUD region out of a thumbnail"""
+        height, width = thumb.shape[:2]
+        x, y, w, h = self.hud_region
+        return thumb[int(y * height):int((y + h) * height), int(x * width):int((x + w) * width)]
+
+    def hud_scores(self, thumbs: List[np.ndarray], moving: np.ndarray) -> np.ndarray:
+        """Best normalized cross-correlation of each HUD strip against the template"""
+        strips = [self.hud_strip(thumb).astype(np.float32) for thumb in thumbs]
+        template = self.template
+        if template is None:
+            basis = [strip for strip, keep in zip(strips, moving) if keep] or strips
+            template = np.median(np.stack(basis), axis=0)
+        template = template.astype(np.float32)
+        # A 1px inset lets the match tolerate small shifts between recordings
+        inner = template[1:-1, 1:-1] if min(template.shape) > 4 else template
+        if float(inner.std()) < 1e-3:
+            # A flat template has nothing to match (no HUD in that region); the cue abstains
+            return np.ones(len(strips), dtype=np.float32)
+        scores = [float(cv2.matchTemplate(strip, inner, cv2.TM_CCOEFF_NORMED).max()) for strip in strips]
+        return np.asarray(scores, dtype=np.float32)
+
+    def classify(self, samples: List[Tuple[int, np.ndarray]], fps: float) -> np.ndarray:
+        """Return one gameplay flag per (frame_number, thumbnail) sample"""
+        if not samples:
+            return np.zeros(0, dtype=bool)
+        frames = np.asarray([frame_num for frame_num, _ in samples])
+        thumbs = [thumb for _, thumb in samples]
+        hashes = [dhash(thumb) for thumb in thumbs]
+        fps = fps or 30.0
+
+        # A sample is frozen when it looks like its predecessor; a frozen run must last freeze_seconds
+        still = np.zeros(len(samples), dtype=bool)
+        for i in range(1, len(samples)):
+            still[i] = hamming(hashes[i], hashes[i - 1]) <= self.freeze_distance
+        frozen = np.zeros(len(samples), dtype=bool)
+        for start, end in _runs(still):
+            first = start - 1
+            if (frames[end - 1] - frames[first]) / fps >= self.freeze_seconds:
+                frozen[first:end] = True
+
+        hud = self.hud_scores(thumbs, ~frozen) >= self.hud_threshold
+        gameplay = hud & ~frozen
+
+        # Short non-gameplay blips (cinematics, hit effects over the HUD) stay gameplay
+        for start, end in _runs(~gameplay):
+            span_end = frames[end] if end < len(frames) else frames[-1] + 1
+            if (span_end - frames[start]) / fps < self.min_segment_seconds:
+                gameplay[start:end] = True
+        return gameplay
+
+    def non_gameplay_windows(self, samples: List[Tuple[int, np.ndarray]], fps: float,
+                             total_frames: Optional[int] = None) -> List[Tuple[int, int]]:
+        """[start, end) frame windows labelled non-gameplay; each sample covers up to the next one"""
+        gameplay = self.classify(samples, fps)
+        frames = [frame_num for frame_num, _ in samples]
+        windows = []
+        for start, end in _runs(~gameplay):
+            if end < len(frames):
+                stop = frames[end]
+            else:
+                stop = total_frames if total_frames else frames[-1] + 1
+            windows.append((frames[start], stop))
+        return merge_frame_windows(windows)
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) index runs where mask is True"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.astype(np.int8), [0]))))
+    return list(zip(edges[::2].tolist(), edges[1::2].tolist()))
@@ -0,0 +1,159 @@
+"""
+Hitstop Detector
+Frame-accurate hit/block contact events from freeze runs in the play-area frame-difference signal
+"""
+
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence
+
+try:
+    from .batch_signals import batch_region_diffs
+    from .frame_bus import FrameConsumer
+    from .frame_features import FrameFeatures
+except ImportError:
+    from batch_signals import batch_region_diffs
+    from frame_bus import FrameConsumer
+    from frame_features import FrameFeatures
+
+# Fractional (x, y, w, h) regions of the frame: the two health-bar sides of the HUD strip (the round
+# timer in the centre is left out, so a tick during a freeze is not health changing) and the play area
+HUD_REGIONS = ((0.0, 0.0, 0.45, 0.15), (0.55, 0.0, 0.45, 0.15))
+PLAY_REGION = (0.0, 0.18, 1.0, 0.64)
+
+
+class HitstopDetector:
+    """Finds hitstop: both fighters freeze for a few frames on contact while the HUD keeps updating
+
+    Works on per-frame (stride 1) mean absolute differences of the play area
+    and the health-bar sides of the HUD strip. A freeze run is a stretch where the play-area diff
+    falls to freeze_ratio of the activity just before it (or under
+    freeze_floor). Runs of min_frames..max_frames that follow real activity
+    are contacts; longer ones are pauses or static screens. A hit drains
+    health, so a freeze whose HUD diff reaches hud_level is a "hit", one with
+    a still HUD a "block".
+    """
+
+    def __init__(self, min_frames: int = 3, max_frames: int = 24, freeze_ratio: float = 0.3,
+                 freeze_floor: float = 0.75, min_activity: float = 2.0, hud_level: float = 0.25,
+                 context: int = 30):
+        self.min_frames = min_frames
+        self.max_frames = max_frames
+        self.freeze_ratio = freeze_ratio
+        self.freeze_floor = freeze_floor
+        self.min_activity = min_activity
+        self.hud_level = hud_level
+        # Frames before a run that set its activity level
+        self.context = context
+
+    @property
+    def reach(self) -> int:
+        """Frames of signal before and after a contact that can change its detection"""
+        return self.context + self.max_frames + 2
+
+    def find(self, frame_numbers: Sequence[int], play_diff: np.ndarray, hud_diff: Optional[np.ndarray] = None) -> List[Dict]:
+        """Contact events for consecutive frames; play_diff[i] compares frame i with frame i - 1 (NaN = no predecessor)
+
+        Each event has the contact frame (last moving frame), end_frame (first
+        frame moving again), hitstop_frames, type ("hit"/"block") and a
+        confidence from how deep the freeze is.
+        """
+        frames = np.asarray(frame_numbers)
+        play = np.asarray(play_diff, dtype=np.float64)
+        if len(play) < 2:
+            return []
+        valid = ~np.isnan(play)
+        # Frames that barely move compared with the recent level; the level is refined per run below
+        low = valid & (play <= np.maximum(self.freeze_floor, self.freeze_ratio * _trailing_median(play, self.context)))
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], low.astype(np.int8), [0]))))
+        events = []
+        for start, end in zip(edges[::2].tolist(), edges[1::2].tolist()):
+            length = end - start
+            # The run must be closed by motion on both sides inside the signal
+            if not self.min_frames <= length <= self.max_frames or start < 1 or end >= len(play):
+                continue
+            if not (valid[start - 1] and valid[end]):
+                continue
+            before = play[max(0, start - self.context):start]
+            before = before[~np.isnan(before)]
+            if not len(before):
+                continue
+            activity = float(np.median(before))
+            level = max(self.freeze_floor, self.freeze_ratio * activity)
+            run = play[start:end]
+            if activity < self.min_activity or run.max() > level or play[end] <= level:
+                continue
+            hud = float(np.nanmean(hud_diff[start:end])) if hud_diff is not None else 0.0
+            events.append({
+                "type": "hit" if hud >= self.hud_level else "block",
+                "frame": int(frames[start - 1]),
+                "end_frame": int(frames[end]),
+                "hitstop_frames": length,
+                "confidence": round(float(np.clip(1.0 - run.mean() / activity, 0.0, 1.0)), 3),
+            })
+        return events
+
+
+def _trailing_median(values: np.ndarray, window: int) -> np.ndarray:
+    """Median of the previous `window` values (NaNs ignored) for every position"""
+    padded = np.concatenate((np.full(window, np.nan), values))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)[:len(values)]
+    result = np.full(len(values), np.inf)
+    seen = ~np.all(np.isnan(windows), axis=1)
+    result[seen] = np.nanmedian(windows[seen], axis=1)
+    return result
+
+
+class HitstopConsumer(FrameConsumer):
+    """Frame bus consumer that builds play-area and HUD diff signals for every frame, batch_frames at a time
+
+    Frames are reduced to 320x180 gray and diffed in one vectorized call per
+    batch; finish() turns the signals into events, stamped by timestamp(frame).
+    """
+
+    def __init__(self, detector: Optional[HitstopDetector] = None, start_frame: int = 0, end_frame: Optional[int] = None,
+                 batch_frames: int = 64, timestamp: Optional[Callable[[int], str]] = None):
+        super().__init__(start_frame, end_frame, 1)
+        self.detector = detector or HitstopDetector()
+        self.batch_frames = max(1, batch_frames)
+        self.timestamp = timestamp
+        self.events: List[Dict] = []
+        self.frame_numbers: List[int] = []
+        self._diffs: List[np.ndarray] = []
+        self._pending: List[np.ndarray] = []
+        self._pending_numbers: List[int] = []
+        self._prev: Optional[np.ndarray] = None
+        self._prev_number: Optional[int] = None
+
+    def consume(self, frame_number: int, frame: np.ndarray):
+        self._pending.append(FrameFeatures.wrap(frame).downscaled((320, 180)).copy())
+        self._pending_numbers.append(frame_number)
+        if len(self._pending) == self.batch_frames:
+            self.flush()
+
+    def flush(self):
+        """Diff the queued frames"""
+        if not self._pending:
+            return
+        stack = np.stack(self._pending)
+        # A dropped frame breaks the diff chain; the first frame after it has no predecessor
+        prev = self._prev if self._prev_number is not None and self._pending_numbers[0] == self._prev_number + 1 else None
+        diffs = batch_region_diffs(stack, prev, (PLAY_REGION,) + HUD_REGIONS)
+        gaps = np.flatnonzero(np.diff(self._pending_numbers) != 1) + 1
+        diffs[gaps] = np.nan
+        # A hit drains one bar, so the HUD signal is the busier side
+        self._diffs.append(np.column_stack((diffs[:, 0], diffs[:, 1:].max(axis=1))))
+        self.frame_numbers.extend(self._pending_numbers)
+        self._prev, self._prev_number = stack[-1], self._pending_numbers[-1]
+        self._pending, self._pending_numbers = [], []
+
+    def finish(self):
+        diffs = self.signals()
+        self.events = self.detector.find(self.frame_numbers, diffs[:, 0], diffs[:, 1])
+        if self.timestamp is not None:
+            for event in self.events:
+                event["timestamp"] = self.timestamp(event["frame"])
+
+    def signals(self) -> np.ndarray:
+        """(frames, 2) play-area and HUD diffs collected so far"""
+        self.flush()
+        return np.concatenate(self._diffs) if self._diffs else np.zeros((0, 2))
@@ -0,0 +1,202 @@
+"""
+Motion Engine
+Pluggable motion estimators, from frame-difference energy up to dense Farneback optical flow
+"""
+
+import sys
+import time
+import cv2
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from .frame_bus import FrameBus, FrameConsumer
+    from .frame_features import FrameFeatures
+except ImportError:
+    from frame_bus import FrameBus, FrameConsumer
+    from frame_features import FrameFeatures
+
+# Cheapest first; every tier returns a mean motion magnitude in full-resolution pixels per frame
+MOTION_TIERS = ("diff", "block", "lk", "farneback")
+
+
+def _level(features: FrameFeatures, level: int) -> np.ndarray:
+    """Gaussian pyramid level of a frame (shared with every other detector using the pyramid)"""
+    return features.pyramid(level + 1)[level]
+
+
+def difference_motion(prev: FrameFeatures, curr: FrameFeatures, level: int = 2) -> float:
+    """Normal-flow estimate from frame-difference energy on a 1/2**level pyramid level
+
+    Brightness constancy gives |dI/dt| = |grad I . v|, so the temporal
+    difference divided by the spatial gradient is the motion along the
+    gradient. Averaged with gradient-energy weights, this is a single pass
+    of float math over a small image. It saturates for motion beyond a
+    pixel or two at that level.
+    """
+    a = _level(prev, level).astype(np.float32)
+    b = _level(curr, level).astype(np.float32)
+    gy, gx = np.gradient((a + b) * 0.5)
+    grad = np.sqrt(gx * gx + gy * gy)
+    energy = float(np.sum(grad * grad))
+    if energy < 1e-6:
+        return 0.0
+    return float(np.sum(np.abs(b - a) * grad)) / energy * (2 ** level)
+
+
+def block_matching_motion(prev: FrameFeatures, curr: FrameFeatures, level: int = 2, block: int = 8, radius: int = 3) -> float:
+    """Mean block displacement from exhaustive SAD block matching on a 1/2**level pyramid level
+
+    Every shift within +-radius is scored for all blocks at once (absdiff
+    plus an area resize for the per-block sums); ties prefer the smaller
+    shift, so static blocks report zero.
+    """
+    a = _level(prev, level)
+    b = _level(curr, level)
+    rows, cols = a.shape[0] // block, a.shape[1] // block
+    if not rows or not cols:
+        return 0.0
+    height, width = rows * block, cols * block
+    current = b[:height, :width]
+    padded = cv2.copyMakeBorder(a, radius, radius, radius, radius, cv2.BORDER_REPLICATE)
+    shifts = sorted(
+        ((dy, dx) for dy in range(-radius, radius + 1) for dx in range(-radius, radius + 1)),
+        key=lambda shift: shift[0] ** 2 + shift[1] ** 2,
+    )
+    best = np.full((rows, cols), np.inf, dtype=np.float32)
+    distance = np.zeros((rows, cols), dtype=np.float32)
+    for dy, dx in shifts:
+        candidate = padded[radius + dy:radius + dy + height, radius + dx:radius + dx + width]
+        sad = cv2.resize(cv2.absdiff(current, candidate), (cols, rows), interpolation=cv2.INTER_AREA).astype(np.float32)
+        better = sad < best
+        best[better] = sad[better]
+        distance[better] = np.hypot(dy, dx)
+    return float(np.mean(distance)) * (2 ** level)
+
+
+def lucas_kanade_motion(prev: FrameFeatures, curr: FrameFeatures, level: int = 1, max_corners: int = 200) -> float:
+    """Mean displacement of Shi-Tomasi corners tracked with pyramidal Lucas-Kanade on a 1/2**level image
+
+    Tracks that do not come back to their corner when run in reverse
+    (forward-backward error over a pixel) are dropped as lost.
+    """
+    a = _level(prev, level)
+    b = _level(curr, level)
+    corners = cv2.goodFeaturesToTrack(a, max_corners, 0.01, 7)
+    if corners is None:
+        return 0.0
+    moved, status, _ = cv2.calcOpticalFlowPyrLK(a, b, corners, None, winSize=(15, 15), maxLevel=2)
+    back, back_status, _ = cv2.calcOpticalFlowPyrLK(b, a, moved, None, winSize=(15, 15), maxLevel=2)
+    round_trip = np.hypot(*(back - corners).reshape(-1, 2).T)
+    tracked = (status.ravel() == 1) & (back_status.ravel() == 1) & (round_trip < 1.0)
+    if not tracked.any():
+        return 0.0
+    displacement = (moved - corners).reshape(-1, 2)[tracked]
+    return float(np.mean(np.hypot(displacement[:, 0], displacement[:, 1]))) * (2 ** level)
+
+
+def farneback_motion(prev: FrameFeatures, curr: FrameFeatures) -> float:
+    """Mean dense optical flow magnitude (Farneback) over the full-resolution gray frames"""
+    flow = cv2.calcOpticalFlowFarneback(prev.gray, curr.gray, None, 0.5, 3, 15, 3, 5, 1.2, 0)
+    return float(np.mean(np.sqrt(flow[..., 0] ** 2 + flow[..., 1] ** 2)))
+
+
+_ESTIMATORS: Dict[str, Callable[[FrameFeatures, FrameFeatures], float]] = {
+    "diff": difference_motion,
+    "block": block_matching_motion,
+    "lk": lucas_kanade_motion,
+    "farneback": farneback_motion,
+}
+
+
+class MotionEngine:
+    """Motion magnitude between two frames using the selected tier
+
+    Frames may be BGR, luma planes or FrameFeatures; pyramid levels are
+    memoized on the FrameFeatures, so a frame carried forward as "prev"
+    is never downscaled twice.
+    """
+
+    def __init__(self, tier: str = "farneback"):
+        if tier not in _ESTIMATORS:
+            raise ValueError(f"Unknown motion tier '{tier}' (choose from {', '.join(MOTION_TIERS)})")
+        self.tier = tier
+        self._estimate = _ESTIMATORS[tier]
+
+    def estimate(self, prev_frame, curr_frame) -> float:
+        """Mean motion in full-resolution pixels per frame"""
+        return self._estimate(FrameFeatures.wrap(prev_frame), FrameFeatures.wrap(curr_frame))
+
+
+class FramePairSampler(FrameConsumer):
+    """Frame bus consumer that keeps (prev, curr) gray pairs of consecutive samples for benchmarking"""
+
+    def __init__(self, step: int, limit: int):
+        super().__init__(step=step)
+        self.limit = limit
+        self.pairs: List[Tuple[np.ndarray, np.ndarray]] = []
+        self._prev: Optional[np.ndarray] = None
+
+    def consume(self, frame_number: int, frame: np.ndarray):
+        gray = FrameFeatures(frame).gray.copy()
+        if self._prev is not None:
+            self.pairs.append((self._prev, gray))
+            self.done = len(self.pairs) >= self.limit
+        self._prev = gray
+
+
+def benchmark_motion_tiers(pairs: Sequence[Tuple[np.ndarray, np.ndarray]], tiers: Sequence[str] = MOTION_TIERS,
+                           reference: str = "farneback", threshold: float = 5.0) -> Dict[str, Dict[str, float]]:
+    """Time every tier on the same gray frame pairs and score it against the reference tier
+
+    Per tier: ms per pair, speedup over the reference, Pearson correlation
+    and mean absolute error against the reference magnitudes, and agreement
+    (fraction of pairs where "motion > threshold" gives the same decision
+    as the reference, which is how detect_hit_flash uses it).
+    """
+    tiers = list(tiers) if reference in tiers else list(tiers) + [reference]
+    values: Dict[str, np.ndarray] = {}
+    timings: Dict[str, float] = {}
+    for tier in tiers:
+        engine = MotionEngine(tier)
+        start = time.perf_counter()
+        # Fresh FrameFeatures per tier so no tier reuses another's pyramid
+        values[tier] = np.array([engine.estimate(FrameFeatures(a), FrameFeatures(b)) for a, b in pairs])
+        timings[tier] = (time.perf_counter() - start) * 1000.0 / max(1, len(pairs))
+
+    ref = values[reference]
+    results = {}
+    for tier in tiers:
+        vals = values[tier]
+        varied = len(vals) > 1 and vals.std() > 0 and ref.std() > 0
+        results[tier] = {
+            "ms_per_pair": timings[tier],
+            "speedup": timings[reference] / max(timings[tier], 1e-9),
+            "correlation": float(np.corrcoef(vals, ref)[0, 1]) if varied else float("nan"),
+            "mean_abs_error": float(np.mean(np.abs(vals - ref))) if len(vals) else float("nan"),
+            "agreement": float(np.mean((vals > threshold) == (ref > threshold))) if len(vals) else float("nan"),
+        }
+    return results
+
+
+def sample_frame_pairs(video_path: str, count: int = 40, step: int = 5) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Gray (prev, curr) pairs of frames step apart from the start of a recording (scan sample spacing)"""
+    sampler = FramePairSampler(step, count)
+    bus = FrameBus(video_path)
+    bus.add(sampler)
+    bus.run()
+    return sampler.pairs
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python motion_engine.py <video> [pairs] [step]")
+        sys.exit(1)
+    pairs = sample_frame_pairs(sys.argv[1], *(int(arg) for arg in sys.argv[2:4]))
+    print(f"{len(pairs)} frame pairs from {sys.argv[1]}")
+    print(f"{'tier':<10} {'ms/pair':>9} {'speedup':>8} {'corr':>6} {'MAE':>7} {'agree':>6}")
+    for tier, row in benchmark_motion_tiers(pairs).items():
+        print(
+            f"{tier:<10} {row['ms_per_pair']:9.2f} {row['speedup']:7.1f}x {row['correlation']:6.2f} "
+            f"{row['mean_abs_error']:7.2f} {row['agreement']:6.0%}"
+        )
@@ -0,0 +1,112 @@
+"""
+Packet Index
+Per-frame packet sizes and keyframe flags read from the container without decoding any pixels
+"""
+
+import subprocess
+import numpy as np
+from typing import List, Optional, Tuple
+
+try:
+    from .frame_bus import merge_frame_windows
+except ImportError:
+    from frame_bus import merge_frame_windows
+
+
+class PacketIndex:
+    """Video packet metadata in presentation (frame index) order"""
+
+    def __init__(self, pts: np.ndarray, sizes: np.ndarray, keyframes: np.ndarray):
+        order = np.argsort(pts, kind="stable")
+        self.pts = pts[order]
+        self.sizes = sizes[order]
+        self.is_keyframe = keyframes[order]
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def keyframes(self) -> List[int]:
+        """Frame indices of the keyframes (seek points)"""
+        return np.flatnonzero(self.is_keyframe).tolist()
+
+    def activity(self, smooth: int = 15) -> np.ndarray:
+        """Per-frame activity curve: inter-frame packet sizes averaged over `smooth` frames
+
+        Keyframes are large whatever the content, so their sizes are replaced
+        by interpolating the neighbouring inter frames before smoothing.
+        """
+        sizes = self.sizes.astype(np.float64)
+        inter = np.flatnonzero(~self.is_keyframe)
+        if len(inter):
+            sizes = np.interp(np.arange(len(sizes)), inter, sizes[inter])
+        if smooth > 1 and len(sizes) > smooth:
+            sizes = np.convolve(sizes, np.ones(smooth) / smooth, mode="same")
+        return sizes
+
+    def active_windows(self, ratio: float = 0.25, pad: int = 30, gap: int = 60) -> List[Tuple[int, int]]:
+        """[start, end) frame windows whose activity reaches ratio x the 90th-percentile activity
+
+        Static footage (menus, loading, idle replays) compresses to tiny inter
+        frames and falls below the floor; windows are padded by `pad` frames
+        and merged across gaps shorter than `gap`.
+        """
+        if not len(self):
+            return []
+        curve = self.activity()
+        active = curve >= ratio * np.percentile(curve, 90)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], active.astype(np.int8), [0]))))
+        windows = [(max(0, int(start) - pad), min(len(self), int(end) + pad)) for start, end in zip(edges[::2], edges[1::2])]
+        return merge_frame_windows(windows, gap=gap)
+
+    def to_columns(self):
+        """Columns for FeatureCache"""
+        return {"pts": self.pts, "size": self.sizes, "keyframe": self.is_keyframe}
+
+    @classmethod
+    def from_columns(cls, columns) -> "PacketIndex":
+        """Rebuild from FeatureCache columns"""
+        return cls(columns["pts"], columns["size"], columns["keyframe"].astype(bool))
+
+
+def read_packet_index(video_path: str) -> Optional[PacketIndex]:
+    """Demux the first video stream with the bundled ffmpeg and collect per-packet metadata
+
+    Uses ffmpeg's framecrc muxer on a stream copy, so the cost is one pass of
+    file I/O and no decoding. Returns None if ffmpeg is unavailable or fails.
+    """
+    try:
+        import imageio_ffmpeg
+        cmd = [
+            imageio_ffmpeg.get_ffmpeg_exe(),
+            "-loglevel", "error",
+            "-nostdin",
+            "-i", video_path,
+            "-map", "0:v:0",
+            "-c", "copy",
+            "-f", "framecrc",
+            "-",
+        ]
+        output = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except Exception as e:
+        print(f"⚠ Could not read packet index: {e}")
+        return None
+
+    pts, sizes, keyframes = [], [], []
+    for line in output.decode("utf-8", "replace").splitlines():
+        if not line or line.startswith("#"):
+            continue
+        # stream, dts, pts, duration, size, crc[, F=flags]; packets without F= are keyframes
+        fields = [field.strip() for field in line.split(",")]
+        if len(fields) < 6:
+            continue
+        pts.append(int(fields[2]))
+        sizes.append(int(fields[4]))
+        flags = next((field for field in fields[6:] if field.startswith("F=")), None)
+        keyframes.append(flags is None or bool(int(flags[2:], 16) & 0x1))
+    if not sizes:
+        return None
+    return PacketIndex(
+        np.asarray(pts, dtype=np.int64),
+        np.asarray(sizes, dtype=np.int64),
+        np.asarray(keyframes, dtype=bool),
+    )
@@ -8,16 +8,42 @@ import numpy as np
 from typing import List, Dict, Tuple, Optional
 import os
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+try:
+    from .frame_bus import FrameBus, FrameConsumer
+    from .frame_reader import StridedFrameReader
+    from .ffmpeg_reader import FFmpegGrayReader
+    from .frame_features import FrameFeatures
+    from .hitstop import HitstopConsumer, HitstopDetector
+    from .motion_engine import MotionEngine
+    from .packet_index import read_packet_index
+    from .parallel_scan import default_jobs, overlap_start, plan_segments, run_segments
+except ImportError:
+    from frame_bus import FrameBus, FrameConsumer
+    from frame_reader import StridedFrameReader
+    from ffmpeg_reader import FFmpegGrayReader
+    from frame_features import FrameFeatures
+    from hitstop import HitstopConsumer, HitstopDetector
+    from motion_engine import MotionEngine
+    from packet_index import read_packet_index
+    from parallel_scan import default_jobs, overlap_start, plan_segments, run_segments
+
 
 class VideoFrameAnalyzer:
     """Analyzes video frames for fighting game data"""
     
-    def __init__(self, video_path: str):
+    def __init__(self, video_path: str, motion_tier: str = "farneback"):
         self.video_path = video_path
         self.cap = None
         self.fps = 0
         self.total_frames = 0
         self.frame_data_history = []
+        # "diff", "block", "lk" or "farneback" (see motion_engine.MOTION_TIERS)
+        self.motion_engine = MotionEngine(motion_tier)
         
     def open_video(self) -> bool:
         """Open video file"""
@@ -67,32 +93,26 @@ class VideoFrameAnalyzer:
         if self.cap is None:
             return []
         
-        frames = []
-        self.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
-        
-        for frame_num in range(start_frame, end_frame, step):
-            ret, frame = self.cap.read()
-            if ret:
-                frames.append((frame_num, frame))
-            else:
-                break
-        
-        return frames
+        reader = StridedFrameReader(self.cap)
+        reader.seek(start_frame)
+        return list(reader.frames(start_frame, end_frame, step))
     
-    def detect_color_regions(self, frame: np.ndarray, color_range: Tuple) -> np.ndarray:
-        """Detect regions of specific color (HSV)"""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    def detect_color_regions(self, frame, color_range: Tuple) -> np.ndarray:
+        """Detect regions of specific color (HSV); accepts a frame or FrameFeatures"""
+        hsv = FrameFeatures.wrap(frame).hsv
         lower, upper = color_range
         mask = cv2.inRange(hsv, lower, upper)
         return mask
     
-    def get_frame_brightness(self, frame: np.ndarray) -> float:
-        """Calculate average brightness of frame"""
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return np.mean(gray)
+    def get_frame_brightness(self, frame) -> float:
+        """Calculate average brightness of frame (BGR frame, luma plane or FrameFeatures)"""
+        return FrameFeatures.wrap(frame).brightness
     
-    def detect_screen_flash(self, prev_frame: np.ndarray, curr_frame: np.ndarray, threshold: int = 50) -> bool:
-        """Detect if a screen flash occurred (super/ultimate activation)"""
+    def detect_screen_flash(self, prev_frame, curr_frame, threshold: int = 50) -> bool:
+        """Detect if a screen flash occurred (super/ultimate activation)
+        
+        Accepts BGR frames, luma planes or FrameFeatures.
+        """
         if prev_frame is None:
             return False
         
@@ -101,42 +121,35 @@ class VideoFrameAnalyzer:
         
         return abs(curr_brightness - prev_brightness) > threshold
     
-    def detect_motion(self, prev_frame: np.ndarray, curr_frame: np.ndarray) -> float:
-        """Detect motion between frames (optical flow magnitude)"""
+    def detect_motion(self, prev_frame, curr_frame) -> float:
+        """Detect motion between frames (mean motion magnitude from the selected motion tier)"""
         if prev_frame is None or curr_frame is None:
             return 0.0
         
-        gray_prev = cv2.cvtColor(prev_frame, cv2.COLOR_BGR2GRAY)
-        gray_curr = cv2.cvtColor(curr_frame, cv2.COLOR_BGR2GRAY)
-        
-        flow = cv2.calcOpticalFlowFarneback(
-            gray_prev, gray_curr, None, 0.5, 3, 15, 3, 5, 1.2, 0
-        )
-        
-        magnitude = np.sqrt(flow[..., 0]**2 + flow[..., 1]**2)
-        return np.mean(magnitude)
+        return self.motion_engine.estimate(prev_frame, curr_frame)
     
     def close(self):
         """Close video file"""
         if self.cap:
             self.cap.release()
     
-    def extract_video_clip(self, start_frame: int, end_frame: int, output_path: str, quality: int = 20):
+    def extract_video_clip(self, start_frame: int, end_frame: int, output_path: str, quality: int = 20, write_mp4: bool = True):
         """Extract video frames as a GIF preview (animated replay)
         
-        Creates an animated GIF showing the mistake in action
+        Creates an animated GIF showing the mistake in action. The clip is
+        read in one forward pass from a single seek; the GIF and MP4 are
+        built from the same decoded frames.
         Args:
             start_frame: Starting frame number
             end_frame: Ending frame number
             output_path: Path to save the GIF file (will use .gif extension)
             quality: Quality level (1-100)
+            write_mp4: Also write an MP4 replay; when False only GIF frames are decoded
         
         Returns:
             Path to created GIF file if successful, empty string otherwise
         """
-        try:
-            from PIL import Image
-        except ImportError:
+        if Image is None:
             print(f"⚠ PIL/Pillow not available - skipping GIF generation")
             return ""
         
@@ -144,78 +157,49 @@ class VideoFrameAnalyzer:
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
         try:
-            # Create a fresh video reader for extraction (don't modify self.cap)
-            temp_cap = cv2.VideoCapture(self.video_path)
-            if not temp_cap.isOpened():
+            bus = FrameBus(self.video_path)
+            writer = bus.add(ClipWriter(start_frame, end_frame, output_path, mp4=write_mp4))
+            if not bus.run():
                 print(f"✗ Could not open video for clip extraction")
                 return ""
-            
-            frames = []
-            frame_count = 0
-            # Target ~15 frames in GIF for smaller file size (was 30)
-            step = max(1, (end_frame - start_frame) // 15)
-            
-            for frame_num in range(start_frame, min(end_frame, int(self.total_frames)), step):
-                # Set position and read frame
-                temp_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-                ret, frame = temp_cap.read()
-                if not ret:
-                    break
-                
-                # Convert BGR to RGB
-                rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Aggressive resize for web - 30% of original
-                height, width = rgb_frame.shape[:2]
-                scale = 0.3  # 30% of original (was 50%)
-                new_width = int(width * scale)
-                new_height = int(height * scale)
-                resized = cv2.resize(rgb_frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
-                
-                # Convert to PIL Image and reduce colors for compression
-                pil_frame = Image.fromarray(resized)
-                # Convert to RGB mode with reduced palette (256 colors)
-                pil_frame = pil_frame.quantize(colors=256)
-                frames.append(pil_frame)
-                frame_count += 1
-            
-            temp_cap.release()
-            
-            # Save as GIF with heavy optimization
-            if frames and frame_count > 2:
-                output_gif = output_path.replace('.mp4', '.gif')
-                try:
-                    frames[0].save(
-                        output_gif,
-                        save_all=True,
-                        append_images=frames[1:],
-                        duration=150,  # 150ms per frame (slower playback for smaller files)
-                        loop=0,  # Loop infinitely
-                        optimize=True,  # Enable optimization (quantize helps too)
-                        quality=95  # PIL's quality parameter
-                    )
-                    
-                    if os.path.exists(output_gif) and os.path.getsize(output_gif) > 10000:
-                        size_kb = os.path.getsize(output_gif) / 1024
-                        print(f"✓ Extracted replay: {os.path.basename(output_gif)} ({frame_count} frames, {size_kb:.0f}KB)")
-                        
-                        # Also create MP4 version for better speed control
-                        self._create_mp4_from_frames(start_frame, end_frame, output_path)
-                        
-                        return output_gif
-                    elif os.path.exists(output_gif):
-                        print(f"⚠ GIF too small: {os.path.basename(output_gif)} ({os.path.getsize(output_gif)} bytes)")
-                        return ""
-                except Exception as e:
-                    print(f"✗ Error saving GIF: {e}")
-                    return ""
-            
-            return ""
-                
+            return writer.gif_path
         except Exception as e:
             print(f"✗ Error extracting clip: {e}")
             return ""
     
+    def extract_video_clips(self, requests: List[Tuple[int, int, str]], write_mp4: bool = True) -> List[str]:
+        """Extract many GIF/MP4 replays in a single forward decode
+        
+        Args:
+            requests: (start_frame, end_frame, output_path) for each clip
+            write_mp4: Also write MP4 replays alongside the GIFs
+        
+        Returns:
+            GIF paths in request order (empty string for clips that failed)
+        """
+        if not requests:
+            return []
+        if Image is None:
+            print(f"⚠ PIL/Pillow not available - skipping GIF generation")
+            return [""] * len(requests)
+        
+        bus = FrameBus(self.video_path)
+        writers = []
+        for start_frame, end_frame, output_path in requests:
+            if os.path.dirname(output_path):
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            writers.append(bus.add(ClipWriter(start_frame, end_frame, output_path, mp4=write_mp4)))
+        
+        try:
+            # Overlapping clip windows share decoded frames; gaps are skipped
+            if not bus.run():
+                print(f"✗ Could not open video for clip extraction")
+                return [""] * len(requests)
+        except Exception as e:
+            print(f"✗ Error extracting clips: {e}")
+            return [""] * len(requests)
+        return [writer.gif_path for writer in writers]
+    
     def _create_mp4_from_frames(self, start_frame: int, end_frame: int, output_path: str):
         """Create MP4 video file from frames for better speed control
         
@@ -225,54 +209,142 @@ class VideoFrameAnalyzer:
             output_path: Path to save the MP4 file
         """
         try:
-            temp_cap = cv2.VideoCapture(self.video_path)
-            if not temp_cap.isOpened():
-                return
-            
-            # Get video properties
-            fps = self.fps
-            width = int(temp_cap.get(cv2.CAP_PROP_FRAME_WIDTH) * 0.3)  # 30% of original
-            height = int(temp_cap.get(cv2.CAP_PROP_FRAME_HEIGHT) * 0.3)
-            
-            # Create video writer for MP4
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')
-            output_mp4 = output_path.replace('.gif', '.mp4')
-            writer = cv2.VideoWriter(output_mp4, fourcc, fps, (width, height))
-            
-            frame_count = 0
-            for frame_num in range(start_frame, min(end_frame, int(self.total_frames))):
-                temp_cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
-                ret, frame = temp_cap.read()
-                if not ret:
-                    break
-                
-                # Resize frame
-                resized = cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
-                writer.write(resized)
-                frame_count += 1
-            
-            writer.release()
-            temp_cap.release()
-            
-            if os.path.exists(output_mp4):
-                size_mb = os.path.getsize(output_mp4) / (1024 * 1024)
-                if size_mb > 0.1:  # Only keep if > 100KB
-                    print(f"✓ Created MP4 replay: {os.path.basename(output_mp4)} ({frame_count} frames, {size_mb:.2f}MB)")
+            bus = FrameBus(self.video_path)
+            bus.add(ClipWriter(start_frame, end_frame, output_path, gif=False))
+            bus.run()
         except Exception as e:
             print(f"⚠ MP4 creation skipped: {e}")
 
 
+class ClipWriter(FrameConsumer):
+    """Frame bus consumer that builds a GIF and MP4 replay from one pass over a clip window
+    
+    With mp4 disabled only every gif_step-th frame is requested, so the bus
+    grab()s past the rest without decoding them. The clip is written out as
+    soon as its last frame arrives, so a batch only holds the writers and
+    GIF frames of the clips that overlap.
+    """
+    
+    def __init__(self, start_frame: int, end_frame: int, output_path: str, scale: float = 0.3,
+                 gif_frames: int = 15, gif: bool = True, mp4: bool = True):
+        # Target ~15 frames in GIF for smaller file size
+        gif_step = max(1, (end_frame - start_frame) // gif_frames)
+        super().__init__(start_frame, end_frame, 1 if mp4 else gif_step)
+        self.output_path = output_path
+        self.scale = scale  # 30% of original for web
+        self.gif = gif and Image is not None
+        self.mp4 = mp4
+        self.gif_step = gif_step
+        self.gif_frames = []
+        self.gif_path = ""
+        self.mp4_path = output_path.replace('.gif', '.mp4')
+        self.mp4_frames = 0
+        self.fps = 30.0
+        self.size = None
+        self.writer = None
+        self.closed = False
+    
+    def begin(self, bus: FrameBus):
+        self.fps = bus.fps or 30.0
+        if bus.width and bus.height:
+            self.size = (int(bus.width * self.scale), int(bus.height * self.scale))
+    
+    def consume(self, frame_number: int, frame: np.ndarray):
+        if self.size is None:
+            height, width = frame.shape[:2]
+            self.size = (int(width * self.scale), int(height * self.scale))
+        resized = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+        
+        if self.mp4:
+            if self.writer is None:
+                fourcc = cv2.VideoWriter_fourcc(*'mp4v')
+                self.writer = cv2.VideoWriter(self.mp4_path, fourcc, self.fps, self.size)
+            self.writer.write(resized)
+            self.mp4_frames += 1
+        
+        if self.gif and (frame_number - self.start_frame) % self.gif_step == 0:
+            rgb_frame = cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+            # Reduce to a 256-colour palette for compression
+            self.gif_frames.append(Image.fromarray(rgb_frame).quantize(colors=256))
+        
+        if frame_number + self.step >= self.end_frame:
+            self.finish()
+            self.done = True
+    
+    def finish(self):
+        # Called at the clip's last frame and again when the bus pass ends
+        if self.closed:
+            return
+        self.closed = True
+        wrote_mp4 = self.writer is not None
+        if wrote_mp4:
+            self.writer.release()
+            self.writer = None
+        
+        if self.gif:
+            self.gif_path = self._save_gif()
+            self.gif_frames = []
+        if self.gif and not self.gif_path:
+            # MP4 is only kept alongside a usable GIF
+            if wrote_mp4 and os.path.exists(self.mp4_path):
+                os.remove(self.mp4_path)
+            return
+        
+        if self.mp4 and os.path.exists(self.mp4_path):
+            size_mb = os.path.getsize(self.mp4_path) / (1024 * 1024)
+            if size_mb > 0.1:  # Only report if > 100KB
+                print(f"✓ Created MP4 replay: {os.path.basename(self.mp4_path)} ({self.mp4_frames} frames, {size_mb:.2f}MB)")
+    
+    def _save_gif(self) -> str:
+        """Save collected frames as an animated GIF, returning its path or empty string"""
+        frames = self.gif_frames
+        if not frames or len(frames) <= 2:
+            return ""
+        
+        output_gif = self.output_path.replace('.mp4', '.gif')
+        try:
+            frames[0].save(
+                output_gif,
+                save_all=True,
+                append_images=frames[1:],
+                duration=150,  # 150ms per frame (slower playback for smaller files)
+                loop=0,  # Loop infinitely
+                optimize=True,  # Enable optimization (quantize helps too)
+                quality=95  # PIL's quality parameter
+            )
+        except Exception as e:
+            print(f"✗ Error saving GIF: {e}")
+            return ""
+        
+        if os.path.exists(output_gif) and os.path.getsize(output_gif) > 10000:
+            size_kb = os.path.getsize(output_gif) / 1024
+            print(f"✓ Extracted replay: {os.path.basename(output_gif)} ({len(frames)} frames, {size_kb:.0f}KB)")
+            return output_gif
+        if os.path.exists(output_gif):
+            print(f"⚠ GIF too small: {os.path.basename(output_gif)} ({os.path.getsize(output_gif)} bytes)")
+        return ""
+
+
 class GameStateDetector:
     """Detects game states from video frames"""
     
-    def __init__(self, analyzer: VideoFrameAnalyzer):
+    def __init__(self, analyzer: VideoFrameAnalyzer, method: str = "flash"):
         self.analyzer = analyzer
+        # "flash": brightness-jump heuristic on sampled frames ("potential_hit" events)
+        # "hitstop": frame-accurate hit/block contacts from play-area freezes (every frame is read)
+        if method not in ("hitstop", "flash"):
+            raise ValueError(f"Unknown hit detection method '{method}' (choose hitstop or flash)")
+        self.method = method
+        self.hitstop = HitstopDetector()
         self.round_starts = []
         self.hits_detected = []
         self.blockstrings = []
         
-    def detect_hit_flash(self, prev_frame: np.ndarray, curr_frame: np.ndarray) -> bool:
-        """Detect hit impact flash"""
+    def detect_hit_flash(self, prev_frame, curr_frame) -> bool:
+        """Detect hit impact flash (method="flash")"""
+        # Wrap once so the flash and motion checks share one gray conversion per frame
+        prev_frame = FrameFeatures.wrap(prev_frame)
+        curr_frame = FrameFeatures.wrap(curr_frame)
         # Look for sudden brightness change indicating hit
         if self.analyzer.detect_screen_flash(prev_frame, curr_frame, threshold=40):
             # Further verification: check for motion
@@ -280,41 +352,113 @@ class GameStateDetector:
             return motion > 5  # Threshold for significant motion
         return False
     
-    def scan_video_for_events(self, start_frame: int = 0, end_frame: Optional[int] = None, sample_rate: int = 2):
-        """Scan entire video for game events"""
-        if end_frame is None:
-            end_frame = self.analyzer.total_frames
+    def event_consumer(self, start_frame: int = 0, end_frame: Optional[int] = None, sample_rate: int = 2) -> FrameConsumer:
+        """Build a frame bus consumer that collects potential hits (hitstop reads every frame and ignores sample_rate)"""
+        if self.method == "hitstop":
+            return HitstopConsumer(self.hitstop, start_frame, end_frame, timestamp=self.analyzer.get_timestamp)
+        return HitFlashConsumer(self, start_frame, end_frame, sample_rate)
+    
+    def scan_video_for_events(self, start_frame: int = 0, end_frame: Optional[int] = None, sample_rate: int = 2, luma: bool = False, jobs: int = 1):
+        """Scan entire video for game events
         
-        events = []
-        prev_frame = None
-        prev_brightness = 0
+        With luma=True the detectors run directly on the decoder's Y plane
+        (piped from ffmpeg), skipping both the YUV->BGR and BGR->gray conversions.
+        jobs > 1 (or 0 for one per core) scans keyframe-aligned segments in
+        worker processes; the merged events match a serial scan.
+        """
+        if end_frame is None:
+            end_frame = self.analyzer.total_frames or None
         
-        self.analyzer.cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        if jobs != 1 and end_frame is not None:
+            return self._scan_segments_parallel(start_frame, end_frame, sample_rate, luma, jobs if jobs > 0 else default_jobs())
         
-        for frame_num in range(start_frame, end_frame, sample_rate):
-            ret, frame = self.analyzer.cap.read()
-            if not ret:
-                break
-            
-            # Detect flashes and motion
-            brightness = self.analyzer.get_frame_brightness(frame)
-            flash_detected = self.detect_hit_flash(prev_frame, frame) if prev_frame is not None else False
-            
-            if flash_detected:
-                timestamp = self.analyzer.get_timestamp(frame_num)
-                events.append({
-                    "type": "potential_hit",
-                    "frame": frame_num,
-                    "timestamp": timestamp,
-                    "confidence": 0.6
-                })
-            
-            prev_frame = frame
-            prev_brightness = brightness
+        consumer = self.event_consumer(start_frame, end_frame, sample_rate)
+        if luma:
+            reader = FFmpegGrayReader(self.analyzer.video_path, size=None)
+            if reader.open():
+                # Same begin/consume/finish lifecycle as the bus; the reader carries fps, size and frame count
+                consumer.begin(reader)
+                frames = reader.frames(start_frame, end_frame, consumer.step)
+                try:
+                    for frame_num, y_plane in frames:
+                        consumer.consume(frame_num, y_plane)
+                        if consumer.done:
+                            break
+                finally:
+                    frames.close()
+                consumer.finish()
+                return consumer.events
+            print("⚠ Luma path unavailable - falling back to BGR decode")
         
+        bus = FrameBus(self.analyzer.video_path)
+        bus.add(consumer)
+        bus.run()
+        return consumer.events
+    
+    def _scan_segments_parallel(self, start_frame: int, end_frame: int, sample_rate: int, luma: bool, jobs: int):
+        """Run scan_video_for_events over segments on a process pool and merge in frame order"""
+        index = read_packet_index(self.analyzer.video_path)
+        step = 1 if self.method == "hitstop" else sample_rate
+        segments = plan_segments(start_frame, end_frame, jobs, step, index.keyframes() if index else None)
+        args = [
+            (self.analyzer.video_path, self.analyzer.fps, self.analyzer.total_frames, start, end, sample_rate, luma, start_frame,
+             self.analyzer.motion_engine.tier, self.method, end_frame)
+            for start, end in segments
+        ]
+        events = []
+        for segment_events in run_segments(_scan_events_segment, args, jobs):
+            events.extend(segment_events)
         return events
 
 
+def _scan_events_segment(video_path: str, fps: float, total_frames: int, start_frame: int, end_frame: int,
+                         sample_rate: int, luma: bool, scan_start: int, motion_tier: str = "farneback",
+                         method: str = "flash", scan_end: Optional[int] = None):
+    """Process-pool worker: hit events whose frame is in [start_frame, end_frame)"""
+    analyzer = VideoFrameAnalyzer(video_path, motion_tier)
+    analyzer.fps = fps
+    analyzer.total_frames = total_frames
+    detector = GameStateDetector(analyzer, method)
+    if method == "hitstop":
+        # A contact depends on the activity before it and the freeze after it; read that margin on both sides
+        reach = detector.hitstop.reach
+        read_from = max(scan_start, start_frame - reach)
+        read_to = end_frame + reach if scan_end is None else min(scan_end, end_frame + reach)
+    else:
+        # Re-read the previous sample so the first frame of the segment is diffed like in a serial scan
+        read_from = overlap_start(start_frame, max(1, sample_rate), scan_start)
+        read_to = end_frame
+    events = detector.scan_video_for_events(read_from, read_to, sample_rate, luma)
+    return [event for event in events if start_frame <= event["frame"] < end_frame]
+
+
+class HitFlashConsumer(FrameConsumer):
+    """Frame bus consumer that runs GameStateDetector hit detection on sampled frames"""
+    
+    def __init__(self, detector: GameStateDetector, start_frame: int = 0, end_frame: Optional[int] = None, sample_rate: int = 2):
+        super().__init__(start_frame, end_frame, sample_rate)
+        self.detector = detector
+        self.events = []
+        self.prev_frame = None
+    
+    def consume(self, frame_number: int, frame: np.ndarray):
+        features = FrameFeatures(frame, frame_number)
+        # Detect flashes and motion
+        flash_detected = self.detector.detect_hit_flash(self.prev_frame, features) if self.prev_frame is not None else False
+        
+        if flash_detected:
+            timestamp = self.detector.analyzer.get_timestamp(frame_number)
+            self.events.append({
+                "type": "potential_hit",
+                "frame": frame_number,
+                "timestamp": timestamp,
+                "confidence": 0.6
+            })
+        
+        # Bus frames may sit in a reused prefetch slot; keep only the cached features
+        self.prev_frame = features.detach()
+
+
 class MoveDetector:
     """Detects character moves from game state"""
     
@@ -339,13 +483,16 @@ class MoveDetector:
 class AnalysisSession:
     """Manages a complete analysis session"""
     
-    def __init__(self, video_path: str, character1: str = "Blitzcrank", character2: str = "Blitzcrank", mode: str = "Juggernaut"):
+    def __init__(self, video_path: str, character1: str = "Blitzcrank", character2: str = "Blitzcrank", mode: str = "Juggernaut", luma: bool = False, jobs: int = 1,
+                 motion_tier: str = "farneback", hit_method: str = "flash"):
         self.video_path = video_path
         self.character1 = character1
         self.character2 = character2
         self.mode = mode
-        self.analyzer = VideoFrameAnalyzer(video_path)
-        self.detector = GameStateDetector(self.analyzer)
+        self.luma = luma  # run detectors on the decoder's Y plane
+        self.jobs = jobs  # worker processes for segment-parallel scanning
+        self.analyzer = VideoFrameAnalyzer(video_path, motion_tier)  # cheaper motion tiers trade agreement with Farneback for speed
+        self.detector = GameStateDetector(self.analyzer, hit_method)  # "hitstop" for frame-accurate contacts (decodes every frame)
         self.move_detector = MoveDetector()
         self.events = []
         
@@ -367,7 +514,7 @@ class AnalysisSession:
         
         # Scan for events
         print("Scanning video for gameplay events...")
-        self.events = self.detector.scan_video_for_events(sample_rate=5)
+        self.events = self.detector.scan_video_for_events(sample_rate=5, luma=self.luma, jobs=self.jobs)
         print(f"Found {len(self.events)} potential events\n")
         
         self.analyzer.close()
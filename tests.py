@@ -5,6 +5,8 @@ Test suite for 2XKO Analyzer
 import unittest
 import sys
 import os
+import tempfile
+from types import SimpleNamespace
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
@@ -13,6 +15,30 @@ from frame_data import (
     is_combo_starter, get_move_category, BLITZCRANK_FRAME_DATA
 )
 from analysis_engine import PlaystyleAnalyzer, RecommendationEngine, MistakeType
+from frame_bus import FrameBus, FrameConsumer, merge_frame_windows, subtract_frame_windows
+from frame_features import FrameFeatures
+from batch_signals import batch_flash_motion, batch_region_diffs, frame_diffs
+from motion_engine import MOTION_TIERS, MotionEngine
+from hitstop import HitstopConsumer, HitstopDetector
+from feature_cache import FeatureCache
+from frame_archive import FrameArchive, ProxyWriter, proxy_bytes
+from fingerprint import video_fingerprint
+from parallel_scan import overlap_start, plan_segments
+from packet_index import PacketIndex, read_packet_index
+from gameplay_filter import THUMB_SIZE, GameplayClassifier, collect_thumbnails
+from ffmpeg_reader import ffmpeg_available
+from event_selector import TopKSelector
+from event_table import EventTable
+from video_analyzer import ClipWriter, VideoFrameAnalyzer
+from CODEX_CHATGPT.health_timeline import (
+    DAMAGE_DTYPE, HealthBarConfig, HealthTimeline, HealthTimelineConsumer, damage_events, read_health, round_results
+)
+from CODEX_CHATGPT.hud_calibration import HudCalibrator, _extend_track, _mirror_spans
+from CODEX_CHATGPT.player_attribution import PlayerAttributor, SideActivity
+from CODEX_CHATGPT.config import AnalyzerParameters
+from CODEX_CHATGPT.mirror_matchup import MirrorMatchAnalyzer
+import cv2
+import numpy as np
 
 
 class TestFrameData(unittest.TestCase):
@@ -138,6 +164,670 @@ class TestMoveDatabaseCompleteness(unittest.TestCase):
                     f"Suspicious startup/recovery for {move_name}")
 
 
+class TestFrameBus(unittest.TestCase):
+    """Test frame bus consumer windows"""
+    
+    def test_consumer_window_and_stride(self):
+        """Consumers only receive frames inside their window on their stride"""
+        consumer = FrameConsumer(start_frame=10, end_frame=20, step=3)
+        wanted = [n for n in range(30) if consumer.wants(n)]
+        self.assertEqual(wanted, [10, 13, 16, 19])
+    
+    def test_consumer_next_wanted(self):
+        """next_wanted jumps straight to the next sampled frame"""
+        consumer = FrameConsumer(start_frame=10, end_frame=20, step=3)
+        self.assertEqual(consumer.next_wanted(0), 10)
+        self.assertEqual(consumer.next_wanted(11), 13)
+        self.assertEqual(consumer.next_wanted(19), 19)
+        self.assertIsNone(consumer.next_wanted(20))
+    
+    def test_consumer_finishes(self):
+        """Consumers report completion at window end or when marked done"""
+        consumer = FrameConsumer(end_frame=5)
+        self.assertFalse(consumer.finished_at(4))
+        self.assertTrue(consumer.finished_at(5))
+        
+        open_ended = FrameConsumer()
+        self.assertFalse(open_ended.finished_at(10 ** 6))
+        open_ended.done = True
+        self.assertTrue(open_ended.finished_at(0))
+        self.assertFalse(open_ended.wants(0))
+    
+    def test_prefetch_dispatch_and_early_stop(self):
+        """With prefetch the consumers get the same frames, and a consumer marking itself done ends the read"""
+        class Recorder(FrameConsumer):
+            def __init__(self, stop_after=None, **kwargs):
+                super().__init__(**kwargs)
+                self.seen = []
+                self.stop_after = stop_after
+            
+            def consume(self, frame_number, frame):
+                self.seen.append((frame_number, int(frame[0, 0, 0])))
+                self.done = self.stop_after is not None and len(self.seen) >= self.stop_after
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, "match.avi")
+            writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*'MJPG'), 30.0, (64, 36))
+            for n in range(40):
+                writer.write(np.full((36, 64, 3), n * 5, dtype=np.uint8))
+            writer.release()
+            
+            runs = []
+            for prefetch in (0, 4):
+                bus = FrameBus(video, prefetch=prefetch)
+                strided = bus.add(Recorder(start_frame=5, end_frame=30, step=5))
+                early = bus.add(Recorder(stop_after=3, start_frame=20))
+                self.assertTrue(bus.run())
+                runs.append((strided.seen, early.seen))
+                if not prefetch:
+                    # Frames only the stopped consumer wanted are skipped, not decoded
+                    self.assertEqual(bus.frames_decoded, 7)
+            self.assertEqual(runs[0], runs[1])
+            self.assertEqual([n for n, _ in runs[0][0]], [5, 10, 15, 20, 25])
+            self.assertEqual([n for n, _ in runs[0][1]], [20, 21, 22])
+            self.assertAlmostEqual(runs[0][0][1][1], 50, delta=3)
+    
+    def test_merge_frame_windows(self):
+        """Overlapping and nearby clip windows collapse into one forward read"""
+        windows = [(50, 100), (0, 20), (90, 150), (500, None), (600, 700)]
+        self.assertEqual(merge_frame_windows(windows), [(0, 20), (50, 150), (500, None)])
+        self.assertEqual(merge_frame_windows([(0, 10), (15, 20)], gap=5), [(0, 20)])
+    
+    def test_subtract_frame_windows(self):
+        """Removed regions are cut out of the scan windows"""
+        self.assertEqual(subtract_frame_windows([(0, None)], [(0, 600), (1800, 2400)]), [(600, 1800), (2400, None)])
+        self.assertEqual(subtract_frame_windows([(0, 100), (200, None)], [(50, 250), (300, None)]), [(0, 50), (250, 300)])
+
+
+class TestClipExtraction(unittest.TestCase):
+    """Test GIF/MP4 replay extraction"""
+    
+    def test_clips_from_one_pass(self):
+        """Every requested clip gets its GIF and MP4 with the expected frame counts"""
+        from PIL import Image
+        rng = np.random.default_rng(11)
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, "match.mp4")
+            writer = cv2.VideoWriter(video, cv2.VideoWriter_fourcc(*'mp4v'), 30.0, (320, 180))
+            for _ in range(60):
+                writer.write(rng.integers(0, 256, (180, 320, 3), dtype=np.uint8))
+            writer.release()
+            
+            clips = [(10, 40, os.path.join(tmp, "a.gif")), (30, 55, os.path.join(tmp, "clips", "b.gif"))]
+            paths = VideoFrameAnalyzer(video).extract_video_clips(clips)
+            self.assertEqual(paths, [path for _, _, path in clips])
+            # GIFs keep every ((end - start) // 15)-th frame, MP4s every frame
+            for path, gif_frames, mp4_frames in zip(paths, (15, 25), (30, 25)):
+                with Image.open(path) as gif:
+                    self.assertEqual(gif.n_frames, gif_frames)
+                cap = cv2.VideoCapture(path.replace('.gif', '.mp4'))
+                self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), mp4_frames)
+                cap.release()
+    
+    def test_clip_closes_at_its_last_frame(self):
+        """A clip is written and released on its last frame, not when the whole pass ends"""
+        rng = np.random.default_rng(12)
+        with tempfile.TemporaryDirectory() as tmp:
+            clip = ClipWriter(10, 40, os.path.join(tmp, "a.gif"))
+            for frame_number in range(10, 40):
+                self.assertFalse(clip.done)
+                clip.consume(frame_number, rng.integers(0, 256, (180, 320, 3), dtype=np.uint8))
+            
+            self.assertTrue(clip.done)
+            self.assertIsNone(clip.writer)
+            self.assertEqual(clip.gif_frames, [])
+            self.assertTrue(os.path.exists(clip.gif_path) and os.path.exists(clip.mp4_path))
+            clip.finish()  # the bus's own finish() is a no-op now
+            self.assertTrue(os.path.exists(clip.mp4_path))
+
+
+class TestFrameFeatures(unittest.TestCase):
+    """Test lazy per-frame feature caching"""
+    
+    def test_features_are_memoized(self):
+        """Gray and downscales are computed once and reused"""
+        frame = np.full((360, 640, 3), 90, dtype=np.uint8)
+        features = FrameFeatures(frame)
+        self.assertIs(features.gray, features.gray)
+        self.assertIs(features.downscaled((320, 180)), features.downscaled((320, 180)))
+        self.assertEqual(features.downscaled((320, 180)).shape, (180, 320))
+        self.assertAlmostEqual(features.brightness, 90.0)
+        self.assertIs(FrameFeatures.wrap(features), features)
+    
+    def test_detach_keeps_cached_features(self):
+        """Detached features survive the raw buffer being overwritten"""
+        frame = np.full((180, 320), 40, dtype=np.uint8)
+        features = FrameFeatures(frame).detach()
+        frame[:] = 200
+        self.assertEqual(int(features.downscaled((320, 180)).mean()), 40)
+        with self.assertRaises(ValueError):
+            features.hsv
+
+
+class TestBatchSignals(unittest.TestCase):
+    """Test vectorized flash/motion scoring of frame stacks"""
+    
+    def test_batch_matches_per_frame_math(self):
+        """One batched call reproduces the per-frame absdiff and gradient means"""
+        rng = np.random.default_rng(7)
+        stack = rng.integers(0, 256, size=(5, 18, 32), dtype=np.uint8)
+        prev = rng.integers(0, 256, size=(18, 32), dtype=np.uint8)
+        intensity, motion, brightness = batch_flash_motion(stack, prev)
+        
+        befores = [prev] + list(stack[:-1])
+        for i, frame in enumerate(stack):
+            self.assertAlmostEqual(intensity[i], np.mean(np.abs(frame.astype(int) - befores[i])), places=9)
+            self.assertAlmostEqual(motion[i], np.mean(np.gradient(frame.astype(np.float64))), places=9)
+            self.assertAlmostEqual(brightness[i], np.mean(frame), places=9)
+        
+        # Without prev the first frame is only a baseline
+        self.assertTrue(np.isnan(batch_flash_motion(stack)[0][0]))
+    
+    def test_shared_diffs(self):
+        """Diffs computed once give the same intensity and region means as each call's own absdiff"""
+        rng = np.random.default_rng(8)
+        stack = rng.integers(0, 256, size=(6, 18, 32), dtype=np.uint8)
+        regions = ((0.0, 0.0, 0.5, 1.0), (0.5, 0.2, 0.5, 0.5))
+        for prev in (None, rng.integers(0, 256, size=(18, 32), dtype=np.uint8)):
+            diffs = frame_diffs(stack, prev)
+            np.testing.assert_array_equal(batch_flash_motion(stack, prev, diffs)[0], batch_flash_motion(stack, prev)[0])
+            means = batch_region_diffs(stack, prev, regions, diffs)
+            np.testing.assert_array_equal(means, batch_region_diffs(stack, prev, regions))
+            self.assertAlmostEqual(means[1, 0], np.abs(stack[1, :, :16].astype(int) - stack[0, :, :16]).mean(), places=9)
+            self.assertEqual(np.isnan(means[0]).all(), prev is None)
+
+
+class TestMotionEngine(unittest.TestCase):
+    """Test the motion estimator tiers"""
+    
+    def test_tiers_measure_a_known_shift(self):
+        """Every tier reports no motion on a still pair and roughly the shift on a panned pair"""
+        rng = np.random.default_rng(3)
+        texture = cv2.GaussianBlur(rng.integers(0, 256, (200, 360)).astype(np.uint8), (0, 0), 3)
+        texture = cv2.normalize(texture, None, 0, 255, cv2.NORM_MINMAX)
+        still = texture[10:190, 20:340].copy()
+        panned = texture[10:190, 16:336].copy()  # content moved 4px right
+        
+        for tier in MOTION_TIERS:
+            engine = MotionEngine(tier)
+            self.assertLess(engine.estimate(still, still), 0.1, tier)
+            self.assertAlmostEqual(engine.estimate(still, panned), 4.0, delta=1.0, msg=tier)
+        with self.assertRaises(ValueError):
+            MotionEngine("sift")
+
+
+class TestHitstopDetector(unittest.TestCase):
+    """Test hitstop contact detection"""
+    
+    def test_freeze_runs(self):
+        """Short freezes after motion become hits/blocks; pauses, still scenes and gaps do not"""
+        play = np.full(400, 8.0)
+        hud = np.full(400, 0.1)
+        play[0] = np.nan
+        play[50:56] = 0.0  # hit: health drains during the freeze
+        hud[50:56] = 1.0
+        play[120:128] = 0.2  # block
+        play[200:260] = 0.0  # pause
+        play[294:303] = 0.0
+        play[298] = np.nan  # dropped frame inside a freeze
+        events = HitstopDetector().find(np.arange(400), play, hud)
+        
+        self.assertEqual([(e["type"], e["frame"], e["end_frame"]) for e in events], [("hit", 49, 56), ("block", 119, 128)])
+        self.assertEqual(events[1]["hitstop_frames"], 8)
+        self.assertEqual(HitstopDetector().find(np.arange(400), np.full(400, 0.5), hud), [])
+    
+    def test_consumer_matches_batch_size(self):
+        """The consumer finds the same contacts whatever the batch size"""
+        rng = np.random.default_rng(5)
+        texture = cv2.GaussianBlur(rng.integers(0, 256, (180, 700)).astype(np.uint8), (0, 0), 2)
+        offsets = np.cumsum([0] + [0 if 40 <= i < 45 else 4 for i in range(1, 90)])
+        results = []
+        for batch in (1, 7, 64):
+            consumer = HitstopConsumer(batch_frames=batch)
+            for i, offset in enumerate(offsets):
+                consumer.consume(i, texture[:, offset:offset + 320].copy())
+            consumer.finish()
+            results.append(consumer.events)
+        self.assertEqual([(e["frame"], e["hitstop_frames"]) for e in results[0]], [(39, 5)])
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0], results[2])
+    
+    def test_hud_signal_skips_round_timer(self):
+        """A round timer tick in the HUD centre leaves the HUD signal flat; a health bar change does not"""
+        frames = np.full((3, 180, 320), 40, dtype=np.uint8)
+        frames[1:, 5:20, 150:170] = 255  # timer digit changes
+        frames[2, 5:20, 20:60] = 200  # P1 health bar drains
+        consumer = HitstopConsumer()
+        for i, frame in enumerate(frames):
+            consumer.consume(i, frame)
+        hud = consumer.signals()[:, 1]
+        self.assertEqual(hud[1], 0.0)
+        self.assertGreater(hud[2], 0.0)
+
+
+class TestFeatureCache(unittest.TestCase):
+    """Test the per-frame signal cache"""
+    
+    def test_round_trip_and_keying(self):
+        """Cached columns come back intact and are keyed by signal parameters"""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, "match.mp4")
+            with open(video, "wb") as f:
+                f.write(b"\x00" * 1024)
+            cache = FeatureCache(os.path.join(tmp, "cache"))
+            columns = {"frame": np.arange(5), "intensity": np.linspace(0, 1, 5)}
+            
+            self.assertIsNone(cache.load(video, "scan", 1, sample_rate=3))
+            cache.save(video, "scan", 1, columns, {"fps": 60.0}, sample_rate=3)
+            loaded, meta = cache.load(video, "scan", 1, sample_rate=3)
+            np.testing.assert_array_equal(loaded["intensity"], columns["intensity"])
+            self.assertEqual(meta["fps"], 60.0)
+            
+            self.assertIsNone(cache.load(video, "scan", 1, sample_rate=2))
+            self.assertIsNone(cache.load(video, "scan", 2, sample_rate=3))
+    
+    def test_fingerprint_follows_content(self):
+        """Fingerprint survives a rename but changes when sampled bytes change"""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, "match.mp4")
+            data = bytearray(os.urandom(1024 * 1024))
+            with open(video, "wb") as f:
+                f.write(data)
+            original = video_fingerprint(video)
+            
+            renamed = os.path.join(tmp, "renamed.mp4")
+            os.rename(video, renamed)
+            self.assertEqual(video_fingerprint(renamed), original)
+            
+            data[-1] ^= 0xFF
+            with open(renamed, "wb") as f:
+                f.write(data)
+            self.assertNotEqual(video_fingerprint(renamed), original)
+            self.assertNotEqual(video_fingerprint(renamed, full_hash=True), video_fingerprint(renamed))
+
+
+class TestFrameArchive(unittest.TestCase):
+    """Test the memory-mapped frame proxy"""
+    
+    def test_write_and_read_strided_crop(self):
+        """A strided, cropped proxy serves exactly the frames it stored and only scans that line up"""
+        with tempfile.TemporaryDirectory() as tmp:
+            video = os.path.join(tmp, "match.mp4")
+            with open(video, "wb") as f:
+                f.write(b"\x00" * 1024)
+            writer = ProxyWriter(video, size=(32, 18), stride=2, crop=(0.0, 0.0, 1.0, 0.5))
+            writer.begin(SimpleNamespace(fps=60.0, total_frames=10))
+            frames = {n: np.full((18, 32), n * 10, dtype=np.uint8) for n in range(0, 10, 2)}
+            for n, frame in frames.items():
+                writer.consume(n, frame)
+            writer.finish()
+            
+            archive = FrameArchive.open(writer.path, video)
+            self.assertEqual(archive.data.shape, (5, 9, 32))
+            self.assertEqual(proxy_bytes(10, (32, 18), stride=2, crop=(0.0, 0.0, 1.0, 0.5)), 5 * 9 * 32)
+            numbers = [n for n, frame in archive.frames(2, 9, 4)]
+            self.assertEqual(numbers, [2, 6])
+            self.assertEqual(int(archive.stack(2, 9, 4)[1][0, 0]), 60)
+            self.assertTrue(archive.covers([(0, None)], 4))
+            self.assertFalse(archive.covers([(0, None)], 3))
+            
+            with open(video, "ab") as f:
+                f.write(b"\x01")
+            self.assertIsNone(FrameArchive.open(writer.path, video))
+
+
+class TestParallelScan(unittest.TestCase):
+    """Test segment planning for parallel scans"""
+    
+    def test_segments_cover_sample_grid(self):
+        """Segments are contiguous, snapped to keyframes and aligned to the sample grid"""
+        segments = plan_segments(7, 600, 4, step=5, keyframes=[0, 150, 290, 460])
+        self.assertEqual(segments[0][0], 7)
+        self.assertEqual(segments[-1][1], 600)
+        for (_, end), (start, _) in zip(segments, segments[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual((start - 7) % 5, 0)
+        self.assertEqual([start for start, _ in segments[1:]], [147, 287, 457])
+        
+        self.assertEqual(overlap_start(147, 5, 7), 142)
+        self.assertEqual(overlap_start(7, 5, 7), 7)
+        self.assertEqual(plan_segments(0, 10, 8, step=3), [(0, 10)])
+
+
+class TestPacketIndex(unittest.TestCase):
+    """Test the packet-size activity prefilter"""
+    
+    def test_idle_regions_are_pruned(self):
+        """Tiny inter frames (menus/idle) fall outside the active windows; keyframes are ignored"""
+        sizes = np.full(1000, 200)
+        sizes[300:600] = 5000
+        keyframes = np.zeros(1000, dtype=bool)
+        keyframes[::120] = True
+        sizes[keyframes] = 40000
+        index = PacketIndex(np.arange(1000), sizes, keyframes)
+        
+        self.assertEqual(index.keyframes()[:3], [0, 120, 240])
+        windows = index.active_windows(ratio=0.25, pad=10, gap=0)
+        self.assertEqual(len(windows), 1)
+        start, end = windows[0]
+        self.assertTrue(270 <= start <= 300 and 600 <= end <= 630)
+
+
+class TestGameplayClassifier(unittest.TestCase):
+    """Test gameplay / non-gameplay segment labelling"""
+    
+    def test_static_menu_is_non_gameplay(self):
+        """Frames without the HUD strip, or frozen for seconds, are labelled non-gameplay"""
+        rng = np.random.default_rng(0)
+        hud = (rng.random((6, 64)) * 255).astype(np.uint8)
+        menu = (rng.random((36, 64)) * 255).astype(np.uint8)
+        samples = []
+        for i in range(40):
+            if 10 <= i < 20:
+                thumb = menu.copy()
+            else:
+                thumb = (rng.random((36, 64)) * 255).astype(np.uint8)
+                thumb[:6] = hud
+            samples.append((i * 60, thumb))
+        
+        classifier = GameplayClassifier()
+        flags = classifier.classify(samples, fps=60)
+        self.assertFalse(flags[10:20].any())
+        self.assertTrue(flags[:10].all() and flags[20:].all())
+        self.assertEqual(classifier.non_gameplay_windows(samples, 60, 2400), [(600, 1200)])
+    
+    def _write_menu_video(self, path):
+        """30 s at 30 fps: gameplay with a fixed HUD strip, a static menu over frames 300-600, gameplay again"""
+        rng = np.random.default_rng(1)
+        hud = rng.integers(0, 256, (14, 160, 3), dtype=np.uint8)
+        menu = np.full((90, 160, 3), (120, 60, 30), dtype=np.uint8)
+        cv2.putText(menu, "SELECT", (20, 50), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 30, (160, 90))
+        for i in range(900):
+            if 300 <= i < 600:
+                frame = menu
+            else:
+                frame = cv2.GaussianBlur(rng.integers(0, 256, (90, 160, 3), dtype=np.uint8), (0, 0), 2)
+                frame[:14] = hud
+            writer.write(frame)
+        writer.release()
+    
+    @unittest.skipUnless(ffmpeg_available(), "imageio_ffmpeg not installed")
+    def test_keyframe_thumbnails(self):
+        """Keyframe-only ffmpeg thumbnails land on the packet index's keyframes and match a full decode"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "menu.mp4")
+            self._write_menu_video(path)
+            keyframes = read_packet_index(path).keyframes()
+            samples = collect_thumbnails(path, keyframes)
+            cap = cv2.VideoCapture(path)
+            cap.set(cv2.CAP_PROP_POS_FRAMES, keyframes[3])
+            _, frame = cap.read()
+            cap.release()
+        
+        self.assertGreater(len(keyframes), 10)
+        self.assertEqual([frame_num for frame_num, _ in samples], keyframes)
+        self.assertEqual(samples[0][1].shape, THUMB_SIZE[::-1])
+        expected = cv2.resize(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        self.assertLess(np.abs(samples[3][1].astype(int) - expected).mean(), 4.0)
+    
+    @unittest.skipUnless(ffmpeg_available(), "imageio_ffmpeg not installed")
+    def test_scan_skips_menu(self):
+        """A skip_non_gameplay scan drops the menu and still scans the gameplay on both sides of it"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "menu.mp4")
+            self._write_menu_video(path)
+            analyzer = MirrorMatchAnalyzer(AnalyzerParameters(video_path=path, skip_non_gameplay=True, cache_dir=None))
+            windows = analyzer._decode_windows()
+            self.assertTrue(analyzer.scan_video())
+        
+        self.assertEqual(len(analyzer.non_gameplay), 1)
+        start, end = analyzer.non_gameplay[0]
+        self.assertTrue(280 <= start <= 320 and 580 <= end <= 620)
+        self.assertEqual(len(windows), 2)
+        self.assertEqual(windows[0][0], 0)
+        self.assertGreater(len(analyzer.signals), 0)
+        self.assertFalse(any(start < frame < end for frame, *_ in analyzer.signals))
+
+
+class TestTopKSelector(unittest.TestCase):
+    """Test streaming top-K event selection"""
+    
+    def test_keeps_most_significant_across_stream(self):
+        """Late strong events displace early weak ones; ties keep the earlier event"""
+        selector = TopKSelector(3, key=lambda event: event["intensity"])
+        stream = [(0, 30.0), (10, 90.0), (20, 30.0), (30, 50.0), (4000, 95.0), (4010, 50.0)]
+        for frame, intensity in stream:
+            selector.push({"frame": frame, "intensity": intensity})
+        
+        self.assertEqual(len(selector), 3)
+        self.assertEqual(selector.seen, 6)
+        kept = selector.items(sort_key=lambda event: event["frame"])
+        self.assertEqual([event["frame"] for event in kept], [10, 30, 4000])
+        self.assertEqual([event["intensity"] for event in selector.items()], [95.0, 90.0, 50.0])
+
+
+class TestEventTable(unittest.TestCase):
+    """Test the columnar event table"""
+    
+    def test_columns_rows_and_aggregation(self):
+        """Rows are views onto the columns; sort, filter and group are vectorized"""
+        dtype = [("frame", np.int64), ("intensity", np.float64), ("tag", "U16"), ("tips", object)]
+        table = EventTable(dtype)
+        for frame, intensity, tag in [(30, 40.0, "scramble"), (10, 90.0, "heavy_commit"), (20, 40.0, "grab_punish")]:
+            table.append(frame=frame, intensity=intensity, tag=tag, tips=[tag])
+        
+        self.assertEqual(len(table), 3)
+        row = table[1]
+        self.assertEqual((row.frame, row.tag, row.tips), (10, "heavy_commit", ["heavy_commit"]))
+        self.assertIsInstance(row.frame, int)
+        row.intensity = 95.0
+        self.assertEqual(table["intensity"][1], 95.0)
+        
+        self.assertEqual(table.sort("frame")["frame"].tolist(), [10, 20, 30])
+        # Descending sorts keep equal rows in their original order
+        self.assertEqual(table.sort("intensity", descending=True)["frame"].tolist(), [10, 30, 20])
+        self.assertEqual(len(table[table["intensity"] < 50]), 2)
+        self.assertEqual(table.where(tag="scramble")["frame"].tolist(), [30])
+        self.assertEqual(table.count_by("tag"), {"grab_punish": 1, "heavy_commit": 1, "scramble": 1})
+        self.assertEqual(table.sum_by("intensity", by="tag")["scramble"], 40.0)
+        rows = table.to_rows(["frame", "label"], label=["a", "b", "c"])
+        self.assertEqual(rows[0], {"frame": 30, "label": "a"})
+
+
+
+class TestHealthTimeline(unittest.TestCase):
+    """Test the health timeline grid and its consumer"""
+    
+    def test_index_and_lookup(self):
+        """Frames and timestamps round to the nearest sample, the earlier one on a tie"""
+        timeline = HealthTimeline(np.linspace(1.0, 0.0, 5), np.full(5, 0.5), start_frame=10, step=4, fps=20.0)
+        
+        self.assertEqual(timeline.frames.tolist(), [10, 14, 18, 22, 26])
+        self.assertEqual(timeline.index(np.array([0, 10, 11, 12, 13, 26, 100])).tolist(), [0, 0, 0, 0, 1, 4, 4])
+        self.assertEqual(timeline.lookup(0.7), {"p1": 0.75, "p2": 0.5})  # frame 14
+        self.assertEqual(timeline.lookup(1.0, fps=10.0), {"p1": 1.0, "p2": 0.5})  # frame 10
+        self.assertEqual(HealthTimeline([], []).lookup(3.0), {"p1": 0.0, "p2": 0.0})
+    
+    def test_consumer_grows_past_frame_count(self):
+        """Samples past the container's frame count still land in the timeline"""
+        left = HealthBarConfig((0, 0, 10, 3), (50, 100, 100), (70, 255, 255))
+        right = HealthBarConfig((10, 0, 10, 3), (50, 100, 100), (70, 255, 255), anchor="right")
+        consumer = HealthTimelineConsumer(left, right, step=2, batch_frames=4)
+        consumer.begin(SimpleNamespace(fps=60.0, total_frames=6))
+        for frame_number in range(0, 200, 2):
+            frame = np.zeros((3, 20, 3), dtype=np.uint8)
+            frame[:, :frame_number % 10 + 1] = (0, 255, 0)
+            consumer.consume(frame_number, frame)
+        consumer.finish()
+        timeline = consumer.timeline
+        
+        self.assertEqual(len(timeline), 100)
+        self.assertLess(len(consumer.samples), 256)
+        self.assertEqual(timeline.fps, 60.0)
+        self.assertAlmostEqual(float(timeline.p1[-1]), 0.9, places=2)  # frame 198
+        self.assertEqual(float(timeline.p2[-1]), 0.0)
+
+
+
+class TestHealthBarReader(unittest.TestCase):
+    """Test the column-profile health bar reader"""
+    
+    def test_matches_mask_count(self):
+        """The binary-searched edge equals a brute-force HSV mask count for both anchors"""
+        rng = np.random.default_rng(7)
+        width, height = 120, 9
+        fills = rng.integers(0, width + 1, 40)
+        frames = np.zeros((len(fills), 20, 2 * width, 3), dtype=np.uint8)
+        frames[...] = rng.integers(0, 80, frames.shape)  # dim background never passes the saturation floor
+        for i, fill in enumerate(fills):
+            frames[i, 5:5 + height, :fill] = (40, 200, 230)  # P1 fill from the left edge
+            frames[i, 5:5 + height, 2 * width - fill:] = (40, 200, 230)  # P2 fill from the right edge
+        left = HealthBarConfig((0, 5, width, height), (20, 150, 150), (40, 255, 255))
+        right = HealthBarConfig((width, 5, width, height), (20, 150, 150), (40, 255, 255), anchor="right")
+        
+        for cfg in (left, right):
+            x, y, w, h = cfg.bbox
+            hsv = np.stack([cv2.cvtColor(frame, cv2.COLOR_BGR2HSV) for frame in frames])[:, y:y + h, x:x + w]
+            mask = np.all((hsv >= cfg.hsv_low) & (hsv <= cfg.hsv_high), axis=3)
+            brute = (mask.sum(axis=1) * 2 > h).sum(axis=1) / w
+            np.testing.assert_array_equal(read_health(frames, cfg), brute)
+            np.testing.assert_array_equal(brute, fills / width)
+
+
+
+class TestHudCalibration(unittest.TestCase):
+    """Test health bar calibration from HUD strips"""
+    
+    def test_extend_track(self):
+        """A fill span grows over the empty track on its draining side, bridging short gaps"""
+        median = np.full((30, 200, 3), 30.0, dtype=np.float32)
+        median[10:20, 20:120] = 90.0  # bar track
+        median[10:20, 70] = 30.0  # one-column divider
+        
+        self.assertEqual(_extend_track(median, 20, 50, 10, 10, "left"), (20, 120))
+        self.assertEqual(_extend_track(median, 90, 120, 10, 10, "right"), (20, 120))
+        self.assertEqual(_extend_track(median, 20, 120, 10, 10, "left"), (20, 120))
+    
+    def test_mirror_spans(self):
+        """Both bars widen to the union of their span and its mirror; bars on different rows stay put"""
+        left = HealthBarConfig((10, 5, 100, 8), (0, 0, 0), (179, 255, 255))
+        right = HealthBarConfig((300, 5, 80, 8), (0, 0, 0), (179, 255, 255), anchor="right")
+        mirrored = _mirror_spans(left, right, 400)
+        
+        self.assertEqual([bar.bbox for bar in mirrored], [(10, 5, 100, 8), (290, 5, 100, 8)])
+        self.assertEqual(mirrored[1].anchor, "right")
+        lower = HealthBarConfig((300, 40, 80, 8), (0, 0, 0), (179, 255, 255), anchor="right")
+        self.assertEqual(_mirror_spans(left, lower, 400), (left, lower))
+    
+    def test_find_bars_red_and_yellow(self):
+        """A red fill straddling hue 0 gets a wrapping range that reads it like the yellow one"""
+        rng = np.random.default_rng(3)
+        fills = rng.integers(40, 140, 12)
+        strips = np.full((len(fills), 40, 400, 3), 30, dtype=np.uint8)
+        strips[:, 10:20, 20:180] = 90  # tracks
+        strips[:, 10:20, 220:380] = 90
+        for i, fill in enumerate(fills):
+            strips[i, 10:20, 20:20 + fill] = (0, 0, 230)  # red, hue 0
+            strips[i, 10:20:2, 20:20 + fill] = (40, 0, 220)  # red, hue 175
+            strips[i, 10:20, 380 - fill:380] = (0, 210, 230)  # yellow
+        left, right = HudCalibrator().find_bars(strips)
+        
+        self.assertEqual((left.bbox, left.anchor), ((20, 10, 160, 10), "left"))
+        self.assertEqual((right.bbox, right.anchor), ((220, 10, 160, 10), "right"))
+        self.assertGreater(left.hsv_low[0], left.hsv_high[0])
+        self.assertLessEqual(right.hsv_low[0], right.hsv_high[0])
+        frames = np.zeros((len(fills), 60, 400, 3), dtype=np.uint8)
+        frames[:, :40] = strips
+        np.testing.assert_array_equal(read_health(frames, left), fills / 160)
+        np.testing.assert_array_equal(read_health(frames, right), fills / 160)
+
+
+
+class TestHealthEvents(unittest.TestCase):
+    """Test damage events and rounds measured from a health timeline"""
+    
+    def test_damage_events(self):
+        """Drops split by short gaps merge, slow drift and one-sample misreads are ignored, HUD gaps read nothing"""
+        samples = np.arange(400)
+        p1 = np.interp(samples, [0, 300, 350, 360, 363, 367, 370], [1.0, 1.0, 0.95, 0.95, 0.85, 0.85, 0.75])
+        p2 = np.interp(samples, [0, 100, 105, 107, 112, 200, 205], [1.0, 1.0, 0.9, 0.9, 0.8, 0.8, 0.6])
+        p2[150] = 0.3  # misread
+        p1[250:260] = p2[250:260] = 0.0  # HUD gone
+        events = damage_events(HealthTimeline(p1, p2, step=2))
+        
+        self.assertEqual(
+            [(e["start_frame"], e["end_frame"], e["victim"]) for e in events.to_rows()],
+            [(200, 224, 2), (400, 410, 2), (720, 726, 1), (734, 740, 1)],
+        )
+        np.testing.assert_allclose(events["amount"], [0.2, 0.2, 0.1, 0.1], atol=0.002)
+        self.assertEqual(len(damage_events(HealthTimeline(p1, p2, step=2), min_amount=0.15)), 2)
+        self.assertEqual(len(damage_events(HealthTimeline(p1, p2, step=2), max_gap=1)), 5)
+        self.assertEqual(len(damage_events(HealthTimeline(p1, p2, step=2), max_gap=4)), 3)
+    
+    def test_round_results(self):
+        """An animated refill splits rounds at its low point; rounds shorter than min_round_sec are dropped"""
+        frames = np.arange(1250)
+        # Round 2 refills over 12 frames, no single step above the reset threshold
+        p1 = np.interp(frames, [0, 100, 300, 620, 632, 700, 1000, 1100, 1101], [1, 1, 0.7, 0.7, 1, 1, 0.3, 0.3, 1])
+        p2 = np.interp(frames, [0, 200, 600, 620, 632, 700, 1050, 1100, 1101], [1, 1, 0, 0, 1, 1, 0.5, 0.5, 1])
+        timeline = HealthTimeline(p1, p2, fps=30.0)
+        rounds = round_results(timeline)
+        
+        self.assertEqual(
+            [(r["round"], r["start_frame"], r["end_frame"], r["winner"]) for r in rounds.to_rows()],
+            [(1, 0, 620, 1), (2, 621, 1100, 2)],
+        )
+        np.testing.assert_allclose(rounds["p1"], [0.7, 0.3], atol=0.001)
+        self.assertEqual(len(round_results(timeline, min_round_sec=1.0)), 3)  # the 5 s tail after the last refill
+
+
+
+class TestPlayerAttribution(unittest.TestCase):
+    """Test per-side activity windows and player attribution cues"""
+    
+    def test_window_means_per_frame(self):
+        """Window means are per-frame rates whatever the stride; NaN samples and empty windows add nothing"""
+        frames = np.array([0, 3, 6, 9, 20, 21, 22])
+        diffs = np.array([np.nan, 3, 3, 3, 1, 1, 1])[:, None] * [1.0, 0.0]
+        activity = SideActivity(frames[::-1], diffs[::-1])  # any order
+        unit = SideActivity(np.arange(10), np.ones((10, 2)) * [1.0, 0.0])
+        
+        np.testing.assert_allclose(activity.window_means(np.array([0, -1, 9]), np.array([9, 100, 19])), [[1, 0], [1, 0], [0, 0]])
+        np.testing.assert_allclose(unit.window_means(np.array([0]), np.array([9])), [[1, 0]])
+        np.testing.assert_allclose(activity.window_means(np.array([19]), np.array([21])), [[1, 0]])
+    
+    def test_cue_priority(self):
+        """Damage beats health beats meter beats motion; motion only decides where nearby cues fix the sides"""
+        frames = np.arange(0, 600, 3)
+        diffs = np.zeros((len(frames), 6))
+        bumps = [
+            (33, 45, 1),  # P2 health after event 30
+            (150, 153, 3), (150, 153, 4),  # P2 meter and left-side motion at event 150
+            (300, 303, 5),  # right-side motion only at event 300
+            (453, 465, 0), (450, 453, 5),  # P1 health and right-side motion at event 450
+            (480, 483, 5),  # right-side motion only at event 480
+        ]
+        for first, last, column in bumps:
+            diffs[(frames >= first) & (frames <= last), column] = 3.0
+        activity = SideActivity(frames, diffs)
+        events = np.array([30, 150, 300, 450, 480])
+        windows = dict(fps=30.0, lead=3, punish_window_sec=1.0, cue_window_sec=0.2, side_window_sec=2.0)
+        
+        players, sources = PlayerAttributor(activity, **windows).attribute(events)
+        # 450 shows P1 on the right, so 480's right-side motion is P1's; 300 has no nearby evidence
+        self.assertEqual(players.tolist(), [2, 2, 1, 1, 1])
+        self.assertEqual(sources.tolist(), [1, 2, 4, 1, 3])
+        
+        damage = EventTable.from_columns(DAMAGE_DTYPE, {
+            "start_frame": np.array([32]), "end_frame": np.array([60]), "victim": np.array([1]), "amount": np.array([0.1]),
+        })
+        players, sources = PlayerAttributor(activity, damage, **windows).attribute(events)
+        # Measured damage replaces the health cue, so nothing places the sides near 480 any more
+        self.assertEqual(players.tolist(), [1, 2, 1, 2, 1])
+        self.assertEqual(sources.tolist(), [0, 2, 4, 4, 4])
+
+
 def run_tests():
     """Run all tests"""
     print("\n" + "="*60)
@@ -151,6 +841,24 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestPlaystyleAnalyzer))
     suite.addTests(loader.loadTestsFromTestCase(TestRecommendationEngine))
     suite.addTests(loader.loadTestsFromTestCase(TestMoveDatabaseCompleteness))
+    suite.addTests(loader.loadTestsFromTestCase(TestFrameBus))
+    suite.addTests(loader.loadTestsFromTestCase(TestClipExtraction))
+    suite.addTests(loader.loadTestsFromTestCase(TestFrameFeatures))
+    suite.addTests(loader.loadTestsFromTestCase(TestBatchSignals))
+    suite.addTests(loader.loadTestsFromTestCase(TestMotionEngine))
+    suite.addTests(loader.loadTestsFromTestCase(TestHitstopDetector))
+    suite.addTests(loader.loadTestsFromTestCase(TestFeatureCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestFrameArchive))
+    suite.addTests(loader.loadTestsFromTestCase(TestParallelScan))
+    suite.addTests(loader.loadTestsFromTestCase(TestPacketIndex))
+    suite.addTests(loader.loadTestsFromTestCase(TestGameplayClassifier))
+    suite.addTests(loader.loadTestsFromTestCase(TestTopKSelector))
+    suite.addTests(loader.loadTestsFromTestCase(TestEventTable))
+    suite.addTests(loader.loadTestsFromTestCase(TestHealthTimeline))
+    suite.addTests(loader.loadTestsFromTestCase(TestHealthBarReader))
+    suite.addTests(loader.loadTestsFromTestCase(TestHudCalibration))
+    suite.addTests(loader.loadTestsFromTestCase(TestHealthEvents))
+    suite.addTests(loader.loadTestsFromTestCase(TestPlayerAttribution))
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)